@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 """
-Triangulation App - Render.com Entry Point
+Triangulation App - Lokaler Start aus dem Projektverzeichnis
 Wrapper für das Backend im backend/ Verzeichnis
+
+Nur für 'python app.py'. Produktion startet direkt im Backend
+(render.yaml, Procfile, backend/Dockerfile):
+
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
 """
 
 import sys
@@ -10,12 +15,8 @@ import os
 # Füge das backend-Verzeichnis zum Python-Path hinzu
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
-# Importiere die Flask-App aus dem backend-Verzeichnis
-from app import app
-
 if __name__ == '__main__':
-    # Für lokale Entwicklung
+    # Importiere die Flask-App aus dem backend-Verzeichnis (aufgewärmt, siehe wsgi.py)
+    from wsgi import app
+
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)), debug=False)
-else:
-    # Für Render.com (Gunicorn)
-    application = app
\ No newline at end of file
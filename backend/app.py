@@ -1,185 +1,488 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, has_request_context, request, jsonify, stream_with_context
 from flask_cors import CORS
 import numpy as np
+import itertools
+import json
 import math
-from typing import List, Dict, Any, Tuple, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Tuple, Optional, Union
 import os
+import tempfile
+import time
+
+import solver
+import projection
+import region
+from cache import ResultCache, point_set_key
+from sessions import SessionStore, SolveSession
+from tracking import TrackStore
+from parallel import SolvePool
+from jobs import JobQueue
+from projects import PROJECT_PAGE_SIZE, ProjectStore, RevisionConflict
+from metrics import NULL_STAGE, MetricsRegistry, StageTimer
+import geometry
+import tracking
+import uncertainty
+import wire
+from geometry import NEAR_DUPLICATE_DISTANCE, analyze_geometry
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for React frontend
 
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 10000))
+
+# Projektion in die Ebene (siehe projection.PROJECTIONS); 'auto' wechselt für
+# weiträumige Punktmengen auf die lokale ENU-Tangentialebene
+PROJECTION = os.environ.get('PROJECTION', projection.AUTO)
+if PROJECTION not in projection.PROJECTIONS:
+    raise ValueError(f"Unbekannte Projektion '{PROJECTION}' - erlaubt: {', '.join(projection.PROJECTIONS)}")
+
+# Punktmengen pro Block beim NDJSON-Streaming
+STREAM_CHUNK_SIZE = int(os.environ.get('STREAM_CHUNK_SIZE', 1000))
+
+# Ergebnis-Cache pro Worker; Größe 0 deaktiviert, TTL 0 = unbegrenzt
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 0))
+
+result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
+
+# Gitter für Lösungen innerhalb einer Region ("region"), LRU pro Worker;
+# ein Gitter belegt rund 350 KB
+REGION_CACHE_SIZE = int(os.environ.get('REGION_CACHE_SIZE', 64))
+
+region_grids = ResultCache(REGION_CACHE_SIZE)
+
+# Live-Sitzungen pro Worker; verfallen nach SESSION_IDLE_TIMEOUT Sekunden
+SESSION_MAX_COUNT = int(os.environ.get('SESSION_MAX_COUNT', 1000))
+SESSION_IDLE_TIMEOUT = float(os.environ.get('SESSION_IDLE_TIMEOUT', 900))
+
+session_store = SessionStore(SESSION_MAX_COUNT, SESSION_IDLE_TIMEOUT)
+
+# Tracking pro Worker: Tracks verfallen nach TRACK_IDLE_TIMEOUT Sekunden;
+# Standard-Rauschen der Entfernungen (m) und der Beschleunigung (m/s²)
+TRACK_MAX_COUNT = int(os.environ.get('TRACK_MAX_COUNT', 10000))
+TRACK_IDLE_TIMEOUT = float(os.environ.get('TRACK_IDLE_TIMEOUT', 300))
+TRACK_RANGE_SIGMA = float(os.environ.get('TRACK_RANGE_SIGMA', tracking.TRACK_RANGE_SIGMA))
+TRACK_ACCELERATION_NOISE = float(os.environ.get('TRACK_ACCELERATION_NOISE',
+                                                tracking.TRACK_ACCELERATION_NOISE))
+MAX_TRACK_UPDATES = int(os.environ.get('MAX_TRACK_UPDATES', 10000))
+MAX_SMOOTH_EPOCHS = int(os.environ.get('MAX_SMOOTH_EPOCHS', 100000))
+
+track_store = TrackStore(TRACK_MAX_COUNT, TRACK_IDLE_TIMEOUT)
+
+# Prozesspool für Batch und Streaming; 0 oder 1 = seriell. Kleinere
+# Batches als PARALLEL_MIN_SETS werden immer seriell gelöst.
+SOLVE_WORKERS = int(os.environ.get('SOLVE_WORKERS', 0))
+PARALLEL_MIN_SETS = int(os.environ.get('PARALLEL_MIN_SETS', 2000))
+PARALLEL_CHUNK_SIZE = int(os.environ.get('PARALLEL_CHUNK_SIZE', 1000))
+
+solve_pool = SolvePool(SOLVE_WORKERS, preload=['app'])
+
+# Asynchrone Jobs (/api/jobs): SQLite-Warteschlange und Ergebnisse im
+# Job-Verzeichnis, JOB_WORKERS Threads pro Worker-Prozess. Abgeschlossene
+# Ergebnisse bleiben JOB_RETENTION Sekunden und bis JOB_MAX_BYTES erhalten.
+# Mit Prozesspool lösen Job-Threads jeden Block im Pool und lesen bzw.
+# schreiben nur Dateien; ohne Pool rechnen sie im Worker und konkurrieren
+# mit Anfragen um den GIL, daher dann höchstens ein Job-Thread.
+JOB_DIR = os.environ.get('JOB_DIR', os.path.join(tempfile.gettempdir(), 'triangulation-jobs'))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
+if not solve_pool.enabled:
+    JOB_WORKERS = min(JOB_WORKERS, 1)
+JOB_CHUNK_SIZE = int(os.environ.get('JOB_CHUNK_SIZE', 1000))
+JOB_MAX_SETS = int(os.environ.get('JOB_MAX_SETS', 1000000))
+JOB_MAX_QUEUED = int(os.environ.get('JOB_MAX_QUEUED', 100))
+JOB_MAX_BYTES = int(os.environ.get('JOB_MAX_BYTES', 256 * 1024 * 1024))
+JOB_RETENTION = float(os.environ.get('JOB_RETENTION', 86400))
+JOB_PAGE_SIZE = 1000
+
+job_queue = JobQueue(
+    JOB_DIR, lambda lines, method: stream_blocks(lines, method, JOB_CHUNK_SIZE, parallel=True),
+    JOB_WORKERS, JOB_MAX_QUEUED, JOB_MAX_BYTES, JOB_RETENTION
+)
+
+# Serverseitige Projekte (/api/projects) in einer SQLite-Datei, die alle
+# Worker eines Hosts teilen; für dauerhafte Ablage auf ein Volume legen
+PROJECT_DB = os.environ.get('PROJECT_DB', os.path.join(tempfile.gettempdir(), 'triangulation-projects.sqlite'))
+MAX_PROJECT_POINTS = int(os.environ.get('MAX_PROJECT_POINTS', 100000))
+MAX_PROJECT_TEXT = 10000
+
+project_store = ProjectStore(PROJECT_DB, MAX_PROJECT_POINTS)
+
+# Latenz-Histogramme unter /metrics; Stufenzeiten pro Anfrage zusätzlich
+# im Server-Timing-Header, wenn der Client 'X-Timing: 1' sendet
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+
+metrics = MetricsRegistry()
+
+# Schwellen der Punktvalidierung: GDOP, Clark-Evans-Index (< 1 = gehäuft)
+# ab CLUSTER_MIN_POINTS Punkten, gemeldete Duplikat-Paare
+GDOP_WARNING = float(os.environ.get('GDOP_WARNING', 6))
+CLUSTER_WARNING_INDEX = float(os.environ.get('CLUSTER_WARNING_INDEX', 0.5))
+CLUSTER_MIN_POINTS = 10
+MAX_REPORTED_DUPLICATES = 100
+
+# Unsicherheit auf Anfrage ("uncertainty"): Standard-Rauschen der Entfernungen
+# in Metern, Obergrenze der Monte-Carlo-Stichproben und Zeitbudget in Sekunden
+UNCERTAINTY_SIGMA = float(os.environ.get('UNCERTAINTY_SIGMA', 2.0))
+MONTE_CARLO_MAX_SAMPLES = int(os.environ.get('MONTE_CARLO_MAX_SAMPLES', 20000))
+MONTE_CARLO_BUDGET = float(os.environ.get('MONTE_CARLO_BUDGET', 0.25))
+
+# Entfernungsmatrizen und Paar-Batches: maximale Anzahl Entfernungen pro
+# Anfrage und Entfernungen pro Block bei gestreamter Ausgabe
+MAX_DISTANCE_CELLS = int(os.environ.get('MAX_DISTANCE_CELLS', 4000000))
+DISTANCE_BLOCK_CELLS = int(os.environ.get('DISTANCE_BLOCK_CELLS', 65536))
+
+# Ausgabeformate für Entfernungen; binary = float64 little-endian
+DISTANCE_FORMATS = ('json', 'ndjson', 'binary')
+DISTANCE_MEDIA_TYPES = {
+    'application/octet-stream': 'binary',
+    'application/x-ndjson': 'ndjson',
+}
+
+def current_timer() -> Optional[StageTimer]:
+    """
+    StageTimer der laufenden Anfrage oder None
+    """
+    return g.get('timer') if has_request_context() else None
+
+def stage(name: str):
+    """
+    Messpunkt für eine Stufe der laufenden Anfrage
+    """
+    timer = current_timer()
+    return NULL_STAGE if timer is None else timer.stage(name)
+
+@app.before_request
+def start_timer():
+    if METRICS_ENABLED or request.headers.get('X-Timing'):
+        g.timer = StageTimer()
+
+@app.after_request
+def record_timing(response):
+    timer = g.pop('timer', None)
+    if timer is None:
+        return response
+    
+    total = timer.elapsed()
+    if METRICS_ENABLED and request.endpoint not in (None, 'metrics_endpoint'):
+        metrics.record(request.endpoint, timer, total)
+    if request.headers.get('X-Timing'):
+        response.headers['Server-Timing'] = timer.server_timing(total)
+    return response
+
 class AdvancedTriangulationCalculator:
     """
     Erweiterte Klasse für die Berechnung der Triangulation mit beliebig vielen Punkten
     """
     
     @staticmethod
-    def calculate_position(points: List[Dict]) -> Dict[str, Any]:
+    def calculate_position(points: Union[List[Dict], np.ndarray],
+                           method: str = solver.WLS,
+                           polygon: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Berechnet die Position basierend auf 3 oder mehr Referenzpunkten
         Verwendet verschiedene Algorithmen je nach Anzahl der Punkte
         
         Args:
             points: Liste von Dictionaries mit 'lat', 'lng', 'distance' keys
+                oder gepacktes Array (n, 3), siehe point_array
+            method: 'wls' (linear), 'lm' (nichtlineare Verfeinerung) oder 'ransac' (robust)
+            polygon: optionale Region (V, 2) als lat, lng, siehe parse_region;
+                die Position liegt dann immer in der Region, method entfällt
             
         Returns:
-            Dictionary mit berechneter Position, Genauigkeit und Statistiken
+            Dictionary mit berechneter Position, Genauigkeit und Statistiken.
+            Ergebnisse stammen ggf. aus dem gemeinsamen result_cache und
+            dürfen nicht verändert werden.
         """
         if len(points) < 3:
             return {"error": "Mindestens 3 Referenzpunkte erforderlich"}
         
         try:
-            # Konvertiere Geo-Koordinaten zu kartesischen Koordinaten
-            cartesian_points = []
-            center_lat = sum(p['lat'] for p in points) / len(points)
-            center_lng = sum(p['lng'] for p in points) / len(points)
+            timer = current_timer()
+            with stage('convert'):
+                data = point_array(points)
             
-            for i, point in enumerate(points):
-                x, y = AdvancedTriangulationCalculator.geo_to_cartesian(
-                    point['lat'], point['lng'], center_lat, center_lng
-                )
-                cartesian_points.append({
-                    'x': x, 'y': y, 'd': point['distance'],
-                    'lat': point['lat'], 'lng': point['lng'],
-                    'id': i + 1
-                })
+            with stage('cache'):
+                if polygon is not None:
+                    method = f"{solver.REGION}:{region.region_key(polygon, PROJECTION)}"
+                key = point_set_key(data, method)
+                cached = result_cache.get(key)
+            if cached is not None:
+                if timer is not None:
+                    timer.label('cached', len(points))
+                return cached
             
-            # Wähle Algorithmus basierend auf Anzahl der Punkte
-            if len(cartesian_points) == 3:
-                result = AdvancedTriangulationCalculator.trilaterate_3_points(cartesian_points)
+            if polygon is None:
+                result = solver.solve(data, method=method, timer=timer, projection_mode=PROJECTION)
             else:
-                result = AdvancedTriangulationCalculator.multilaterate_advanced(cartesian_points)
+                result = solver.unpack(AdvancedTriangulationCalculator.solve_region(data[None], polygon, timer))[0]
+            if timer is not None:
+                timer.label(result.algorithm, len(points))
             
-            if 'error' in result:
-                return result
+            with stage('format'):
+                formatted = AdvancedTriangulationCalculator.format_response(
+                    result, data[:, 2].tolist()
+                )
+            result_cache.put(key, formatted)
+            return formatted
             
-            # Konvertiere zurück zu Geo-Koordinaten
-            lat, lng = AdvancedTriangulationCalculator.cartesian_to_geo(
-                result['x'], result['y'], center_lat, center_lng
-            )
+        except Exception as e:
+            return {"error": f"Berechnungsfehler: {str(e)}"}
+    
+    @staticmethod
+    def calculate_batch(point_sets: List[List[Dict]],
+                        method: str = solver.WLS,
+                        polygon: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Berechnet viele unabhängige Punktmengen gemeinsam
+        
+        Punktmengen gleicher Größe werden gestapelt und vektorisiert gelöst.
+        Ab PARALLEL_MIN_SETS Punktmengen werden Blöcke zu je
+        PARALLEL_CHUNK_SIZE als Arrays auf den Prozesspool verteilt.
+        Jedes Ergebnis entspricht der Ausgabe von calculate_position.
+        
+        Args:
+            point_sets: Liste von Punktlisten mit 'lat', 'lng', 'distance' keys
+            method: 'wls' (linear), 'lm' (nichtlineare Verfeinerung) oder 'ransac' (robust)
+            polygon: optionale Region für alle Punktmengen, siehe calculate_position
             
-            # Erweiterte Statistiken berechnen
-            stats = AdvancedTriangulationCalculator.calculate_statistics(
-                result, cartesian_points
-            )
+        Returns:
+            Liste von Ergebnis-Dictionaries in Eingabereihenfolge
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(point_sets)
+        groups: Dict[int, List[int]] = {}
+        for i, points in enumerate(point_sets):
+            groups.setdefault(len(points), []).append(i)
+        
+        serial = len(point_sets) < PARALLEL_MIN_SETS or not solve_pool.enabled
+        chunk_size = max(len(point_sets), 1) if serial else PARALLEL_CHUNK_SIZE
+        chunks: List[Tuple[List[int], np.ndarray]] = []
+        
+        for n, indices in groups.items():
+            if n < 3:
+                for i in indices:
+                    results[i] = {"error": "Mindestens 3 Referenzpunkte erforderlich"}
+                continue
             
-            return {
-                "lat": lat,
-                "lng": lng,
-                "x": result['x'],
-                "y": result['y'], 
-                "accuracy": result.get('accuracy', 0),
-                "method": result.get('method', 'unknown'),
-                "statistics": stats,
-            return {
-                "lat": lat,
-                "lng": lng,
-                "accuracy": result.get('accuracy', 0),
-                "method": result.get('method', 'unknown'),
-                "point_count": len(points),
-                "confidence": result.get('confidence', 0)
-            }
+            try:
+                data = np.stack([point_array(point_sets[i]) for i in indices])
+            except Exception as e:
+                for i in indices:
+                    results[i] = {"error": f"Berechnungsfehler: {str(e)}"}
+                continue
             
+            for start in range(0, len(indices), chunk_size):
+                chunks.append((indices[start:start + chunk_size], data[start:start + chunk_size]))
+        
+        solved = solve_pool.imap(
+            AdvancedTriangulationCalculator.solve_array_batch,
+            ((data, method, polygon) for _, data in chunks),
+            serial=serial
+        )
+        for (indices, _), formatted in zip(chunks, solved):
+            for i, result in zip(indices, formatted):
+                results[i] = result
+        
+        return results
+    
+    @staticmethod
+    def solve_array_batch(data: np.ndarray, method: str = solver.WLS,
+                          polygon: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Löst gestapelte Punktmengen (B, n, 3) und formatiert die Ergebnisse
+        
+        Läuft auch in Pool-Prozessen; Ein- und Ausgabe sind picklebar.
+        """
+        try:
+            if polygon is None:
+                solved = solver.unpack(solver.solve_batch(data, method, projection_mode=PROJECTION))
+            else:
+                solved = solver.unpack(AdvancedTriangulationCalculator.solve_region(data, polygon))
         except Exception as e:
-            return {"error": f"Berechnungsfehler: {str(e)}"}
+            return [{"error": f"Berechnungsfehler: {str(e)}"} for _ in range(len(data))]
+        
+        distances = data[..., 2].tolist()
+        return [
+            AdvancedTriangulationCalculator.format_response(result, distances[k])
+            for k, result in enumerate(solved)
+        ]
+    
+    @staticmethod
+    def solve_region(data: np.ndarray, polygon: np.ndarray,
+                     timer: Optional[StageTimer] = None) -> Dict[str, np.ndarray]:
+        """
+        Löst gestapelte Punktmengen (B, n, 3) innerhalb einer Region (siehe region)
+        
+        Das Gitter der Region kommt aus region_grids oder wird dort abgelegt.
+        
+        Raises:
+            ValueError: wenn die Region zu klein oder zu groß ist
+        """
+        with stage('region'):
+            mode = region.grid_mode(data, polygon, PROJECTION)
+            grid = region.region_grid(polygon, mode, region_grids)
+        return region.solve_batch(data, grid, timer)
+    
+    @staticmethod
+    def solve_array_table(data: np.ndarray, method: str = solver.WLS) -> np.ndarray:
+        """
+        Löst gestapelte Punktmengen (B, n, 3) zur Ergebnistabelle (siehe wire.PACKED_FIELDS)
+        
+        Wie solve_array_batch, aber ohne Ergebnis-Dictionaries; läuft
+        auch in Pool-Prozessen.
+        """
+        try:
+            return wire.array_table(solver.solve_batch(data, method, projection_mode=PROJECTION))
+        except Exception:
+            table = np.full((len(data), len(wire.PACKED_FIELDS)), np.nan)
+            table[:, 0] = 0.0
+            return table
+    
+    @staticmethod
+    def format_result(result: solver.SolveResult, distances: List[float]) -> Dict[str, Any]:
+        """
+        Konvertiert ein SolveResult in das Ergebnis-Dictionary der Algorithmen
+        """
+        n = len(distances)
+        
+        if not result.valid:
+            if n == 3:
+                return {"error": "Punkte sind kollinear oder Konfiguration ist ungültig"}
+            return {"error": "Singulare Matrix - Punkte sind ungünstig positioniert"}
+        
+        distance_errors = result.distance_errors.tolist()
+        formatted = {
+            "x": result.x,
+            "y": result.y,
+            "accuracy": result.accuracy,
+            "method": result.method,
+            "confidence": result.confidence,
+            "max_error": result.max_error,
+            "mean_error": result.mean_error,
+            "distance_errors": distance_errors,
+            "projection": result.projection
+        }
+        
+        if result.algorithm == solver.TRILATERATION:
+            formatted["outliers"] = []
+            formatted["suggestions"] = (
+                [] if result.confidence > 70 else ["Überprüfen Sie die Entfernungsmessungen"]
+            )
+            return formatted
+        
+        # Ausreißer-Erkennung (Punkte mit großem Fehler)
+        outliers = [
+            {'point_id': i + 1, 'error': distance_errors[i], 'distance': distances[i]}
+            for i in np.flatnonzero(result.outlier_mask).tolist()
+        ]
+        formatted["outliers"] = outliers
+        formatted["suggestions"] = AdvancedTriangulationCalculator.suggest_improvements(
+            len(outliers), result.confidence, result.accuracy
+        )
+        formatted["residuals"] = result.residuals.tolist()
+        formatted["weights_used"] = result.weights.tolist()
+        
+        if result.algorithm in (solver.LM, solver.RANSAC, solver.REGION):
+            formatted["iterations"] = result.iterations
+            formatted["converged"] = result.converged
+        
+        # Robuste Schätzung: Ausreißer sind aus der Lösung ausgeschlossen;
+        # 'hypotheses' zählt bei REGION die bewerteten Gitterzellen
+        if result.algorithm in (solver.RANSAC, solver.REGION):
+            formatted["inliers"] = (np.flatnonzero(~result.outlier_mask) + 1).tolist()
+            formatted["hypotheses"] = result.hypotheses
+        return formatted
+    
+    @staticmethod
+    def format_response(result: solver.SolveResult, distances: List[float]) -> Dict[str, Any]:
+        """
+        Baut die API-Antwort für ein SolveResult
+        
+        Args:
+            result: Ergebnis des Solvers
+            distances: gemessene Entfernungen der Punkte in Eingabereihenfolge
+        """
+        formatted = AdvancedTriangulationCalculator.format_result(result, distances)
+        
+        if 'error' in formatted:
+            return formatted
+        
+        return AdvancedTriangulationCalculator.build_response(
+            formatted, result.lat, result.lng, distances
+        )
+    
+    @staticmethod
+    def build_response(result: Dict, lat: float, lng: float, points: List[Any]) -> Dict[str, Any]:
+        """
+        Baut die API-Antwort aus einem Algorithmus-Ergebnis
+        
+        Von 'points' wird nur die Anzahl verwendet.
+        """
+        # Erweiterte Statistiken berechnen
+        stats = AdvancedTriangulationCalculator.calculate_statistics(result, points)
+        
+        response = {
+            "lat": lat,
+            "lng": lng,
+            "x": result['x'],
+            "y": result['y'], 
+            "accuracy": result.get('accuracy', 0),
+            "method": result.get('method', 'unknown'),
+            "statistics": stats,
+            "point_count": len(points),
+            "confidence": result.get('confidence', 0),
+            "max_error": result.get('max_error', 0),
+            "mean_error": result.get('mean_error', 0),
+            "distance_errors": result.get('distance_errors', []),
+            "outliers": result.get('outliers', []),
+            "residuals": result.get('residuals', []),
+            "weights_used": result.get('weights_used', []),
+            "projection": result.get('projection', projection.EQUIRECTANGULAR)
+        }
+        if 'inliers' in result:
+            response['inliers'] = result['inliers']
+        return response
+    
+    @staticmethod
+    def suggest_improvements(outlier_count: int, confidence: float, rmse: float) -> List[str]:
+        """
+        Verbesserungsvorschläge für Multilaterations-Ergebnisse
+        """
+        suggestions = []
+        if outlier_count > 0:
+            suggestions.append(f"Überprüfen Sie {outlier_count} Punkte mit hohen Fehlern")
+        if confidence < 50:
+            suggestions.append("Fügen Sie mehr Referenzpunkte hinzu für bessere Genauigkeit")
+        if rmse > 100:
+            suggestions.append("Überprüfen Sie die Entfernungsmessungen")
+        return suggestions
+    
+    @staticmethod
+    def _solve_cartesian(kernel, algorithm: str, points: List[Dict]) -> Dict[str, Any]:
+        """
+        Wendet einen Solver-Kernel auf kartesische Punkt-Dictionaries an
+        """
+        data = np.array([(p['x'], p['y'], p['d']) for p in points], dtype=np.float64)
+        solved = kernel(data[None, :, :2], data[None, :, 2])
+        solved['algorithm'] = algorithm
+        # Kartesische Eingaben sind bereits eben, keine ENU-Projektion
+        solved['enu'] = np.zeros(1, dtype=bool)
+        result = solver.unpack(solved)[0]
+        return AdvancedTriangulationCalculator.format_result(result, data[:, 2].tolist())
     
     @staticmethod
     def multilaterate_advanced(points: List[Dict]) -> Dict[str, Any]:
         """
         Erweiterte Multilateration für beliebig viele Punkte
         Verwendet Weighted Least Squares und Ausreißer-Erkennung
-        Verwendet Weighted Least Squares
+        
+        Args:
+            points: Liste von Dictionaries mit 'x', 'y', 'd' keys (Meter)
         """
         try:
-            n = len(points)
-            
-            # Erstelle Design-Matrix für Least Squares
-            A = np.zeros((n, 2))
-            b = np.zeros(n)
-            weights = np.ones(n)  # Standardgewichte
-            weights = np.ones(n)
-            
-            for i, point in enumerate(points):
-                A[i, 0] = 2 * point['x']
-                A[i, 1] = 2 * point['y']
-                b[i] = (point['x']**2 + point['y']**2 - point['d']**2)
-                
-                # Gewichtung basierend auf Entfernung (nähere Punkte = höhere Genauigkeit)
-                weights[i] = 1.0 / (1.0 + point['d'] / 1000.0)  # Normalisiert auf km
-                weights[i] = 1.0 / (1.0 + point['d'] / 1000.0)
-            
-            # Weighted Least Squares
-            W = np.diag(weights)
-            AtWA = A.T @ W @ A
-            AtWb = A.T @ W @ b
-            
-            if np.linalg.det(AtWA) < 1e-12:
-                return {"error": "Singulare Matrix - Punkte sind ungünstig positioniert"}
-            
-            solution = np.linalg.solve(AtWA, AtWb)
-            x, y = solution[0], solution[1]
-            
-            # Residuals und Fehleranalyse
-            predicted = A @ solution
-            residuals = b - predicted
-            weighted_residuals = np.sqrt(W) @ residuals
-            
-            # Berechne verschiedene Genauigkeitsmetriken
-            rmse = np.sqrt(np.mean(weighted_residuals**2))
-            max_error = np.max(np.abs(weighted_residuals))
-            
-            # Einzelne Entfernungsfehler berechnen
-            # Berechne Genauigkeitsmetriken
-            distance_errors = []
-            for point in points:
-                calculated_dist = math.sqrt((x - point['x'])**2 + (y - point['y'])**2)
-                error = abs(calculated_dist - point['d'])
-                distance_errors.append(error)
-            
-            # Ausreißer-Erkennung (Punkte mit großem Fehler)
-            mean_error = np.mean(distance_errors)
-            std_error = np.std(distance_errors)
-            outliers = []
-            
-            for i, error in enumerate(distance_errors):
-                if error > mean_error + 2 * std_error:
-                    outliers.append({
-                        'point_id': points[i].get('id', i+1),
-                        'error': error,
-                        'distance': points[i]['d']
-                    })
-            
-            # Konfidenz-Score berechnen
-            max_acceptable_error = 50  # 50 Meter
-            confidence = max(0, min(100, 100 * (1 - rmse / max_acceptable_error)))
-            
-            # Verbesserungsvorschläge
-            suggestions = []
-            if len(outliers) > 0:
-                suggestions.append(f"Überprüfen Sie {len(outliers)} Punkte mit hohen Fehlern")
-            if confidence < 50:
-                suggestions.append("Fügen Sie mehr Referenzpunkte hinzu für bessere Genauigkeit")
-            if rmse > 100:
-                suggestions.append("Überprüfen Sie die Entfernungsmessungen")
-            rmse = np.sqrt(np.mean(np.array(distance_errors)**2))
-            confidence = max(0, min(100, 100 * (1 - rmse / 50)))
-            
-            return {
-                "x": x,
-                "y": y,
-                "accuracy": rmse,
-                "method": f"Weighted Least Squares ({n} Punkte)",
-                "confidence": confidence,
-                "max_error": max_error,
-                "mean_error": mean_error,
-                "distance_errors": distance_errors,
-                "outliers": outliers, 
-                "suggestions": suggestions,
-                "residuals": residuals.tolist(),
-                "weights_used": weights.tolist()
-                "confidence": confidence
-            }
-            
+            return AdvancedTriangulationCalculator._solve_cartesian(
+                solver.multilaterate, solver.WLS, points
+            )
         except Exception as e:
             return {"error": f"Multilateration fehlgeschlagen: {str(e)}"}
     
@@ -187,58 +490,19 @@ class AdvancedTriangulationCalculator:
     def trilaterate_3_points(points: List[Dict]) -> Dict[str, Any]:
         """
         Exakte Trilateration für genau 3 Punkte
+        
+        Args:
+            points: Liste von Dictionaries mit 'x', 'y', 'd' keys (Meter)
         """
         try:
-            p1, p2, p3 = points[0], points[1], points[2]
-            
-            # Löse das System linearer Gleichungen
-            A = 2 * (p2['x'] - p1['x'])
-            B = 2 * (p2['y'] - p1['y'])
-            C = (p1['d']**2 - p2['d']**2 - p1['x']**2 + p2['x']**2 - p1['y']**2 + p2['y']**2)
-            D = 2 * (p3['x'] - p2['x'])
-            E = 2 * (p3['y'] - p2['y'])
-            F = (p2['d']**2 - p3['d']**2 - p2['x']**2 + p3['x']**2 - p2['y']**2 + p3['y']**2)
-            
-            denominator = A * E - B * D
-            
-            if abs(denominator) < 1e-10:
-                return {"error": "Punkte sind kollinear oder Konfiguration ist ungültig"}
-            
-            x = (C * E - F * B) / denominator
-            y = (A * F - D * C) / denominator
-            
-            # Verifiziere die Lösung
-            distance_errors = []
-            for point in points:
-                calculated_dist = math.sqrt((x - point['x'])**2 + (y - point['y'])**2)
-                error = abs(calculated_dist - point['d'])
-                distance_errors.append(error)
-            
-            max_error = max(distance_errors)
-            mean_error = np.mean(distance_errors)
-            
-            # Konfidenz basierend auf Fehlern
-            confidence = max(0, min(100, 100 * (1 - max_error / 100)))
-            
-            return {
-                "x": x,
-                "y": y,
-                "accuracy": max_error,
-                "method": "Exakte Trilateration (3 Punkte)",
-                "confidence": confidence,
-                "max_error": max_error,
-                "mean_error": mean_error,
-                "distance_errors": distance_errors,
-                "outliers": [],
-                "suggestions": [] if confidence > 70 else ["Überprüfen Sie die Entfernungsmessungen"]
-                "confidence": confidence
-            }
-            
+            return AdvancedTriangulationCalculator._solve_cartesian(
+                solver.trilaterate, solver.TRILATERATION, points[:3]
+            )
         except Exception as e:
             return {"error": f"Trilateration fehlgeschlagen: {str(e)}"}
     
     @staticmethod
-    def calculate_statistics(result: Dict, points: List[Dict]) -> Dict[str, Any]:
+    def calculate_statistics(result: Dict, points: List[Any]) -> Dict[str, Any]:
         """
         Berechnet erweiterte Statistiken für die Triangulation
         """
@@ -253,6 +517,16 @@ class AdvancedTriangulationCalculator:
             "suggestions": result.get('suggestions', [])
         }
         
+        # Iterative Verfahren: Anzahl Iterationen und Konvergenz
+        if 'iterations' in result:
+            stats['iterations'] = result['iterations']
+            stats['converged'] = result['converged']
+        
+        # Robuste Schätzung: geprüfte Teilmengen und Größe des Konsens
+        if 'hypotheses' in result:
+            stats['hypotheses'] = result['hypotheses']
+            stats['inlier_count'] = len(result['inliers'])
+        
         # Qualitätsbewertung
         accuracy = result.get('accuracy', float('inf'))
         if accuracy < 10:
@@ -304,163 +578,1481 @@ class AdvancedTriangulationCalculator:
         
         return lat, lng
 
-@app.route('/api/triangulate', methods=['POST'])
-def triangulate():
+def parse_coordinates(points: Any, name: str) -> Tuple[Optional[np.ndarray], Optional[str]]:
     """
-    Erweiterte API für Triangulation mit beliebig vielen Punkten
+    Wandelt eine Liste von {"lat": ..., "lng": ...} in ein Array (n, 2)
+    
+    Returns:
+        (Koordinaten, None) oder (None, Fehlermeldung)
     """
+    if not isinstance(points, list) or not points:
+        return None, f"'{name}' muss ein nicht-leeres Array sein"
+    
     try:
-        data = request.get_json()
-        
-        if not data or 'points' not in data:
-            return jsonify({"error": "Ungültige Anfrage - 'points' Array erforderlich"}), 400
-        
-        points = data['points']
-        auto_calculate = data.get('auto_calculate', True)
-        
-        if len(points) < 3:
-            return jsonify({"error": "Mindestens 3 Referenzpunkte erforderlich"}), 400
-        
-        # Validiere Eingabedaten
-        for i, point in enumerate(points):
-            required_fields = ['lat', 'lng', 'distance']
-            for field in required_fields:
-                if field not in point:
-                    return jsonify({"error": f"Punkt {i+1}: '{field}' fehlt"}), 400
-                if not isinstance(point[field], (int, float)):
-                    return jsonify({"error": f"Punkt {i+1}: '{field}' muss eine Zahl sein"}), 400
-            
-            if point['distance'] <= 0:
-                return jsonify({"error": f"Punkt {i+1}: Entfernung muss größer als 0 sein"}), 400
-            
-            if not (-90 <= point['lat'] <= 90):
-                return jsonify({"error": f"Punkt {i+1}: Ungültiger Breitengrad"}), 400
-            
-            if not (-180 <= point['lng'] <= 180):
-                return jsonify({"error": f"Punkt {i+1}: Ungültiger Längengrad"}), 400
-        
-        # Berechne erweiterte Triangulation
-        
-        # Berechne Triangulation
-        result = AdvancedTriangulationCalculator.calculate_position(points)
-        
-        if 'error' in result:
-            return jsonify(result), 400
-        
-        return jsonify(result)
-        
-    except Exception as e:
-        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+        coordinates = np.array([(point['lat'], point['lng']) for point in points], dtype=float)
+    except (KeyError, TypeError, ValueError):
+        return None, f"'{name}': jeder Punkt benötigt numerische 'lat' und 'lng'"
+    
+    invalid = ~(np.isfinite(coordinates).all(axis=1)
+                & (np.abs(coordinates[:, 0]) <= 90) & (np.abs(coordinates[:, 1]) <= 180))
+    if invalid.any():
+        return None, f"'{name}' Punkt {int(invalid.argmax()) + 1}: Ungültige Koordinaten"
+    return coordinates, None
 
-@app.route('/api/triangulate/preview', methods=['POST'])
-def triangulate_preview():
+def parse_region(value: Any) -> Tuple[Optional[np.ndarray], Optional[str]]:
     """
-    Vorschau-Berechnung für Live-Updates während der Eingabe
+    Prüft den optionalen 'region'-Parameter
+    
+    Erlaubt sind {"bbox": [min_lat, min_lng, max_lat, max_lng]} oder
+    {"polygon": [{"lat": ..., "lng": ...}, ...]} mit mindestens 3 Eckpunkten.
+    
+    Returns:
+        (Eckpunkte (V, 2) oder None, Fehlermeldung oder None)
     """
-    try:
-        data = request.get_json()
-        points = data.get('points', [])
-        
-        if len(points) < 3:
-            return jsonify({
-                "ready": False, 
-                "points_needed": 3 - len(points),
-                "message": f"Noch {3 - len(points)} Punkt(e) erforderlich"
-            })
-        
-        # Schnelle Berechnung für Vorschau
-        result = AdvancedTriangulationCalculator.calculate_position(points)
-        
-        if 'error' in result:
-            return jsonify({"ready": False, "error": result['error']})
-        
-        return jsonify({
-            "ready": True,
-            "preview": {
-                "lat": result['lat'],
-                "lng": result['lng'],
-                "accuracy": result['accuracy'],
-                "confidence": result.get('confidence', 0),
-                "point_count": len(points)
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({"ready": False, "error": str(e)})
+    if value is None:
+        return None, None
+    if not isinstance(value, dict) or ('bbox' in value) == ('polygon' in value):
+        return None, "'region' muss ein Objekt mit 'bbox' oder 'polygon' sein"
+    
+    if 'bbox' in value:
+        bbox = value['bbox']
+        if not isinstance(bbox, list) or len(bbox) != 4 \
+                or not all(isinstance(part, (int, float)) and not isinstance(part, bool) for part in bbox):
+            return None, "'bbox' muss [min_lat, min_lng, max_lat, max_lng] sein"
+        min_lat, min_lng, max_lat, max_lng = (float(part) for part in bbox)
+        if not (-90 <= min_lat < max_lat <= 90 and -180 <= min_lng < max_lng <= 180):
+            return None, "'bbox': Ungültige Koordinaten oder Minimum nicht kleiner als Maximum"
+        return region.bbox_polygon(min_lat, min_lng, max_lat, max_lng), None
+    
+    polygon, error = parse_coordinates(value['polygon'], 'polygon')
+    if error:
+        return None, error
+    if not 3 <= len(polygon) <= region.MAX_REGION_VERTICES:
+        return None, f"'polygon' benötigt 3 bis {region.MAX_REGION_VERTICES} Eckpunkte"
+    return polygon, None
 
-@app.route('/api/points/validate', methods=['POST'])
-def validate_points():
+def distance_options(data: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
     """
-    Validiert Referenzpunkte und gibt Empfehlungen
+    Liest 'mode' und 'format' einer Entfernungsanfrage
+    
+    Ohne 'format' entscheidet der Accept-Header, Standard ist JSON.
+    
+    Returns:
+        (mode, format, Fehlermeldung oder None)
     """
-    try:
-        data = request.get_json()
-        points = data.get('points', [])
-        
-        if len(points) < 2:
-            return jsonify({"valid": True, "suggestions": []})
-        
-        suggestions = []
-        warnings = []
-        
-        # Prüfe Punktverteilung
-        if len(points) >= 3:
-            # Berechne geometrische Verteilung
-            distances = []
-            for i in range(len(points)):
-                for j in range(i+1, len(points)):
-                    p1, p2 = points[i], points[j]
-                    dist = math.sqrt((p1['lat'] - p2['lat'])**2 + (p1['lng'] - p2['lng'])**2)
-                    distances.append(dist)
-            
-            min_dist = min(distances) * 111000  # Ungefähr Meter
-            max_dist = max(distances) * 111000
-            
-            if min_dist < 100:  # Punkte zu nah beieinander
-                warnings.append("Einige Referenzpunkte sind sehr nah beieinander (< 100m)")
-                suggestions.append("Verteilen Sie die Punkte weiter für bessere Genauigkeit")
-            
-            if max_dist / min_dist > 20:  # Sehr ungleiche Verteilung
-                warnings.append("Ungleiche Punktverteilung erkannt")
-                suggestions.append("Versuchen Sie eine gleichmäßigere Verteilung der Referenzpunkte")
-        
-        # Prüfe Entfernungsbereiche
-        distances = [p['distance'] for p in points]
-        if len(distances) > 1:
-            min_range = min(distances)
-            max_range = max(distances)
-            
-            if max_range / min_range > 10:
-                warnings.append("Sehr unterschiedliche Entfernungsbereiche")
-                suggestions.append("Ähnliche Entfernungsbereiche führen zu besserer Genauigkeit")
-        
-        # Empfehlungen für Punktanzahl
-        if len(points) < 4:
-            suggestions.append("4 oder mehr Punkte verbessern die Genauigkeit erheblich")
-        elif len(points) > 10:
-            suggestions.append("Mehr als 10 Punkte verbessern die Genauigkeit nur noch minimal")
-        
-        return jsonify({
-            "valid": len(warnings) == 0,
-            "warnings": warnings,
-            "suggestions": suggestions,
-            "point_count": len(points),
-            "recommended_count": min(8, max(4, len(points)))
-        })
-        
-    except Exception as e:
-        return jsonify({"valid": False, "error": str(e)})
+    mode = data.get('mode', geometry.HAVERSINE)
+    if mode not in geometry.DISTANCE_MODES:
+        return mode, '', f"Unbekannter Modus '{mode}' - erlaubt: {', '.join(geometry.DISTANCE_MODES)}"
+    
+    output = data.get('format')
+    if output is None:
+        accepted = request.accept_mimetypes.best_match(['application/json', *DISTANCE_MEDIA_TYPES])
+        output = DISTANCE_MEDIA_TYPES.get(accepted, 'json')
+    if output not in DISTANCE_FORMATS:
+        return mode, output, f"Unbekanntes Format '{output}' - erlaubt: {', '.join(DISTANCE_FORMATS)}"
+    return mode, output, None
 
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    """Health Check Endpoint für Render.com und Docker"""
-    return jsonify({
-        "status": "healthy", 
-        "message": "Advanced Triangulation API läuft",
-        "version": "2.0.0"
-    })
+def matrix_blocks(origins: np.ndarray, destinations: np.ndarray,
+                  mode: str) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Entfernungsmatrix in Zeilenblöcken von höchstens DISTANCE_BLOCK_CELLS Werten
+    
+    Returns:
+        Generator von (erste Zeile, Block (rows, len(destinations)))
+    """
+    rows = max(1, DISTANCE_BLOCK_CELLS // len(destinations))
+    for start in range(0, len(origins), rows):
+        block = origins[start:start + rows]
+        yield start, geometry.distances(
+            block[:, None, 0], block[:, None, 1],
+            destinations[None, :, 0], destinations[None, :, 1], mode
+        )
 
-@app.route('/health', methods=['GET'])
+def binary_response(blocks: Iterable[np.ndarray], headers: Dict[str, Any]) -> Response:
+    """Streamt Blöcke als float64 little-endian"""
+    return Response(
+        stream_with_context(block.astype('<f8').tobytes() for block in blocks),
+        mimetype='application/octet-stream',
+        headers={name: str(value) for name, value in headers.items()}
+    )
+
+def parse_uncertainty(options: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Prüft den optionalen 'uncertainty'-Parameter
+    
+    Erlaubt sind true, "analytic", "monte_carlo" oder ein Objekt mit
+    mode, sigma, relative, distribution und samples.
+    
+    Returns:
+        (Optionen oder None, Fehlermeldung oder None)
+    """
+    if options is None or options is False:
+        return None, None
+    if options is True:
+        options = {}
+    elif isinstance(options, str):
+        options = {"mode": options}
+    elif not isinstance(options, dict):
+        return None, "'uncertainty' muss true, ein Modus oder ein Objekt sein"
+    
+    mode = options.get('mode', uncertainty.ANALYTIC)
+    if mode not in uncertainty.UNCERTAINTY_MODES:
+        return None, f"Unbekannter Unsicherheitsmodus '{mode}' - erlaubt: {', '.join(uncertainty.UNCERTAINTY_MODES)}"
+    
+    distribution = options.get('distribution', uncertainty.GAUSSIAN)
+    if distribution not in uncertainty.DISTRIBUTIONS:
+        return None, f"Unbekannte Verteilung '{distribution}' - erlaubt: {', '.join(uncertainty.DISTRIBUTIONS)}"
+    
+    sigma = options.get('sigma', UNCERTAINTY_SIGMA)
+    relative = options.get('relative', 0.0)
+    samples = options.get('samples', uncertainty.MONTE_CARLO_SAMPLES)
+    if any(isinstance(value, bool) or not isinstance(value, (int, float)) for value in (sigma, relative)) \
+            or sigma < 0 or relative < 0 or sigma + relative <= 0:
+        return None, "'sigma' und 'relative' müssen nicht-negative Zahlen sein, mindestens eine größer 0"
+    if isinstance(samples, bool) or not isinstance(samples, int) or not 1 <= samples <= MONTE_CARLO_MAX_SAMPLES:
+        return None, f"'samples' muss zwischen 1 und {MONTE_CARLO_MAX_SAMPLES} liegen"
+    
+    return {
+        "mode": mode,
+        "noise": uncertainty.NoiseModel(float(sigma), float(relative), distribution),
+        "samples": samples
+    }, None
+
+def estimate_uncertainty(points: Union[List[Dict], np.ndarray], result: Dict[str, Any], method: str,
+                         options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Unsicherheit einer berechneten Position (siehe uncertainty)
+    
+    Bei RANSAC gehen analytisch nur die Inlier ein.
+    """
+    data = point_array(points)
+    if options["mode"] == uncertainty.MONTE_CARLO:
+        return uncertainty.monte_carlo(
+            data, result['lat'], result['lng'], options["noise"], method,
+            options["samples"], MONTE_CARLO_BUDGET, projection_mode=PROJECTION
+        )
+    
+    used = None
+    if 'inliers' in result:
+        used = np.zeros(len(data), dtype=bool)
+        used[np.asarray(result['inliers']) - 1] = True
+    return uncertainty.analytic(data, result['lat'], result['lng'], options["noise"], used)
+
+def request_data(wire_format: Optional[str]) -> Tuple[Any, Optional[str]]:
+    """
+    Liest einen JSON- oder MessagePack-Body (siehe wire)
+    
+    Returns:
+        (Daten, Fehlermeldung oder None)
+    """
+    if wire_format == wire.MSGPACK:
+        try:
+            return wire.decode(request.get_data()), None
+        except Exception:
+            return None, "Ungültiges MessagePack"
+    return request.get_json(), None
+
+def response_format() -> str:
+    """
+    Antwortformat nach Accept-Header; JSON, wenn nichts anderes verlangt ist
+    """
+    accepted = request.accept_mimetypes.best_match(list(wire.MEDIA_TYPES))
+    return wire.MEDIA_TYPES.get(accepted, wire.JSON)
+
+def encode_response(value: Any, wire_format: str, table: Optional[np.ndarray] = None) -> Response:
+    """
+    Antwort im ausgehandelten Format
+    
+    Gepackt wird nur eine Ergebnistabelle (siehe wire.PACKED_FIELDS);
+    ohne Tabelle, z.B. bei Fehlern, wird JSON gesendet.
+    """
+    if wire_format == wire.MSGPACK:
+        return Response(wire.encode(value), mimetype=wire.CONTENT_TYPES[wire.MSGPACK])
+    if wire_format == wire.PACKED and table is not None:
+        return Response(table.astype(wire.PACKED_DTYPE, copy=False).tobytes(),
+                        mimetype=wire.CONTENT_TYPES[wire.PACKED],
+                        headers={"X-Result-Fields": ','.join(wire.PACKED_FIELDS),
+                                 "X-Result-Count": str(len(table))})
+    return jsonify(value)
+
+def solve_packed_sets(data: np.ndarray, method: str = solver.WLS) -> np.ndarray:
+    """
+    Ergebnistabelle für gepackte Punktmengen (B, n, 3), blockweise wie calculate_batch
+    """
+    serial = len(data) < PARALLEL_MIN_SETS or not solve_pool.enabled
+    chunk_size = max(len(data), 1) if serial else PARALLEL_CHUNK_SIZE
+    tables = list(solve_pool.imap(
+        AdvancedTriangulationCalculator.solve_array_table,
+        ((data[start:start + chunk_size], method) for start in range(0, len(data), chunk_size)),
+        serial=serial
+    ))
+    return np.concatenate(tables) if tables else np.empty((0, len(wire.PACKED_FIELDS)))
+
+def validate_point_list(points: Any, min_points: int = 3) -> Optional[str]:
+    """
+    Prüft eine Punktliste und liefert die erste Fehlermeldung oder None
+    """
+    if not isinstance(points, list):
+        return "'points' muss ein Array sein"
+    
+    if len(points) < min_points:
+        if min_points == 1:
+            return "Mindestens ein Referenzpunkt erforderlich"
+        return f"Mindestens {min_points} Referenzpunkte erforderlich"
+    
+    for i, point in enumerate(points):
+        error = validate_point(point)
+        if error:
+            return f"Punkt {i+1}: {error}"
+    
+    return None
+
+def point_array(points: Union[List[Dict], np.ndarray]) -> np.ndarray:
+    """
+    Punkte als (n, 3)-Array; gepackte Arrays werden ohne Kopie übernommen
+    """
+    return points if isinstance(points, np.ndarray) else solver.points_to_array(points)
+
+def valid_point_rows(data: np.ndarray) -> np.ndarray:
+    """
+    Maske (...) der gültigen Zeilen eines Arrays (..., 3), Regeln wie validate_point
+    """
+    lat, lng, distance = data[..., 0], data[..., 1], data[..., 2]
+    return (distance > 0) & np.isfinite(distance) & (np.abs(lat) <= 90) & (np.abs(lng) <= 180)
+
+def validate_point_array(data: np.ndarray, min_points: int = 3) -> Optional[str]:
+    """
+    Prüft gepackte Punkte (n, 3) vektorisiert; Meldungen wie validate_point_list
+    """
+    if len(data) < min_points:
+        return f"Mindestens {min_points} Referenzpunkte erforderlich"
+    
+    invalid = np.flatnonzero(~valid_point_rows(data))
+    if len(invalid) == 0:
+        return None
+    
+    i = int(invalid[0])
+    lat, lng, distance = data[i].tolist()
+    missing = [field for field, value in zip(('lat', 'lng', 'distance'), data[i]) if not np.isfinite(value)]
+    if missing:
+        error = f"'{missing[0]}' muss eine Zahl sein"
+    elif not distance > 0:
+        error = "Entfernung muss größer als 0 sein"
+    elif not -90 <= lat <= 90:
+        error = "Ungültiger Breitengrad"
+    else:
+        error = "Ungültiger Längengrad"
+    return f"Punkt {i+1}: {error}"
+
+def validate_points_value(points: Any) -> Tuple[Any, Optional[str]]:
+    """
+    Prüft eine Punktliste, die auch gepackt (MessagePack-Binärwert) sein darf
+    
+    Returns:
+        (Punktliste oder Array (n, 3), Fehlermeldung oder None)
+    """
+    if isinstance(points, (bytes, bytearray)):
+        try:
+            points = wire.unpack_points(points)
+        except ValueError as e:
+            return None, str(e)
+    if isinstance(points, np.ndarray):
+        return points, validate_point_array(points)
+    return points, validate_point_list(points)
+
+def validate_point(point: Any) -> Optional[str]:
+    """
+    Prüft einen einzelnen Referenzpunkt
+    """
+    if not isinstance(point, dict):
+        return "Ungültiges Format"
+    
+    required_fields = ['lat', 'lng', 'distance']
+    for field in required_fields:
+        if field not in point:
+            return f"'{field}' fehlt"
+        if not isinstance(point[field], (int, float)):
+            return f"'{field}' muss eine Zahl sein"
+    
+    if point['distance'] <= 0:
+        return "Entfernung muss größer als 0 sein"
+    
+    if not (-90 <= point['lat'] <= 90):
+        return "Ungültiger Breitengrad"
+    
+    if not (-180 <= point['lng'] <= 180):
+        return "Ungültiger Längengrad"
+    
+    return None
+
+def validate_method(method: Any) -> Optional[str]:
+    """
+    Prüft den optionalen 'method'-Parameter (siehe solver.METHODS)
+    """
+    if method not in solver.METHODS:
+        return f"Unbekannte Methode '{method}' - erlaubt: {', '.join(solver.METHODS)}"
+    return None
+
+def solve_point_sets(entries: List[Any], method: str = solver.WLS,
+                     polygon: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """
+    Prüft und löst Batch-Einträge (Punktliste oder {"points": [...]})
+    
+    Ungültige Einträge erhalten ein Ergebnis mit 'error', alle gültigen
+    werden gemeinsam über calculate_batch gelöst.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(entries)
+    valid_sets = {}
+    
+    with stage('validate'):
+        for i, entry in enumerate(entries):
+            points = entry.get('points') if isinstance(entry, dict) else entry
+            points, error = validate_points_value(points)
+            if error:
+                results[i] = {"error": error}
+            else:
+                valid_sets[i] = points
+    
+    with stage('solve'):
+        solved = AdvancedTriangulationCalculator.calculate_batch(
+            list(valid_sets.values()), method, polygon
+        )
+    for i, result in zip(valid_sets, solved):
+        results[i] = result
+    
+    return results
+
+def stream_results(lines: Iterable[Union[str, bytes]], method: str = solver.WLS,
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Löst NDJSON-Punktmengen blockweise und liefert Ergebnisse als NDJSON
+    
+    Jede Eingabezeile ist eine Punktliste oder {"id": ..., "points": [...]};
+    Leerzeilen werden übersprungen. Es werden nie mehr als chunk_size
+    Zeilen pro Block gehalten, der Speicherbedarf ist unabhängig von
+    der Eingabelänge. Ab dem zweiten Block werden die Blöcke als Rohtext
+    auf den Prozesspool verteilt, einschließlich JSON-Verarbeitung.
+    
+    Returns:
+        Generator von Ausgabeblöcken (je eine oder mehrere Zeilen) in
+        Eingabereihenfolge: Ergebnis wie /api/triangulate, ergänzt um
+        "line" (1-basiert) und ggf. "id"
+    """
+    for block, _ in stream_blocks(lines, method, chunk_size):
+        yield block
+
+def stream_blocks(lines: Iterable[Union[str, bytes]], method: str = solver.WLS,
+                  chunk_size: int = STREAM_CHUNK_SIZE,
+                  parallel: bool = False) -> Iterator[Tuple[str, int]]:
+    """
+    Wie stream_results, liefert aber (Block, Anzahl Fehlerergebnisse im Block)
+
+    Args:
+        parallel: auch einen einzelnen Block im Prozesspool lösen (Jobs),
+            statt ihn im aufrufenden Thread zu rechnen
+    """
+    chunks = _read_chunks(lines, chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+    
+    tasks = ((chunk, method) for chunk in itertools.chain((first,), (second,) if second else (), chunks))
+    yield from solve_pool.imap(_stream_chunk, tasks, serial=second is None and not parallel)
+
+def _read_chunks(lines: Iterable[Union[str, bytes]],
+                 chunk_size: int) -> Iterator[List[Tuple[int, Union[str, bytes]]]]:
+    """
+    Fasst nicht-leere Zeilen mit ihrer Zeilennummer zu Blöcken zusammen
+    """
+    chunk: List[Tuple[int, Union[str, bytes]]] = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        chunk.append((number, line))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    
+    if chunk:
+        yield chunk
+
+def _stream_chunk(chunk: List[Tuple[int, Union[str, bytes]]], method: str) -> Tuple[str, int]:
+    """
+    Löst einen Block von NDJSON-Zeilen und serialisiert die Ergebnisse
+    
+    Läuft auch in Pool-Prozessen.
+    
+    Returns:
+        (NDJSON-Block, Anzahl Zeilen mit 'error')
+    """
+    headers = []
+    entries = []
+    for number, line in chunk:
+        header = {"line": number}
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            entry = None
+            header["error"] = "Ungültiges JSON"
+        if isinstance(entry, dict) and 'id' in entry:
+            header["id"] = entry['id']
+        headers.append(header)
+        entries.append(entry)
+    
+    lines = []
+    failed = 0
+    for header, result in zip(headers, solve_point_sets(entries, method)):
+        if 'error' not in header:
+            header.update(result)
+        failed += 'error' in header
+        lines.append(json.dumps(header) + '\n')
+    return ''.join(lines), failed
+
+@app.route('/api/triangulate', methods=['POST'])
+def triangulate():
+    """
+    Erweiterte API für Triangulation mit beliebig vielen Punkten
+    
+    Neben JSON nimmt der Endpunkt MessagePack und gepackte float64-Punkte
+    (application/octet-stream, Methode über ?method=) an und antwortet
+    je nach Accept-Header in JSON, MessagePack oder als Ergebniszeile
+    (siehe wire).
+    
+    Optional "region": {"bbox": [...]} oder {"polygon": [...]} beschränkt
+    die Lösung auf ein Gebiet (siehe parse_region und region).
+    """
+    try:
+        wire_format = wire.request_format(request.mimetype)
+        output = response_format()
+        with stage('parse'):
+            if wire_format == wire.PACKED:
+                data = {
+                    "points": request.get_data(),
+                    "method": request.args.get('method', solver.WLS),
+                    "uncertainty": request.args.get('uncertainty')
+                }
+            else:
+                data, error = request_data(wire_format)
+                if error:
+                    return encode_response({"error": error}, output), 400
+        
+        if not data or 'points' not in data:
+            return encode_response({"error": "Ungültige Anfrage - 'points' Array erforderlich"}, output), 400
+        
+        auto_calculate = data.get('auto_calculate', True)
+        method = data.get('method', solver.WLS)
+        
+        with stage('validate'):
+            points, error = validate_points_value(data['points'])
+            error = error or validate_method(method)
+            options, uncertainty_error = parse_uncertainty(data.get('uncertainty'))
+            polygon, region_error = parse_region(data.get('region'))
+        error = error or uncertainty_error or region_error
+        if not error and polygon is not None and options is not None \
+                and options["mode"] == uncertainty.MONTE_CARLO:
+            error = "Monte-Carlo-Unsicherheit ist mit 'region' nicht verfügbar"
+        if error:
+            return encode_response({"error": error}, output), 400
+        
+        # Berechne erweiterte Triangulation
+        result = AdvancedTriangulationCalculator.calculate_position(points, method, polygon)
+        
+        # Zwischengespeicherte Ergebnisse nicht verändern
+        if options is not None and 'error' not in result:
+            with stage('uncertainty'):
+                result = {**result, "uncertainty": estimate_uncertainty(points, result, method, options)}
+        
+        with stage('serialize'):
+            if 'error' in result:
+                return encode_response(result, output), 400
+            if output == wire.PACKED:
+                return encode_response(None, output, wire.results_table([result]))
+            return encode_response(result, output)
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/triangulate/batch', methods=['POST'])
+def triangulate_batch():
+    """
+    Batch-Triangulation für viele unabhängige Punktmengen pro Anfrage
+    
+    Erwartet {"point_sets": [[...], [...]]}; Einträge dürfen auch
+    Objekte der Form {"points": [...]} sein. Optional "method": "wls" | "lm" | "ransac"
+    und "region" (siehe triangulate) für alle Punktmengen.
+    
+    Als MessagePack dürfen Punktlisten gepackte Binärwerte sein; als
+    application/octet-stream ist der Body ein Array (B, n, 3) mit n über
+    ?n= (siehe triangulate_packed_batch). Das Antwortformat folgt dem
+    Accept-Header.
+    """
+    try:
+        wire_format = wire.request_format(request.mimetype)
+        output = response_format()
+        if wire_format == wire.PACKED:
+            return triangulate_packed_batch(output)
+        
+        with stage('parse'):
+            data, error = request_data(wire_format)
+        if error:
+            return encode_response({"error": error}, output), 400
+        
+        if not data or not isinstance(data.get('point_sets'), list):
+            return encode_response({"error": "Ungültige Anfrage - 'point_sets' Array erforderlich"}, output), 400
+        
+        point_sets = data['point_sets']
+        method = data.get('method', solver.WLS)
+        
+        if len(point_sets) > MAX_BATCH_SIZE:
+            return encode_response({"error": f"Maximal {MAX_BATCH_SIZE} Punktmengen pro Anfrage"}, output), 400
+        
+        polygon, error = parse_region(data.get('region'))
+        error = validate_method(method) or error
+        if error:
+            return encode_response({"error": error}, output), 400
+        
+        timer = current_timer()
+        if timer is not None:
+            timer.label(method if polygon is None else solver.REGION)
+        results = solve_point_sets(point_sets, method, polygon)
+        
+        with stage('serialize'):
+            return batch_response(results, output)
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+def batch_response(results: List[Dict[str, Any]], output: str) -> Response:
+    """Antwort eines Batches im ausgehandelten Format"""
+    if output == wire.PACKED:
+        return encode_response(None, output, wire.results_table(results))
+    return encode_response({
+        "results": results,
+        "count": len(results),
+        "failed": sum(1 for result in results if 'error' in result)
+    }, output)
+
+def triangulate_packed_batch(output: str) -> Response:
+    """
+    Batch aus gepackten Punktmengen: Body float64 (B, n, 3), ?n= und ?method=
+    
+    Die Prüfung läuft vektorisiert über alle Punktmengen. Bei gepackter
+    Antwort wird ohne Ergebnis-Dictionaries direkt aus den Solver-Arrays
+    gepackt; ungültige Punktmengen haben valid = 0.
+    """
+    method = request.args.get('method', solver.WLS)
+    n = request.args.get('n', type=int)
+    error = validate_method(method)
+    if n is None or n < 3:
+        error = "'n' (Punkte pro Punktmenge, mindestens 3) erforderlich"
+    if error:
+        return encode_response({"error": error}, output), 400
+    
+    with stage('parse'):
+        try:
+            data = wire.unpack_points(request.get_data(), n)
+        except ValueError as e:
+            return encode_response({"error": str(e)}, output), 400
+    if len(data) > MAX_BATCH_SIZE:
+        return encode_response({"error": f"Maximal {MAX_BATCH_SIZE} Punktmengen pro Anfrage"}, output), 400
+    
+    timer = current_timer()
+    if timer is not None:
+        timer.label(method)
+    if output != wire.PACKED:
+        results = solve_point_sets(list(data), method)
+        with stage('serialize'):
+            return batch_response(results, output)
+    
+    with stage('validate'):
+        valid = valid_point_rows(data).all(axis=1)
+    with stage('solve'):
+        table = np.full((len(data), len(wire.PACKED_FIELDS)), np.nan)
+        table[:, 0] = 0.0
+        table[valid] = solve_packed_sets(data[valid], method)
+    with stage('serialize'):
+        return encode_response(None, output, table)
+
+@app.route('/api/triangulate/stream', methods=['POST'])
+def triangulate_stream():
+    """
+    Streaming-Triangulation für große Offline-Jobs
+    
+    Erwartet NDJSON im Request-Body (eine Punktmenge pro Zeile, siehe
+    stream_results) und antwortet zeilenweise als application/x-ndjson.
+    Optional ?method=wls|lm|ransac und ?chunk_size=N.
+    """
+    method = request.args.get('method', solver.WLS)
+    error = validate_method(method)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    chunk_size = request.args.get('chunk_size', STREAM_CHUNK_SIZE, type=int)
+    if not 1 <= chunk_size <= MAX_BATCH_SIZE:
+        return jsonify({"error": f"'chunk_size' muss zwischen 1 und {MAX_BATCH_SIZE} liegen"}), 400
+    
+    return Response(
+        stream_with_context(stream_results(request.stream, method, chunk_size)),
+        mimetype='application/x-ndjson'
+    )
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Reiht einen großen Batch als asynchronen Job ein
+    
+    Erwartet {"point_sets": [...], "method": ...} wie /api/triangulate/batch
+    oder NDJSON (Content-Type application/x-ndjson, Methode über ?method=)
+    wie /api/triangulate/stream. Die Eingabe wird sofort auf die Platte
+    geschrieben; Antwort 202 mit Job-ID, Status unter /api/jobs/<id>.
+    """
+    try:
+        if request.mimetype == 'application/x-ndjson':
+            method = request.args.get('method', solver.WLS)
+            lines = request.stream
+        else:
+            with stage('parse'):
+                data = request.get_json(silent=True)
+            if not isinstance(data, dict) or not isinstance(data.get('point_sets'), list):
+                return jsonify({"error": "Ungültige Anfrage - 'point_sets' Array oder NDJSON erforderlich"}), 400
+            method = data.get('method', solver.WLS)
+            lines = (json.dumps(entry).encode() for entry in data['point_sets'])
+        
+        error = validate_method(method)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        with stage('store'):
+            try:
+                state = job_queue.submit(lines, method, JOB_MAX_SETS)
+            except OverflowError as e:
+                return jsonify({"error": str(e)}), 429
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        response = jsonify(state)
+        response.headers['Location'] = f"/api/jobs/{state['job_id']}"
+        return response, 202
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    """
+    Status, Fortschritt und bisher vorliegende Ergebnisse eines Jobs
+    
+    Ergebnisse seitenweise über ?offset=N&limit=M (Standard 0 und
+    JOB_PAGE_SIZE), jeweils mit "line" wie /api/triangulate/stream;
+    'next_offset' ist der Offset der nächsten noch fehlenden Seite.
+    """
+    offset = request.args.get('offset', 0, type=int)
+    limit = request.args.get('limit', JOB_PAGE_SIZE, type=int)
+    if offset < 0 or not 0 <= limit <= MAX_BATCH_SIZE:
+        return jsonify({"error": f"'offset' muss >= 0 und 'limit' zwischen 0 und {MAX_BATCH_SIZE} sein"}), 400
+    
+    state = job_queue.get(job_id)
+    if state is None:
+        return jsonify({"error": "Job nicht gefunden oder abgelaufen"}), 404
+    
+    with stage('results'):
+        results = [json.loads(line) for line in job_queue.results(job_id, offset, limit)] if limit else []
+    state.update(results=results, offset=offset, next_offset=offset + len(results))
+    return jsonify(state)
+
+@app.route('/api/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id: str):
+    """Alle bisher vorliegenden Ergebnisse eines Jobs als NDJSON"""
+    if job_queue.get(job_id) is None:
+        return jsonify({"error": "Job nicht gefunden oder abgelaufen"}), 404
+    return Response(job_queue.results(job_id), mimetype='application/x-ndjson')
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id: str):
+    """Bricht einen Job ab bzw. löscht seine Ergebnisse"""
+    if not job_queue.cancel(job_id):
+        return jsonify({"error": "Job nicht gefunden oder abgelaufen"}), 404
+    return jsonify({"deleted": True, "job_id": job_id})
+
+@app.route('/api/triangulate/preview', methods=['POST'])
+def triangulate_preview():
+    """
+    Vorschau-Berechnung für Live-Updates während der Eingabe
+    """
+    try:
+        with stage('parse'):
+            data = request.get_json()
+        points = data.get('points', [])
+        
+        if len(points) < 3:
+            return jsonify({
+                "ready": False, 
+                "points_needed": 3 - len(points),
+                "message": f"Noch {3 - len(points)} Punkt(e) erforderlich"
+            })
+        
+        method = data.get('method', solver.WLS)
+        error = validate_method(method)
+        if error:
+            return jsonify({"ready": False, "error": error})
+        
+        # Schnelle Berechnung für Vorschau
+        result = AdvancedTriangulationCalculator.calculate_position(points, method)
+        
+        if 'error' in result:
+            return jsonify({"ready": False, "error": result['error']})
+        
+        preview = {
+            "lat": result['lat'],
+            "lng": result['lng'],
+            "accuracy": result['accuracy'],
+            "confidence": result.get('confidence', 0),
+            "point_count": len(points)
+        }
+        if 'iterations' in result['statistics']:
+            preview['iterations'] = result['statistics']['iterations']
+        
+        with stage('serialize'):
+            return jsonify({
+                "ready": True,
+                "preview": preview
+            })
+        
+    except Exception as e:
+        return jsonify({"ready": False, "error": str(e)})
+
+def session_state(session: SolveSession) -> Dict[str, Any]:
+    """
+    Kompakter Zustand einer Sitzung im Format der Vorschau
+    """
+    point_count = len(session.point_ids)
+    state = {
+        "session_id": session.session_id,
+        "point_ids": session.point_ids,
+        "point_count": point_count
+    }
+    
+    result = session.solve(PROJECTION)
+    if result is None:
+        state.update({
+            "ready": False,
+            "points_needed": 3 - point_count,
+            "message": f"Noch {3 - point_count} Punkt(e) erforderlich"
+        })
+        return state
+    
+    if not result.valid:
+        formatted = AdvancedTriangulationCalculator.format_result(
+            result, session.points[:, 2].tolist()
+        )
+        state.update({"ready": False, "error": formatted['error']})
+        return state
+    
+    state.update({
+        "ready": True,
+        "preview": {
+            "lat": result.lat,
+            "lng": result.lng,
+            "accuracy": result.accuracy,
+            "confidence": result.confidence,
+            "point_count": point_count
+        }
+    })
+    return state
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """
+    Legt eine Live-Sitzung an, optional mit Startpunkten
+    
+    Erwartet {"points": [...]} (darf leer sein oder fehlen).
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        points = data.get('points', [])
+        
+        error = validate_point_list(points, min_points=0)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        session = session_store.create()
+        with session.lock:
+            if points:
+                session.add(solver.points_to_array(points))
+            return jsonify(session_state(session)), 201
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/sessions/<session_id>', methods=['GET'])
+def get_session(session_id: str):
+    """
+    Vollständiges Triangulationsergebnis einer Sitzung
+    
+    Entspricht der Antwort von /api/triangulate; 'point_id' in
+    'outliers' bezieht sich auf die Punkt-IDs der Sitzung.
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        return jsonify({"error": "Sitzung nicht gefunden oder abgelaufen"}), 404
+    
+    try:
+        with session.lock:
+            point_ids = session.point_ids
+            result = session.solve(PROJECTION)
+            if result is None:
+                return jsonify({"error": "Mindestens 3 Referenzpunkte erforderlich"}), 400
+            
+            distances = session.points[:, 2].tolist()
+        
+        response = AdvancedTriangulationCalculator.format_response(result, distances)
+        if 'error' in response:
+            return jsonify(response), 400
+        
+        for outlier in response['outliers']:
+            outlier['point_id'] = point_ids[outlier['point_id'] - 1]
+        response['session_id'] = session_id
+        response['point_ids'] = point_ids
+        return jsonify(response)
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/sessions/<session_id>/points', methods=['PATCH'])
+def update_session_points(session_id: str):
+    """
+    Inkrementelle Änderung der Punkte einer Sitzung
+    
+    Erwartet {"add": [...], "update": [{"id": 1, "lat": ..., "lng": ...,
+    "distance": ...}], "remove": [2, 3]}; alle Felder optional. Änderungen
+    werden erst nach vollständiger Prüfung angewendet (Reihenfolge:
+    remove, update, add). Liefert den Sitzungszustand mit neuer Position.
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        return jsonify({"error": "Sitzung nicht gefunden oder abgelaufen"}), 404
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        add = data.get('add', [])
+        update = data.get('update', [])
+        remove = data.get('remove', [])
+        
+        if not all(isinstance(field, list) for field in (add, update, remove)):
+            return jsonify({"error": "'add', 'update' und 'remove' müssen Arrays sein"}), 400
+        
+        error = validate_point_list(add, min_points=0)
+        if error:
+            return jsonify({"error": f"add: {error}"}), 400
+        
+        with session.lock:
+            for point_id in remove:
+                if not session.has_point(point_id):
+                    return jsonify({"error": f"remove: Punkt-ID {point_id} unbekannt"}), 400
+            
+            for i, point in enumerate(update):
+                error = validate_point(point)
+                if not error and not session.has_point(point.get('id')):
+                    error = f"Punkt-ID {point.get('id')} unbekannt"
+                if not error and point['id'] in remove:
+                    error = f"Punkt-ID {point['id']} wird entfernt"
+                if error:
+                    return jsonify({"error": f"update: Punkt {i+1}: {error}"}), 400
+            
+            if remove:
+                session.remove(remove)
+            for point in update:
+                session.update(point['id'], solver.points_to_array([point])[0])
+            added_ids = session.add(solver.points_to_array(add)) if add else []
+            
+            state = session_state(session)
+        
+        state['added_ids'] = added_ids
+        return jsonify(state)
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id: str):
+    """Beendet eine Sitzung"""
+    if not session_store.delete(session_id):
+        return jsonify({"error": "Sitzung nicht gefunden oder abgelaufen"}), 404
+    return jsonify({"deleted": True, "session_id": session_id})
+
+def parse_bbox(value: Optional[str]) -> Tuple[Optional[Tuple[float, float, float, float]], Optional[str]]:
+    """Liest ?bbox=min_lat,min_lng,max_lat,max_lng"""
+    if value is None:
+        return None, None
+    try:
+        bbox = tuple(float(part) for part in value.split(','))
+    except ValueError:
+        bbox = ()
+    if len(bbox) != 4 or not all(math.isfinite(part) for part in bbox):
+        return None, "'bbox' muss 'min_lat,min_lng,max_lat,max_lng' sein"
+    if bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+        return None, "'bbox': Minimum größer als Maximum"
+    return bbox, None
+
+def validate_project_fields(data: Dict[str, Any]) -> Optional[str]:
+    """Prüft name, description und settings eines Projekts"""
+    for field in ('name', 'description'):
+        if field in data and (not isinstance(data[field], str) or len(data[field]) > MAX_PROJECT_TEXT):
+            return f"'{field}' muss ein Text mit höchstens {MAX_PROJECT_TEXT} Zeichen sein"
+    if 'name' in data and not data['name'].strip():
+        return "'name' darf nicht leer sein"
+    if 'settings' in data and not isinstance(data['settings'], dict):
+        return "'settings' muss ein Objekt sein"
+    return None
+
+def validate_project_points(points: Any) -> Optional[str]:
+    """Wie validate_point_list, zusätzlich optionaler Punktname"""
+    error = validate_point_list(points, min_points=0)
+    if error:
+        return error
+    for i, point in enumerate(points):
+        if point.get('name') is not None and not isinstance(point['name'], str):
+            return f"Punkt {i+1}: 'name' muss ein Text sein"
+    return None
+
+def solve_project_points(points: np.ndarray, point_ids: List[int], method: str) -> Dict[str, Any]:
+    """
+    Triangulation der Punkte eines Projekts
+    
+    'point_id' in 'outliers' und 'inliers' beziehen sich auf die
+    Punkt-IDs des Projekts, 'point_ids' gibt die Reihenfolge der
+    Listen pro Punkt an.
+    """
+    result = AdvancedTriangulationCalculator.calculate_position(points, method)
+    if 'error' in result:
+        return result
+    
+    # Zwischengespeicherte Ergebnisse nicht verändern
+    result = {
+        **result,
+        "outliers": [{**outlier, "point_id": point_ids[outlier['point_id'] - 1]}
+                     for outlier in result['outliers']],
+        "point_ids": point_ids
+    }
+    if 'inliers' in result:
+        result['inliers'] = [point_ids[index - 1] for index in result['inliers']]
+    return result
+
+@app.route('/api/projects', methods=['POST'])
+def create_project():
+    """
+    Legt ein serverseitiges Projekt an
+    
+    Erwartet {"name": ..., "description": ..., "settings": {...},
+    "points": [...]}; alle Felder optional, Punkte mit optionalem
+    'name'. Liefert das Projekt mit den vergebenen Punkt-IDs.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        points = data.get('points', [])
+        
+        error = validate_project_fields(data) or validate_project_points(points)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        with stage('store'):
+            try:
+                project = project_store.create(
+                    data.get('name', 'Neues Projekt'), data.get('description', ''),
+                    data.get('settings'), points
+                )
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        response = jsonify(project)
+        response.headers['Location'] = f"/api/projects/{project['project_id']}"
+        return response, 201
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/projects', methods=['GET'])
+def list_projects():
+    """
+    Projekte ohne Punkte, zuletzt geänderte zuerst
+    
+    ?bbox=min_lat,min_lng,max_lat,max_lng liefert nur Projekte, deren
+    Punkte diese Box schneiden; Seiten über ?offset=N&limit=M.
+    """
+    bbox, error = parse_bbox(request.args.get('bbox'))
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(max(1, int(request.args.get('limit', PROJECT_PAGE_SIZE))), PROJECT_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "'offset' und 'limit' müssen ganze Zahlen sein"}), 400
+    
+    return jsonify(project_store.list(bbox, offset, limit))
+
+@app.route('/api/projects/<project_id>', methods=['GET'])
+def get_project(project_id: str):
+    """Projekt mit allen Punkten; ?points=false lässt die Punkte weg"""
+    include_points = request.args.get('points', 'true').lower() not in ('0', 'false', 'no')
+    project = project_store.get(project_id, include_points)
+    if project is None:
+        return jsonify({"error": "Projekt nicht gefunden"}), 404
+    return jsonify(project)
+
+@app.route('/api/projects/<project_id>', methods=['PATCH'])
+def update_project(project_id: str):
+    """Ändert name, description und/oder settings eines Projekts"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Ungültige Anfrage - JSON-Objekt erforderlich"}), 400
+    error = validate_project_fields(data)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    project = project_store.update(project_id, data)
+    if project is None:
+        return jsonify({"error": "Projekt nicht gefunden"}), 404
+    return jsonify(project)
+
+@app.route('/api/projects/<project_id>', methods=['DELETE'])
+def delete_project(project_id: str):
+    """Löscht ein Projekt mit Punkten und gespeicherten Lösungen"""
+    if not project_store.delete(project_id):
+        return jsonify({"error": "Projekt nicht gefunden"}), 404
+    return jsonify({"deleted": True, "project_id": project_id})
+
+@app.route('/api/projects/<project_id>/points', methods=['GET'])
+def get_project_points(project_id: str):
+    """Punkte eines Projekts, mit ?bbox=... nur innerhalb der Box"""
+    bbox, error = parse_bbox(request.args.get('bbox'))
+    if error:
+        return jsonify({"error": error}), 400
+    points = project_store.points(project_id, bbox)
+    if points is None:
+        return jsonify({"error": "Projekt nicht gefunden"}), 404
+    return jsonify({"project_id": project_id, "points": points})
+
+@app.route('/api/projects/<project_id>/points', methods=['PATCH'])
+def update_project_points(project_id: str):
+    """
+    Delta-Änderung der Punkte eines Projekts
+    
+    Erwartet {"add": [...], "update": [{"id": 1, "lat": ..., "lng": ...,
+    "distance": ...}], "remove": [2, 3], "revision": 7} wie
+    /api/sessions/<id>/points; alle Felder optional. Mit 'revision'
+    antwortet der Endpunkt 409, wenn das Projekt inzwischen geändert wurde.
+    Alle Änderungen werden atomar angewendet.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        add = data.get('add', [])
+        update = data.get('update', [])
+        remove = data.get('remove', [])
+        revision = data.get('revision')
+        
+        if not all(isinstance(field, list) for field in (add, update, remove)):
+            return jsonify({"error": "'add', 'update' und 'remove' müssen Arrays sein"}), 400
+        if revision is not None and (not isinstance(revision, int) or isinstance(revision, bool)):
+            return jsonify({"error": "'revision' muss eine ganze Zahl sein"}), 400
+        
+        error = validate_project_points(add)
+        if error:
+            return jsonify({"error": f"add: {error}"}), 400
+        for i, point in enumerate(update):
+            error = validate_point(point)
+            if not error and (not isinstance(point.get('id'), int) or isinstance(point['id'], bool)):
+                error = "'id' muss eine ganze Zahl sein"
+            if not error and point.get('name') is not None and not isinstance(point['name'], str):
+                error = "'name' muss ein Text sein"
+            if error:
+                return jsonify({"error": f"update: Punkt {i+1}: {error}"}), 400
+        if not all(isinstance(point_id, int) and not isinstance(point_id, bool) for point_id in remove):
+            return jsonify({"error": "remove: Punkt-IDs müssen ganze Zahlen sein"}), 400
+        
+        with stage('store'):
+            try:
+                project = project_store.update_points(project_id, add, update, remove, revision)
+            except RevisionConflict as e:
+                return jsonify({"error": str(e)}), 409
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        if project is None:
+            return jsonify({"error": "Projekt nicht gefunden"}), 404
+        return jsonify(project)
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/projects/<project_id>/solve', methods=['POST'])
+def solve_project(project_id: str):
+    """
+    Triangulation der gespeicherten Punkte eines Projekts
+    
+    Erwartet optional {"method": ...}. Sind die Punkte seit der letzten
+    Lösung mit derselben Methode unverändert, kommt das gespeicherte
+    Ergebnis zurück ("stored": true). Antwort wie /api/triangulate.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        method = data.get('method', solver.WLS)
+        error = validate_method(method)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        solution = project_store.solve(
+            project_id, method, PROJECTION,
+            lambda points, point_ids: solve_project_points(points, point_ids, method)
+        )
+        if solution is None:
+            return jsonify({"error": "Projekt nicht gefunden"}), 404
+        
+        timer = current_timer()
+        if solution.stored and timer is not None:
+            timer.label('stored', solution.point_count)
+        with stage('serialize'):
+            # Gespeichertes JSON unverändert senden, nur Felder anhängen
+            extra = json.dumps({"project_id": project_id, "stored": solution.stored})
+            body = solution.body[:-1] + ', ' + extra[1:]
+        return Response(body, status=400 if solution.failed else 200, mimetype='application/json')
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+def parse_track_options(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, float]], Optional[str]]:
+    """
+    Prüft die Rauschparameter eines Tracks (range_sigma, acceleration_noise)
+    
+    Returns:
+        (Optionen oder None, Fehlermeldung oder None)
+    """
+    options = {
+        "range_sigma": data.get('range_sigma', TRACK_RANGE_SIGMA),
+        "acceleration_noise": data.get('acceleration_noise', TRACK_ACCELERATION_NOISE)
+    }
+    for key, value in options.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                or not math.isfinite(value) or value <= 0:
+            return None, f"'{key}' muss eine positive Zahl sein"
+    return {key: float(value) for key, value in options.items()}, None
+
+def parse_track_measurement(item: Any) -> Tuple[Optional[Tuple[float, np.ndarray]], Optional[str]]:
+    """
+    Prüft einen Messsatz {"timestamp": Sekunden, "points": [...]}
+    
+    Ohne 'timestamp' gilt die Serverzeit.
+    
+    Returns:
+        ((timestamp, Punkte (n, 3)) oder None, Fehlermeldung oder None)
+    """
+    if not isinstance(item, dict):
+        return None, "Messung muss ein Objekt sein"
+    
+    timestamp = item.get('timestamp', time.time())
+    if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)) or not math.isfinite(timestamp):
+        return None, "'timestamp' muss eine Zahl (Sekunden) sein"
+    
+    points = item.get('points')
+    error = validate_point_list(points, min_points=1)
+    if error:
+        return None, error
+    return (float(timestamp), solver.points_to_array(points)), None
+
+@app.route('/api/tracks', methods=['POST'])
+def create_track():
+    """
+    Legt einen Track an
+    
+    Erwartet optional {"range_sigma": m, "acceleration_noise": m/s²,
+    "measurement": {"timestamp": ..., "points": [...]}}; die erste
+    Messung braucht mindestens 3 Entfernungen.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        options, error = parse_track_options(data)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        measurement = None
+        if data.get('measurement') is not None:
+            measurement, error = parse_track_measurement(data['measurement'])
+            if error:
+                return jsonify({"error": error}), 400
+        
+        track = track_store.create(**options)
+        if measurement is None:
+            return jsonify(track.snapshot()), 201
+        
+        with stage('track'):
+            state = track_store.update([(track.track_id, *measurement)])[0]
+        if 'error' in state:
+            track_store.delete(track.track_id)
+            return jsonify(state), 400
+        return jsonify(state), 201
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/tracks/<track_id>', methods=['GET'])
+def get_track(track_id: str):
+    """Aktueller Zustand eines Tracks"""
+    track = track_store.get(track_id)
+    if track is None:
+        return jsonify({"error": "Track nicht gefunden oder abgelaufen"}), 404
+    return jsonify(track.snapshot())
+
+@app.route('/api/tracks/<track_id>/measurements', methods=['POST'])
+def update_track(track_id: str):
+    """
+    Verarbeitet einen Messsatz {"timestamp": ..., "points": [...]}
+    
+    Liefert den gefilterten Zustand: Position, Geschwindigkeit Ost/Nord,
+    Kurs und Standardabweichungen.
+    """
+    try:
+        measurement, error = parse_track_measurement(request.get_json(silent=True))
+        if error:
+            return jsonify({"error": error}), 400
+        
+        with stage('track'):
+            state = track_store.update([(track_id, *measurement)])[0]
+        if 'error' in state:
+            return jsonify(state), 404 if track_store.get(track_id) is None else 400
+        return jsonify(state)
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/tracks/measurements', methods=['POST'])
+def update_tracks():
+    """
+    Sammel-Update vieler Tracks in einem Batch
+    
+    Erwartet {"updates": [{"track_id": ..., "timestamp": ..., "points": [...]}, ...]}
+    mit jedem Track höchstens einmal. Fehler einzelner Einträge stehen
+    in deren Ergebnis.
+    """
+    try:
+        data = request.get_json(silent=True)
+        updates = data.get('updates') if isinstance(data, dict) else None
+        if not isinstance(updates, list) or not updates:
+            return jsonify({"error": "'updates' muss ein nicht-leeres Array sein"}), 400
+        if len(updates) > MAX_TRACK_UPDATES:
+            return jsonify({"error": f"Maximal {MAX_TRACK_UPDATES} Updates pro Anfrage"}), 400
+        
+        measurements = []
+        seen = set()
+        for i, item in enumerate(updates):
+            measurement, error = parse_track_measurement(item)
+            track_id = item.get('track_id') if isinstance(item, dict) else None
+            if error is None and not isinstance(track_id, str):
+                error = "'track_id' fehlt"
+            if error is None and track_id in seen:
+                error = f"Track {track_id} kommt mehrfach vor"
+            if error:
+                return jsonify({"error": f"Update {i+1}: {error}"}), 400
+            seen.add(track_id)
+            measurements.append((track_id, *measurement))
+        
+        with stage('track'):
+            results = track_store.update(measurements)
+        return jsonify({
+            "results": results,
+            "count": len(results),
+            "failed": sum(1 for result in results if 'error' in result)
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+@app.route('/api/tracks/<track_id>', methods=['DELETE'])
+def delete_track(track_id: str):
+    """Beendet einen Track"""
+    if not track_store.delete(track_id):
+        return jsonify({"error": "Track nicht gefunden oder abgelaufen"}), 404
+    return jsonify({"deleted": True, "track_id": track_id})
+
+@app.route('/api/tracks/smooth', methods=['POST'])
+def smooth_track():
+    """
+    Offline-Glättung eines aufgezeichneten Tracks
+    
+    Erwartet {"measurements": [{"timestamp": ..., "points": [...]}, ...]}
+    mit aufsteigenden Zeitstempeln sowie optional range_sigma und
+    acceleration_noise. Liefert pro Epoche die geglättete Position,
+    Geschwindigkeit und Standardabweichung.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Keine Daten empfangen"}), 400
+        options, error = parse_track_options(data)
+        if error:
+            return jsonify({"error": error}), 400
+        
+        items = data.get('measurements')
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "'measurements' muss ein nicht-leeres Array sein"}), 400
+        if len(items) > MAX_SMOOTH_EPOCHS:
+            return jsonify({"error": f"Maximal {MAX_SMOOTH_EPOCHS} Messungen pro Track"}), 400
+        
+        with stage('parse'):
+            timestamps, measurements = [], []
+            for i, item in enumerate(items):
+                if not isinstance(item, dict) or 'timestamp' not in item:
+                    return jsonify({"error": f"Messung {i+1}: 'timestamp' fehlt"}), 400
+                measurement, error = parse_track_measurement(item)
+                if error:
+                    return jsonify({"error": f"Messung {i+1}: {error}"}), 400
+                timestamps.append(measurement[0])
+                measurements.append(measurement[1])
+            
+            timestamps = np.array(timestamps)
+            if (np.diff(timestamps) < 0).any():
+                return jsonify({"error": "Zeitstempel müssen aufsteigend sein"}), 400
+            if len(measurements[0]) < 3:
+                return jsonify({"error": "Die erste Messung benötigt mindestens 3 Entfernungen"}), 400
+            points, mask = tracking.pad_measurements(
+                measurements, np.broadcast_to(measurements[0][0, :2], (len(measurements), 2))
+            )
+        
+        with stage('smooth'):
+            try:
+                result = tracking.smooth(timestamps, points, mask, **options)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        with stage('serialize'):
+            velocity, std = result['velocity'], result['std']
+            epochs = [
+                {
+                    "timestamp": timestamp,
+                    "lat": lat,
+                    "lng": lng,
+                    "velocity": {"east": east, "north": north},
+                    "speed": math.hypot(east, north),
+                    "std_east": std_east,
+                    "std_north": std_north,
+                    "filtered": {"lat": filtered_lat, "lng": filtered_lng},
+                    "rejected_measurements": rejected
+                }
+                for timestamp, lat, lng, (east, north), (std_east, std_north), filtered_lat, filtered_lng, rejected
+                in zip(timestamps.tolist(), result['lat'].tolist(), result['lng'].tolist(),
+                       velocity.tolist(), std.tolist(), result['filtered_lat'].tolist(),
+                       result['filtered_lng'].tolist(), result['rejected'].tolist())
+            ]
+            return jsonify({"epochs": epochs, "count": len(epochs), **options})
+        
+    except Exception as e:
+        return jsonify({"error": f"Server-Fehler: {str(e)}"}), 500
+
+def point_label(points: List[Dict], index: int) -> Any:
+    """ID eines Punktes für Meldungen, sonst seine 1-basierte Position"""
+    return points[index].get('id', index + 1)
+
+@app.route('/api/points/validate', methods=['POST'])
+def validate_points():
+    """
+    Validiert Referenzpunkte und gibt Empfehlungen
+    """
+    try:
+        data = request.get_json()
+        points = data.get('points', [])
+        
+        if len(points) < 2:
+            return jsonify({"valid": True, "suggestions": []})
+        
+        suggestions = []
+        warnings = []
+        data = solver.points_to_array(points)
+        report = analyze_geometry(data, PROJECTION)
+        
+        # Prüfe Punktverteilung
+        if len(points) >= 3:
+            min_dist = report["min_spacing_m"]
+            max_dist = report["max_spacing_m"]
+            
+            if min_dist < 100:  # Punkte zu nah beieinander
+                warnings.append("Einige Referenzpunkte sind sehr nah beieinander (< 100m)")
+                suggestions.append("Verteilen Sie die Punkte weiter für bessere Genauigkeit")
+            
+            if max_dist > 20 * min_dist:  # Sehr ungleiche Verteilung
+                warnings.append("Ungleiche Punktverteilung erkannt")
+                suggestions.append("Versuchen Sie eine gleichmäßigere Verteilung der Referenzpunkte")
+            
+            clustering = report["clustering_index"]
+            if len(points) >= CLUSTER_MIN_POINTS and clustering is not None and clustering < CLUSTER_WARNING_INDEX:
+                warnings.append(f"Referenzpunkte sind stark gehäuft (Clark-Evans-Index {clustering:.2f})")
+                suggestions.append("Ergänzen Sie Punkte außerhalb der Häufungen")
+            
+            gdop = report["gdop"]
+            if gdop is None or gdop > GDOP_WARNING:
+                warnings.append("Ungünstige Geometrie der Referenzpunkte" +
+                                (f" (GDOP {gdop:.1f})" if gdop is not None else ""))
+                suggestions.append("Verteilen Sie die Punkte in mehreren Richtungen um den gesuchten Standort")
+        
+        duplicates = report["near_duplicates"]
+        if duplicates:
+            warnings.append(f"{len(duplicates)} Punktpaar(e) nahezu identisch (< {NEAR_DUPLICATE_DISTANCE:g}m)")
+            suggestions.append("Entfernen Sie doppelte Referenzpunkte")
+        
+        # Prüfe Entfernungsbereiche
+        min_range = float(data[:, 2].min())
+        max_range = float(data[:, 2].max())
+        if max_range > 10 * min_range:
+            warnings.append("Sehr unterschiedliche Entfernungsbereiche")
+            suggestions.append("Ähnliche Entfernungsbereiche führen zu besserer Genauigkeit")
+        
+        # Empfehlungen für Punktanzahl
+        if len(points) < 4:
+            suggestions.append("4 oder mehr Punkte verbessern die Genauigkeit erheblich")
+        elif len(points) > 10:
+            suggestions.append("Mehr als 10 Punkte verbessern die Genauigkeit nur noch minimal")
+        
+        return jsonify({
+            "valid": len(warnings) == 0,
+            "warnings": warnings,
+            "suggestions": suggestions,
+            "point_count": len(points),
+            "recommended_count": min(8, max(4, len(points))),
+            "geometry": {
+                **report,
+                "near_duplicates": [
+                    [point_label(points, i), point_label(points, j)]
+                    for i, j in duplicates[:MAX_REPORTED_DUPLICATES]
+                ],
+                "near_duplicate_count": len(duplicates)
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({"valid": False, "error": str(e)})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Latenz-Histogramme im Prometheus-Textformat"""
+    if not METRICS_ENABLED:
+        return jsonify({"error": "Metriken sind deaktiviert (METRICS_ENABLED)"}), 404
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    """Health Check Endpoint für Render.com und Docker"""
+    return jsonify({
+        "status": "healthy", 
+        "message": "Advanced Triangulation API läuft",
+        "version": "2.0.0",
+        "cache": result_cache.stats(),
+        "region_grids": region_grids.stats(),
+        "sessions": session_store.stats(),
+        "tracks": track_store.stats(),
+        "solve_pool": solve_pool.stats(),
+        "jobs": job_queue.stats(),
+        "projects": project_store.stats()
+    })
+
+@app.route('/health', methods=['GET'])
 def health_check_root():
     """Alternative Health Check Route"""
     return health_check()
@@ -477,25 +2069,131 @@ def calculate_distance():
         p1 = data['point1']
         p2 = data['point2']
         
-        # Haversine Formel für Entfernungsberechnung
-        R = 6371000  # Erdradius in Metern
+        mode = data.get('mode', geometry.HAVERSINE)
+        if mode not in geometry.DISTANCE_MODES:
+            return jsonify({"error": f"Unbekannter Modus '{mode}' - erlaubt: {', '.join(geometry.DISTANCE_MODES)}"}), 400
         
-        lat1_rad = math.radians(p1['lat'])
-        lat2_rad = math.radians(p2['lat'])
-        delta_lat = math.radians(p2['lat'] - p1['lat'])
-        delta_lng = math.radians(p2['lng'] - p1['lng'])
-        
-        a = (math.sin(delta_lat/2)**2 + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lng/2)**2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-        
-        distance = R * c
+        distance = float(geometry.distances(p1['lat'], p1['lng'], p2['lat'], p2['lng'], mode))
         
         return jsonify({"distance": distance})
         
     except Exception as e:
         return jsonify({"error": f"Entfernungsberechnung fehlgeschlagen: {str(e)}"}), 500
 
+@app.route('/api/distance/batch', methods=['POST'])
+def calculate_distance_batch():
+    """
+    Entfernungen für viele Punktpaare in einem Aufruf
+    
+    Body: {"pairs": [{"point1": {...}, "point2": {...}}, ...],
+    optional "mode": "haversine"|"vincenty" und "format": "json"|"binary"}.
+    Binär: eine float64-Entfernung pro Paar, Anzahl in X-Distance-Count.
+    """
+    with stage('parse'):
+        data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON-Objekt erwartet"}), 400
+    
+    mode, output, error = distance_options(data)
+    if error:
+        return jsonify({"error": error}), 400
+    if output == 'ndjson':
+        return jsonify({"error": "NDJSON ist nur für /api/distance/matrix verfügbar"}), 400
+    
+    pairs = data.get('pairs')
+    if not isinstance(pairs, list) or not pairs:
+        return jsonify({"error": "'pairs' muss ein nicht-leeres Array sein"}), 400
+    if len(pairs) > MAX_DISTANCE_CELLS:
+        return jsonify({"error": f"Maximal {MAX_DISTANCE_CELLS} Paare pro Anfrage"}), 400
+    
+    with stage('convert'):
+        try:
+            starts = [pair['point1'] for pair in pairs]
+            ends = [pair['point2'] for pair in pairs]
+        except (KeyError, TypeError):
+            return jsonify({"error": "Jedes Paar benötigt 'point1' und 'point2'"}), 400
+        
+        starts, error = parse_coordinates(starts, 'point1')
+        if error:
+            return jsonify({"error": error}), 400
+        ends, error = parse_coordinates(ends, 'point2')
+        if error:
+            return jsonify({"error": error}), 400
+    
+    timer = current_timer()
+    if timer is not None:
+        timer.label(mode)
+    with stage('solve'):
+        values = geometry.distances(starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1], mode)
+    
+    if output == 'binary':
+        return binary_response([values], {"X-Distance-Mode": mode, "X-Distance-Count": len(values)})
+    
+    with stage('serialize'):
+        return jsonify({"mode": mode, "count": len(values), "distances": values.tolist()})
+
+@app.route('/api/distance/matrix', methods=['POST'])
+def calculate_distance_matrix():
+    """
+    Entfernungsmatrix origins × destinations
+    
+    Body: {"origins": [...], "destinations": [...], optional "mode":
+    "haversine"|"vincenty" und "format": "json"|"ndjson"|"binary"}.
+    Ohne 'format' entscheidet der Accept-Header. ndjson: eine Zeile
+    {"row": i, "distances": [...]} pro Ursprung; binary: float64 little-
+    endian zeilenweise, Form in X-Matrix-Rows und X-Matrix-Columns.
+    Gestreamte Formate werden blockweise berechnet.
+    """
+    with stage('parse'):
+        data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON-Objekt erwartet"}), 400
+    
+    mode, output, error = distance_options(data)
+    if error:
+        return jsonify({"error": error}), 400
+    
+    with stage('convert'):
+        origins, error = parse_coordinates(data.get('origins'), 'origins')
+        if error:
+            return jsonify({"error": error}), 400
+        destinations, error = parse_coordinates(data.get('destinations'), 'destinations')
+        if error:
+            return jsonify({"error": error}), 400
+    
+    cells = len(origins) * len(destinations)
+    if cells > MAX_DISTANCE_CELLS:
+        return jsonify({"error": f"Maximal {MAX_DISTANCE_CELLS} Entfernungen pro Matrix"}), 400
+    timer = current_timer()
+    if timer is not None:
+        timer.label(mode)
+    
+    blocks = matrix_blocks(origins, destinations, mode)
+    if output == 'binary':
+        return binary_response((block for _, block in blocks), {
+            "X-Distance-Mode": mode,
+            "X-Matrix-Rows": len(origins),
+            "X-Matrix-Columns": len(destinations)
+        })
+    
+    if output == 'ndjson':
+        lines = (
+            "".join(json.dumps({"row": start + i, "distances": row}) + "\n"
+                    for i, row in enumerate(block.tolist()))
+            for start, block in blocks
+        )
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+    
+    with stage('solve'):
+        matrix = np.concatenate([block for _, block in blocks])
+    with stage('serialize'):
+        return jsonify({
+            "mode": mode,
+            "rows": len(origins),
+            "columns": len(destinations),
+            "distances": matrix.tolist()
+        })
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('FLASK_ENV') == 'development'
@@ -503,11 +2201,19 @@ if __name__ == '__main__':
     print("🎯 Advanced Triangulation API Server startet...")
     print("🌍 Verfügbare Endpoints:")
     print("   POST /api/triangulate - Erweiterte Standort-Berechnung")
+    print("   POST /api/triangulate/batch - Batch-Berechnung")
+    print("   POST /api/triangulate/stream - NDJSON-Streaming")
     print("   POST /api/triangulate/preview - Live-Vorschau")
+    print("   POST /api/sessions - Live-Sitzung anlegen")
+    print("   PATCH /api/sessions/<id>/points - Punkte inkrementell ändern")
+    print("   POST /api/projects - Projekt serverseitig speichern")
+    print("   POST /api/projects/<id>/solve - Projekt lösen (gespeicherte Lösung)")
     print("   POST /api/points/validate - Punkt-Validierung")
     print("   POST /api/distance - Entfernung berechnen")
+    print("   POST /api/distance/batch - Entfernungen vieler Punktpaare")
+    print("   POST /api/distance/matrix - Entfernungsmatrix")
     print("   GET  /api/health - Health Check")
+    print("   GET  /metrics - Prometheus-Metriken")
     print(f"\n📍 Server läuft auf Port {port}")
     
     app.run(debug=debug, host='0.0.0.0', port=port)
-    app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,6 @@
+"""
+Benchmarks für das Triangulation-Backend
+
+Aufruf aus dem backend/ Verzeichnis, z.B.:
+    python -m benchmarks.bench_batch
+"""
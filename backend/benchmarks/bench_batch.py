@@ -0,0 +1,45 @@
+"""
+Batch-Endpoint gegen einzelne /api/triangulate Requests
+
+Misst Lösungen pro Sekunde für verschiedene Punktanzahlen.
+"""
+
+import argparse
+
+from app import app, AdvancedTriangulationCalculator
+from benchmarks.common import synthetic_point_sets, measure, print_table
+
+
+def run(count: int, sizes) -> None:
+    client = app.test_client()
+    rows = []
+
+    for n in sizes:
+        point_sets = synthetic_point_sets(count, n)
+
+        single = measure(
+            lambda: [
+                client.post("/api/triangulate", json={"points": points}) for points in point_sets
+            ],
+            repeat=1,
+        )
+        batch = measure(
+            lambda: client.post("/api/triangulate/batch", json={"point_sets": point_sets})
+        )
+        direct = measure(lambda: AdvancedTriangulationCalculator.calculate_batch(point_sets))
+
+        rows.append((n, count / single, count / batch, count / direct, single / batch))
+
+    print_table(
+        f"Lösungen pro Sekunde ({count} Punktmengen)",
+        ("Punkte", "einzeln/s", "batch/s", "kernel/s", "Speedup"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 5, 10, 20])
+    args = parser.parse_args()
+    run(args.count, args.sizes)
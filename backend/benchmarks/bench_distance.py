@@ -0,0 +1,80 @@
+"""
+Entfernungen pro Sekunde: Einzelanfragen gegen Paar-Batch und Matrix
+
+Vergleicht /api/distance (eine Anfrage pro Paar) mit
+/api/distance/batch und /api/distance/matrix in JSON und binär,
+jeweils für Haversine und Vincenty, sowie den reinen NumPy-Kernel.
+Zusätzlich die größte Abweichung Kugel gegen WGS84-Ellipsoid.
+"""
+
+import argparse
+
+import numpy as np
+
+import geometry
+from app import app
+from benchmarks.common import measure, print_table
+
+
+def random_coordinates(count: int, seed: int) -> np.ndarray:
+    """Zufällige Koordinaten (count, 2) in Mitteleuropa"""
+    rng = np.random.default_rng(seed)
+    return np.stack((rng.uniform(47, 55, count), rng.uniform(6, 15, count)), axis=1)
+
+
+def as_points(coordinates: np.ndarray):
+    return [{"lat": lat, "lng": lng} for lat, lng in coordinates.tolist()]
+
+
+def run(single: int, pairs: int, matrix: int) -> None:
+    client = app.test_client()
+    rows = []
+
+    starts, ends = random_coordinates(pairs, 1), random_coordinates(pairs, 2)
+    pair_list = [{"point1": a, "point2": b} for a, b in zip(as_points(starts), as_points(ends))]
+    sites, beacons = as_points(random_coordinates(matrix, 3)), as_points(
+        random_coordinates(matrix, 4)
+    )
+
+    for mode in geometry.DISTANCE_MODES:
+
+        def single_requests():
+            for pair in pair_list[:single]:
+                client.post("/api/distance", json={**pair, "mode": mode})
+
+        seconds = measure(single_requests, repeat=1)
+        rows.append(("/api/distance", mode, single, single / seconds))
+
+        for output in ("json", "binary"):
+            body = {"pairs": pair_list, "mode": mode, "format": output}
+            seconds = measure(lambda: client.post("/api/distance/batch", json=body))
+            rows.append((f"batch {output}", mode, pairs, pairs / seconds))
+
+        for output in ("json", "binary"):
+            body = {"origins": sites, "destinations": beacons, "mode": mode, "format": output}
+            seconds = measure(lambda: client.post("/api/distance/matrix", json=body))
+            rows.append((f"matrix {output}", mode, matrix * matrix, matrix * matrix / seconds))
+
+        seconds = measure(
+            lambda: geometry.distances(starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1], mode)
+        )
+        rows.append(("Kernel", mode, pairs, pairs / seconds))
+
+    print_table("Entfernungen pro Sekunde", ("Pfad", "Modus", "Entfernungen", "pro Sekunde"), rows)
+
+    spherical = geometry.haversine(starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1])
+    ellipsoidal = geometry.vincenty(starts[:, 0], starts[:, 1], ends[:, 0], ends[:, 1])
+    deviation = np.abs(spherical - ellipsoidal) / ellipsoidal
+    print(
+        f"\nHaversine gegen Vincenty: max. {deviation.max() * 100:.3f} %, "
+        f"Mittel {deviation.mean() * 100:.3f} %"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--single", type=int, default=2000, help="Einzelanfragen")
+    parser.add_argument("--pairs", type=int, default=100000, help="Paare pro Batch")
+    parser.add_argument("--matrix", type=int, default=500, help="Ursprünge = Ziele der Matrix")
+    args = parser.parse_args()
+    run(args.single, args.pairs, args.matrix)
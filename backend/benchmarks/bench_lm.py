@@ -0,0 +1,64 @@
+"""
+Levenberg-Marquardt gegen den linearen WLS-Pfad
+
+Misst Laufzeit pro Lösung, Iterationen bis zur Konvergenz und den
+Positionsfehler gegenüber der wahren Position für typische Punktanzahlen.
+"""
+
+import argparse
+
+import numpy as np
+
+import solver
+from benchmarks.common import synthetic_scenario, position_error, measure, print_table
+
+
+def run(count: int, sizes, noise: float) -> None:
+    rows = []
+
+    for n in sizes:
+        points, truth = synthetic_scenario(count, n, noise=noise)
+        single = points[0]
+
+        for method in solver.METHODS:
+            result = solver.solve_batch(points, method)
+            valid = result["valid"]
+            error = position_error(result["lat"], result["lng"], truth)[valid]
+            iterations = result.get("iterations", np.zeros(count, dtype=int))[valid]
+
+            rows.append(
+                (
+                    n,
+                    method,
+                    measure(lambda: solver.solve(single, method=method), repeat=200) * 1e6,
+                    measure(lambda: solver.solve_batch(points, method)) / count * 1e6,
+                    float(iterations.mean()),
+                    float(iterations.max()),
+                    float(np.median(error)),
+                    float(np.percentile(error, 95)),
+                )
+            )
+
+    print_table(
+        f"WLS gegen LM ({count} Punktmengen, Rauschen {noise} m)",
+        (
+            "Punkte",
+            "Methode",
+            "Einzeln µs",
+            "Batch µs",
+            "Iter. Ø",
+            "Iter. max",
+            "Fehler p50 m",
+            "Fehler p95 m",
+        ),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 5, 10, 20])
+    parser.add_argument("--noise", type=float, default=2.0)
+    args = parser.parse_args()
+    run(args.count, args.sizes, args.noise)
@@ -0,0 +1,46 @@
+"""
+Skalierung von Batch und Streaming über den Prozesspool
+
+Löst dieselben Punktmengen über calculate_batch und stream_results mit
+1, 2, 4 und 8 Prozessen. Der Pool wird vor der Messung gestartet, wie
+in einem laufenden Server; 1 Prozess entspricht dem seriellen Pfad.
+"""
+
+import argparse
+import json
+import os
+
+import app
+from parallel import SolvePool
+from benchmarks.common import synthetic_point_sets, measure, print_table
+
+
+def run(count: int, n: int, workers_list) -> None:
+    point_sets = synthetic_point_sets(count, n)
+    lines = [json.dumps(points) for points in point_sets]
+    rows = []
+
+    for workers in workers_list:
+        app.solve_pool = SolvePool(workers)
+        # Pool starten und Prozesse aufwärmen
+        app.AdvancedTriangulationCalculator.calculate_batch(point_sets[: app.PARALLEL_MIN_SETS * 2])
+
+        batch = measure(lambda: app.AdvancedTriangulationCalculator.calculate_batch(point_sets))
+        stream = measure(lambda: sum(1 for _ in app.stream_results(lines)))
+        rows.append((workers, count / batch, count / stream))
+        app.solve_pool.shutdown()
+
+    print_table(
+        f"Prozesspool ({count} Punktmengen à {n} Punkte, {os.cpu_count()} CPUs)",
+        ("Prozesse", "Batch Sätze/s", "Stream Zeilen/s"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=50000)
+    parser.add_argument("--points", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    run(args.count, args.points, args.workers)
@@ -0,0 +1,96 @@
+"""
+Genauigkeit und Durchsatz der Projektionen
+
+Genauigkeit: rauschfreie Szenarien mit Haversine-Entfernungen (Kugelmodell
+der App) für verschiedene Ausdehnungen und Breiten, gelöst mit
+Levenberg-Marquardt, sodass nur der Projektionsfehler bleibt. Dazu die
+Fehlerschätzung, nach der 'auto' umschaltet.
+
+Durchsatz: projection.project allein und solver.solve_batch je Modus.
+"""
+
+import argparse
+
+import numpy as np
+
+import projection
+import solver
+from geometry import haversine
+from benchmarks.common import measure, print_table
+
+MODES = (projection.EQUIRECTANGULAR, projection.ENU, projection.AUTO)
+
+
+def scenario(count: int, n: int, spread: float, lat: float, seed: int = 42) -> tuple:
+    """
+    Referenzpunkte im Abstand 0,2-1 x spread (Meter) um wahre Positionen
+
+    Returns:
+        (points, truth) wie benchmarks.common.synthetic_scenario
+    """
+    rng = np.random.default_rng(seed)
+    true_lat = lat + rng.normal(0, 0.01, count)
+    true_lng = 10.0 + rng.normal(0, 0.01, count)
+    angle = rng.uniform(0, 2 * np.pi, (count, n))
+    radius = rng.uniform(0.2, 1.0, (count, n)) * spread
+    point_lat = true_lat[:, None] + radius * np.cos(angle) / solver.METERS_PER_DEGREE
+    point_lng = true_lng[:, None] + radius * np.sin(angle) / (
+        solver.METERS_PER_DEGREE * np.cos(np.radians(true_lat))[:, None]
+    )
+    distance = haversine(true_lat[:, None], true_lng[:, None], point_lat, point_lng)
+    return (
+        np.stack((point_lat, point_lng, distance), axis=-1),
+        np.stack((true_lat, true_lng), axis=-1),
+    )
+
+
+def accuracy(count: int, spreads, latitudes) -> None:
+    rows = []
+    for lat in latitudes:
+        for spread in spreads:
+            points, truth = scenario(count, 8, spread, lat)
+            row = [f"{lat:g}°", f"{spread / 1000:g} km"]
+            for mode in MODES:
+                result = solver.solve_batch(points, solver.LM, projection_mode=mode)
+                error = haversine(result["lat"], result["lng"], truth[:, 0], truth[:, 1])
+                row.append(f"{error.max():.3f}")
+            xy, frame = projection.project(points, projection.EQUIRECTANGULAR)
+            estimate = projection.equirectangular_error(xy, points[..., 2], frame.center)
+            row.append(f"{estimate.max():.3f}")
+            row.append(f"{(estimate > projection.PROJECTION_TOLERANCE).mean():.0%}")
+            rows.append(tuple(row))
+
+    print_table(
+        f"Max. Positionsfehler in Metern (rauschfrei, {count} Probleme, n = 8)",
+        ("Breite", "Ausdehnung", *MODES, "Schätzung", "auto → enu"),
+        rows,
+    )
+
+
+def throughput(count: int, spread: float) -> None:
+    rows = []
+    points, _ = scenario(count, 8, spread, 52.0)
+    for mode in MODES:
+        project = measure(lambda: projection.project(points, mode))
+        solve = measure(lambda: solver.solve_batch(points, projection_mode=mode))
+        rows.append((mode, count / project, count / solve))
+
+    print_table(
+        f"Durchsatz bei {spread / 1000:g} km Ausdehnung ({count} Probleme, n = 8)",
+        ("Modus", "Projektion/s", "WLS-Lösungen/s"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=500, help="Probleme pro Genauigkeitszeile")
+    parser.add_argument(
+        "--spreads", type=float, nargs="+", default=[200, 1000, 5000, 20000, 100000]
+    )
+    parser.add_argument("--latitudes", type=float, nargs="+", default=[0, 52, 70])
+    parser.add_argument("--batch", type=int, default=20000, help="Probleme für den Durchsatz")
+    args = parser.parse_args()
+    accuracy(args.count, args.spreads, args.latitudes)
+    throughput(args.batch, 1000)
+    throughput(args.batch, 50000)
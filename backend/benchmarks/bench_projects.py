@@ -0,0 +1,115 @@
+"""
+Projektablage: Speichern und Lösen großer Projekte
+
+Misst über den Test-Client für Projekte mit n Punkten:
+    Anlegen mit allen Punkten, Delta mit einem neuen bzw. zehn geänderten
+    Punkten, vollständiges Neuschreiben (remove + add aller Punkte, wie
+    das bisherige Speichern im Browser), Laden, erstes Lösen, Lösen ohne
+    Änderung (gespeicherte Lösung) und Lösen nach einem Delta.
+Zum Vergleich /api/triangulate mit der vollständigen Punktliste pro
+Anfrage bei geleertem Ergebnis-Cache. Die Datenbank liegt in einem
+temporären Verzeichnis (PROJECT_DB wird überschrieben).
+"""
+
+import argparse
+import os
+import tempfile
+
+_directory = tempfile.mkdtemp(prefix="bench-projects-")
+os.environ["PROJECT_DB"] = os.path.join(_directory, "projects.sqlite")
+
+from app import app, result_cache  # noqa: E402
+from benchmarks.common import synthetic_scenario, measure, print_table  # noqa: E402
+
+
+def as_point_list(points):
+    return [
+        {"lat": lat, "lng": lng, "distance": d, "name": f"Punkt {i + 1}"}
+        for i, (lat, lng, d) in enumerate(points.tolist())
+    ]
+
+
+def run(sizes, repeat: int, method: str) -> None:
+    client = app.test_client()
+    rows = []
+
+    def timed(label, n, request, expected=200, calls=repeat):
+        response = request()
+        assert response.status_code == expected, response.get_json()
+        seconds = measure(lambda: [request() for _ in range(calls)]) / calls
+        rows.append((label, n, seconds * 1e3))
+        return response.get_json()
+
+    for n in sizes:
+        points = as_point_list(synthetic_scenario(1, n, seed=n)[0][0])
+
+        project = timed(
+            "anlegen",
+            n,
+            lambda: client.post("/api/projects", json={"points": points}),
+            201,
+            calls=1,
+        )
+        url = f"/api/projects/{project['project_id']}"
+
+        def add_one():
+            return client.patch(url + "/points", json={"add": points[:1]})
+
+        timed("Delta: 1 Punkt neu", n, add_one)
+
+        changed = [
+            {**point, "id": point_id, "distance": point["distance"] + 1}
+            for point, point_id in zip(points[:10], range(1, 11))
+        ]
+        timed(
+            "Delta: 10 Punkte geändert",
+            n,
+            lambda: client.patch(url + "/points", json={"update": changed}),
+        )
+
+        timed("laden", n, lambda: client.get(url))
+
+        offsets = iter(range(1, 1 << 30))
+
+        def first_solve():
+            # Jeder Aufruf ändert die Entfernung, sonst trifft der Punkt-Hash
+            point = {**changed[0], "distance": changed[0]["distance"] + next(offsets)}
+            assert client.patch(url + "/points", json={"update": [point]}).status_code == 200
+            result_cache.clear()
+            return client.post(url + "/solve", json={"method": method})
+
+        timed("lösen nach Delta", n, first_solve, calls=max(1, repeat // 10))
+        stored = timed(
+            "lösen, gespeichert", n, lambda: client.post(url + "/solve", json={"method": method})
+        )
+        assert stored["stored"]
+
+        def stateless():
+            result_cache.clear()
+            return client.post("/api/triangulate", json={"points": points, "method": method})
+
+        timed("/api/triangulate (ganze Liste)", n, stateless, calls=max(1, repeat // 10))
+
+        # Zuletzt: vergibt allen Punkten neue IDs
+        def rewrite():
+            ids = [point["id"] for point in client.get(url + "/points").get_json()["points"]]
+            return client.patch(url + "/points", json={"remove": ids, "add": points})
+
+        timed("alles neu schreiben", n, rewrite, calls=max(1, repeat // 10))
+
+    print_table(
+        f"Projektablage (Methode {method}, SQLite in {_directory})",
+        ("Vorgang", "Punkte", "Latenz ms"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000], help="Punkte pro Projekt"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Anfragen pro Messung")
+    parser.add_argument("--method", default="wls", help="Lösungsmethode")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.method)
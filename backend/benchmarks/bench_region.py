@@ -0,0 +1,173 @@
+"""
+Lösung innerhalb einer Region gegen unbeschränkte LM- und RANSAC-Lösungen
+
+Jede Punktmenge erhält eine Bounding Box von --extent Metern, die die
+wahre Position an zufälliger Stelle enthält. Gemessen werden Latenz pro
+Einzellösung, Positionsfehler und der Anteil der Lösungen außerhalb der
+Region für ungünstige Geometrien (nahezu kollinear, gehäuft) mit und
+ohne Ausreißer. Dazu der Aufbau eines Gitters (kalt) gegen den Zugriff
+über den Cache und der Durchsatz großer Batches in einer gemeinsamen
+Region.
+"""
+
+import argparse
+
+import numpy as np
+
+import projection
+import region
+import solver
+from benchmarks.common import METERS_PER_DEGREE, scenario, position_error, measure, print_table
+from cache import ResultCache
+
+
+def boxes(truth: np.ndarray, extent: float, seed: int = 7) -> np.ndarray:
+    """Eckpunkte (count, 4, 2) je einer Box um die wahre Position, zufällig versetzt"""
+    rng = np.random.default_rng(seed)
+    half = (
+        extent
+        / 2
+        / METERS_PER_DEGREE
+        * np.stack((np.ones(len(truth)), 1 / np.cos(np.radians(truth[:, 0]))), 1)
+    )
+    center = truth + rng.uniform(-0.8, 0.8, truth.shape) * half
+    return np.stack([region.bbox_polygon(*(c - h), *(c + h)) for c, h in zip(center, half)])
+
+
+def outside(grid: region.RegionGrid, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """Lösungen mehr als 1 mm außerhalb der Region"""
+    latlng = np.stack((lat, lng, np.zeros_like(lat)), axis=1)[:, None]
+    xy, _ = projection.project(latlng, grid.mode, np.broadcast_to(grid.frame.center, (len(lat), 2)))
+    xy = xy[:, 0]
+    result = ~grid.contains(xy)
+    if result.any():
+        gap = np.linalg.norm(grid.nearest_boundary(xy[result]) - xy[result], axis=1)
+        result[result] = gap > 1e-3
+    return result
+
+
+def run_accuracy(count: int, sizes, extent: float) -> None:
+    rows = []
+    cache = ResultCache(count)
+
+    for geometry in ("line", "cluster", "uniform"):
+        for outliers in (0.0, 0.2):
+            for n in sizes:
+                points, truth = scenario(count, n, geometry=geometry, outliers=outliers, seed=n)
+                grids = [
+                    region.region_grid(polygon, projection.EQUIRECTANGULAR, cache)
+                    for polygon in boxes(truth, extent)
+                ]
+
+                solvers = [
+                    (method, lambda k, method=method: solver.solve_batch(points[k : k + 1], method))
+                    for method in (solver.LM, solver.RANSAC)
+                ]
+                solvers.append(
+                    (solver.REGION, lambda k: region.solve_batch(points[k : k + 1], grids[k]))
+                )
+
+                for name, solve in solvers:
+                    results = [solve(k) for k in range(count)]
+                    lat = np.concatenate([result["lat"] for result in results])
+                    lng = np.concatenate([result["lng"] for result in results])
+                    errors = position_error(lat, lng, truth)
+                    errors = np.where(np.isfinite(errors), errors, np.inf)
+                    misses = [
+                        outside(grid, lat[k : k + 1], lng[k : k + 1])[0]
+                        for k, grid in enumerate(grids)
+                    ]
+                    rows.append(
+                        (
+                            geometry,
+                            n,
+                            f"{outliers:.0%}",
+                            name,
+                            measure(lambda: [solve(k) for k in range(10)]) / 10 * 1e6,
+                            float(np.median(errors)),
+                            float(np.percentile(errors, 95)),
+                            float(np.mean(misses) * 100),
+                        )
+                    )
+
+    print_table(
+        f"Region {extent:g} m gegen unbeschränkte Lösung ({count} Punktmengen)",
+        (
+            "Geometrie",
+            "Punkte",
+            "Ausreißer",
+            "Methode",
+            "Latenz µs",
+            "Fehler p50 m",
+            "Fehler p95 m",
+            "außerhalb %",
+        ),
+        rows,
+    )
+
+
+def run_grid(batch: int, extent: float) -> None:
+    rows = []
+    points, truth = scenario(batch, 8, outliers=0.1)
+    low, high = truth.min(axis=0) - 0.01, truth.max(axis=0) + 0.01
+    angles = np.linspace(0, 2 * np.pi, 200, endpoint=False)
+    shapes = [
+        ("Box", region.bbox_polygon(*boxes(truth[:1], extent)[0][[0, 2]].ravel())),
+        (
+            "Polygon 200 Ecken",
+            np.stack(
+                (
+                    truth[0, 0] + extent / METERS_PER_DEGREE * np.sin(angles) / 2,
+                    truth[0, 1] + extent / METERS_PER_DEGREE * np.cos(angles),
+                ),
+                axis=1,
+            ),
+        ),
+    ]
+    for label, polygon in shapes:
+        cache = ResultCache(1)
+        cold = measure(lambda: region.RegionGrid(polygon, projection.EQUIRECTANGULAR))
+        region.region_grid(polygon, projection.EQUIRECTANGULAR, cache)
+        warm = (
+            measure(
+                lambda: [
+                    region.region_grid(polygon, projection.EQUIRECTANGULAR, cache)
+                    for _ in range(100)
+                ]
+            )
+            / 100
+        )
+        rows.append((f"Gitter aufbauen: {label}", 1, cold * 1e6))
+        rows.append((f"Gitter aus Cache: {label}", 1, warm * 1e6))
+
+    grid = region.RegionGrid(region.bbox_polygon(*low, *high), projection.ENU)
+    rows.append(
+        (
+            "Batch in gemeinsamer Region",
+            batch,
+            measure(lambda: region.solve_batch(points, grid)) * 1e6,
+        )
+    )
+    for method in (solver.LM, solver.RANSAC):
+        rows.append(
+            (
+                f"Batch unbeschränkt ({method})",
+                batch,
+                measure(lambda: solver.solve_batch(points, method)) * 1e6,
+            )
+        )
+
+    print_table("Gitter und Batches", ("Messung", "Punktmengen", "µs"), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200, help="Punktmengen pro Szenario")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 8], help="Punkte pro Menge")
+    parser.add_argument(
+        "--extent", type=float, default=1000.0, help="Kantenlänge der Region in Metern"
+    )
+    parser.add_argument("--batch", type=int, default=10000, help="Punktmengen im Batch")
+    args = parser.parse_args()
+    run_accuracy(args.count, args.sizes, args.extent)
+    run_grid(args.batch, args.extent)
@@ -0,0 +1,58 @@
+"""
+Robuste Schätzung (RANSAC) gegen WLS und LM bei groben Ausreißern
+
+Misst Latenz pro Einzellösung, geprüfte Teilmengen und den
+Positionsfehler gegenüber der wahren Position für 10, 50 und 500 Punkte.
+"""
+
+import argparse
+
+import numpy as np
+
+import solver
+from benchmarks.common import synthetic_scenario, position_error, measure, print_table
+
+
+def run(count: int, sizes, outliers: float) -> None:
+    rows = []
+
+    for n in sizes:
+        points, truth = synthetic_scenario(count, n, outliers=outliers)
+
+        for method in solver.METHODS:
+            errors = []
+            hypotheses = []
+            for k in range(count):
+                result = solver.solve(points[k], method=method)
+                errors.append(
+                    position_error(
+                        np.array([result.lat]), np.array([result.lng]), truth[k : k + 1]
+                    )[0]
+                )
+                hypotheses.append(result.hypotheses)
+
+            rows.append(
+                (
+                    n,
+                    method,
+                    measure(lambda: solver.solve(points[0], method=method), repeat=20) * 1e6,
+                    float(np.mean(hypotheses)),
+                    float(np.median(errors)),
+                    float(np.percentile(errors, 95)),
+                )
+            )
+
+    print_table(
+        f"Robuste Schätzung ({count} Punktmengen, {outliers:.0%} Ausreißer)",
+        ("Punkte", "Methode", "Latenz µs", "Teilmengen Ø", "Fehler p50 m", "Fehler p95 m"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 500])
+    parser.add_argument("--outliers", type=float, default=0.2)
+    args = parser.parse_args()
+    run(args.count, args.sizes, args.outliers)
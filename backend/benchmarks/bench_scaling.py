@@ -0,0 +1,46 @@
+"""
+Skalierung des Weighted-Least-Squares-Solvers über die Punktanzahl
+
+Misst Laufzeit und Spitzen-Speicher (tracemalloc) von solver.solve für
+n = 3 bis 100k Entfernungen. Zeit und Bytes pro Punkt sollten für
+große n konstant bleiben, d.h. beides wächst linear.
+"""
+
+import argparse
+import tracemalloc
+
+import solver
+from benchmarks.common import synthetic_point_sets, measure, print_table
+
+
+def peak_memory(func) -> int:
+    """Spitzen-Speicherbedarf eines Aufrufs in Bytes"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(sizes) -> None:
+    rows = []
+
+    for n in sizes:
+        points = solver.points_to_array(synthetic_point_sets(1, n, spread=0.05)[0])
+        seconds = measure(lambda: solver.solve(points), repeat=5)
+        peak = peak_memory(lambda: solver.solve(points))
+        rows.append((n, seconds * 1e3, seconds * 1e9 / n, peak / 1024, peak / n))
+
+    print_table(
+        "Skalierung solver.solve",
+        ("Punkte", "Zeit ms", "ns/Punkt", "Peak KiB", "Bytes/Punkt"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 10, 100, 1000, 10000, 100000])
+    args = parser.parse_args()
+    run(args.sizes)
@@ -0,0 +1,48 @@
+"""
+Latenz der Array-API gegen die Dictionary-API
+
+Vergleicht calculate_position (Punkt-Dictionaries) mit solver.solve
+auf (n, 3)- und strukturierten Arrays für typische Punktanzahlen.
+"""
+
+import argparse
+
+import numpy as np
+
+import solver
+from app import AdvancedTriangulationCalculator
+from benchmarks.common import synthetic_point_sets, measure, print_table
+
+
+def run(number: int, sizes) -> None:
+    rows = []
+
+    for n in sizes:
+        points = synthetic_point_sets(1, n)[0]
+        array = solver.points_to_array(points)
+        structured = np.zeros(n, dtype=solver.POINT_DTYPE)
+        structured["lat"], structured["lng"], structured["distance"] = array.T
+
+        def per_call(func):
+            return measure(lambda: [func() for _ in range(number)]) / number * 1e6
+
+        rows.append(
+            (
+                n,
+                per_call(lambda: AdvancedTriangulationCalculator.calculate_position(points)),
+                per_call(lambda: solver.solve(array)),
+                per_call(lambda: solver.solve(structured)),
+            )
+        )
+
+    print_table(
+        "Latenz pro Lösung in µs", ("Punkte", "dict-API", "solve(n,3)", "solve(struct)"), rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 5, 10, 20])
+    args = parser.parse_args()
+    run(args.number, args.sizes)
@@ -0,0 +1,121 @@
+"""
+Startzeit: Import, Aufwärmen und erster Request
+
+Jede Messung läuft in einem frischen Interpreter (Median über --runs):
+    Import app          NumPy, Flask und das Backend
+    Import wsgi         dasselbe plus wsgi.warm_up
+    erster Request      POST /api/triangulate über den Test-Client direkt
+                        nach dem Import, ohne bzw. mit Aufwärmen
+    zweiter Request     Vergleichswert mit warmem Prozess
+Mit --gunicorn zusätzlich die Zeit vom Start des Gunicorn-Masters bis
+zur ersten Antwort auf /api/health, mit und ohne preload_app.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List
+
+from benchmarks.common import print_table
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter() - start
+from app import app, result_cache
+points = [{{"lat": 52.52 + 0.01 * (i % 3), "lng": 13.40 + 0.013 * ((i * 7) % 5),
+           "distance": 800.0 + 37 * i}} for i in range(8)]
+client = app.test_client()
+timings = []
+for k in range(2):
+    result_cache.clear()
+    start = time.perf_counter()
+    response = client.post('/api/triangulate', json={{"points": points, "method": "lm"}})
+    timings.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.get_json()
+print(json.dumps({{"import": imported, "first": timings[0], "second": timings[1]}}))
+"""
+
+
+def probe(module: str, runs: int) -> Dict[str, float]:
+    """Median der Zeiten (Sekunden) über runs frische Interpreter"""
+    samples: List[Dict[str, float]] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "METRICS_ENABLED": "false"},
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+
+
+def gunicorn_ready(preload: bool, timeout: float = 60.0) -> float:
+    """Sekunden vom Start des Masters bis zur ersten Antwort auf /api/health"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "GUNICORN_PRELOAD": str(preload).lower(),
+        "WEB_CONCURRENCY": "2",
+    }
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health", timeout=1):
+                    return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError("Gunicorn antwortet nicht")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run(runs: int, with_gunicorn: bool) -> None:
+    rows = []
+    for module, label in (("app", "ohne Aufwärmen"), ("wsgi", "mit Aufwärmen")):
+        timings = probe(module, runs)
+        rows.append((f"Import {module}", label, timings["import"] * 1e3))
+        rows.append(("erster Request", label, timings["first"] * 1e3))
+        rows.append(("zweiter Request", label, timings["second"] * 1e3))
+
+    if with_gunicorn:
+        for preload in (False, True):
+            seconds = statistics.median(gunicorn_ready(preload) for _ in range(runs))
+            rows.append(
+                ("Gunicorn bis /api/health", f"preload {'an' if preload else 'aus'}", seconds * 1e3)
+            )
+
+    print_table(f"Startzeit (Median aus {runs} Läufen)", ("Messung", "Variante", "ms"), rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="frische Prozesse pro Messung")
+    parser.add_argument("--gunicorn", action="store_true", help="auch Gunicorn-Start messen")
+    args = parser.parse_args()
+    run(args.runs, args.gunicorn)
@@ -0,0 +1,102 @@
+"""
+Durchsatz und Speicherbedarf der NDJSON-Verarbeitung (cli.py)
+
+Erzeugt synthetische NDJSON-Dateien und verarbeitet sie in einem eigenen
+Prozess; gemeldet werden Zeilen pro Sekunde und der Spitzen-RSS des
+Prozesses. Bei konstantem Speicherbedarf bleibt der RSS unabhängig von
+der Dateigröße.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import synthetic_scenario, print_table
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Führt cli.main aus und meldet den Spitzen-RSS des Prozesses in KiB
+CHILD = (
+    "import resource, sys, cli; cli.main(sys.argv[1:]); "
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)"
+)
+
+
+def write_ndjson(path: str, rows: int, n: int, chunk: int = 10000) -> None:
+    """Schreibt rows Punktmengen mit je n Punkten, blockweise erzeugt"""
+    with open(path, "w", encoding="utf-8") as output:
+        for start in range(0, rows, chunk):
+            points, _ = synthetic_scenario(min(chunk, rows - start), n, seed=start)
+            output.writelines(
+                json.dumps(
+                    {
+                        "id": start + k,
+                        "points": [
+                            {"lat": lat, "lng": lng, "distance": distance}
+                            for lat, lng, distance in group
+                        ],
+                    }
+                )
+                + "\n"
+                for k, group in enumerate(points.tolist())
+            )
+
+
+def run(sizes, n: int, chunk_size: int, method: str) -> None:
+    rows = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"points_{size}.ndjson")
+            write_ndjson(path, size, n)
+
+            start = time.perf_counter()
+            child = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    CHILD,
+                    path,
+                    "-o",
+                    os.devnull,
+                    "--method",
+                    method,
+                    "--chunk-size",
+                    str(chunk_size),
+                ],
+                cwd=BACKEND_DIR,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            elapsed = time.perf_counter() - start
+            peak_kib = int(child.stderr.strip().splitlines()[-1])
+
+            rows.append(
+                (
+                    size,
+                    f"{os.path.getsize(path) / 2**20:.0f} MiB",
+                    size / elapsed,
+                    peak_kib / 1024,
+                )
+            )
+
+    print_table(
+        f"NDJSON-Streaming ({n} Punkte pro Zeile, Blockgröße {chunk_size}, {method})",
+        ("Zeilen", "Datei", "Zeilen/s", "Peak RSS MiB"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--points", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--method", default="wls")
+    args = parser.parse_args()
+    run(args.sizes, args.points, args.chunk_size, args.method)
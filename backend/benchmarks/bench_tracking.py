@@ -0,0 +1,172 @@
+"""
+Tracking: aktualisierte Tracks pro Sekunde auf einem Worker
+
+Simuliert K Ziele mit konstanter Geschwindigkeit und je vier
+verrauschten Entfernungen pro Sekunde. Gemessen werden das
+Sammel-Update über TrackStore.update (ein Batch für alle Tracks), die
+Endpunkte /api/tracks/measurements (Sammel-Update) und
+/api/tracks/<id>/measurements (eine Anfrage pro Track) sowie der
+Offline-Glätter. Dazu die Positionsfehler von Filter, Glätter und
+Einzel-Lösungen pro Epoche.
+"""
+
+import argparse
+
+import numpy as np
+
+import solver
+import tracking
+from app import app
+from geometry import haversine
+from benchmarks.common import measure, print_table
+
+
+def trajectories(count: int, epochs: int, n: int = 4, noise: float = 2.0, seed: int = 42) -> tuple:
+    """
+    Ziele mit 5-20 m/s um Berlin, Referenzpunkte im Umkreis von ~2 km
+
+    Returns:
+        (points, truth): Messsätze (count, epochs, n, 3) und wahre
+        Positionen (count, epochs, 2) als lat/lng
+    """
+    rng = np.random.default_rng(seed)
+    start = np.stack((52.5 + rng.normal(0, 0.2, count), 13.4 + rng.normal(0, 0.2, count)), axis=1)
+    speed = rng.uniform(5, 20, count)
+    course = rng.uniform(0, 2 * np.pi, count)
+    seconds = np.arange(epochs)
+
+    scale = solver.METERS_PER_DEGREE * np.cos(np.radians(start[:, 0]))
+    east = (speed * np.sin(course))[:, None] * seconds
+    north = (speed * np.cos(course))[:, None] * seconds
+    truth = np.stack(
+        (
+            start[:, 0, None] + north / solver.METERS_PER_DEGREE,
+            start[:, 1, None] + east / scale[:, None],
+        ),
+        axis=-1,
+    )
+
+    lat = truth[..., 0, None] + rng.normal(0, 0.015, (count, epochs, n))
+    lng = truth[..., 1, None] + rng.normal(0, 0.025, (count, epochs, n))
+    distance = haversine(truth[..., 0, None], truth[..., 1, None], lat, lng)
+    distance = np.abs(distance + rng.normal(0, noise, distance.shape))
+    return np.stack((lat, lng, distance), axis=-1), truth
+
+
+def as_points(points: np.ndarray):
+    return [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in points.tolist()]
+
+
+def throughput(counts, epochs: int) -> None:
+    rows = []
+    client = app.test_client()
+    for count in counts:
+        points, _ = trajectories(count, epochs)
+
+        store = tracking.TrackStore(max_tracks=count)
+        ids = [store.create().track_id for _ in range(count)]
+        store.update([(track_id, 0.0, points[k, 0]) for k, track_id in enumerate(ids)])
+
+        def kernel():
+            for t in range(1, epochs):
+                store.update([(track_id, float(t), points[k, t]) for k, track_id in enumerate(ids)])
+
+        seconds = measure(kernel, repeat=1)
+        rows.append(("TrackStore.update", count, count * (epochs - 1) / seconds))
+
+        ids = [
+            client.post(
+                "/api/tracks",
+                json={"measurement": {"timestamp": 0, "points": as_points(points[k, 0])}},
+            ).get_json()["track_id"]
+            for k in range(count)
+        ]
+        bodies = [
+            {
+                "updates": [
+                    {"track_id": track_id, "timestamp": t, "points": as_points(points[k, t])}
+                    for k, track_id in enumerate(ids)
+                ]
+            }
+            for t in range(1, epochs)
+        ]
+
+        def bulk():
+            for body in bodies:
+                client.post("/api/tracks/measurements", json=body)
+
+        seconds = measure(bulk, repeat=1)
+        rows.append(("/api/tracks/measurements", count, count * (epochs - 1) / seconds))
+
+        if count <= 1000:
+
+            def single():
+                for body in bodies:
+                    for update in body["updates"]:
+                        client.post(f"/api/tracks/{update['track_id']}/measurements", json=update)
+
+            # Zeitstempel sind schon verarbeitet: neue Tracks anlegen
+            ids = [
+                client.post(
+                    "/api/tracks",
+                    json={"measurement": {"timestamp": 0, "points": as_points(points[k, 0])}},
+                ).get_json()["track_id"]
+                for k in range(count)
+            ]
+            for body in bodies:
+                for update, track_id in zip(body["updates"], ids):
+                    update["track_id"] = track_id
+            seconds = measure(single, repeat=1)
+            rows.append(("/api/tracks/<id>/...", count, count * (epochs - 1) / seconds))
+
+    print_table(
+        f"Track-Updates pro Sekunde ({epochs - 1} Epochen, n = 4)",
+        ("Pfad", "Tracks", "Updates/s"),
+        rows,
+    )
+
+
+def accuracy(epochs: int, count: int) -> None:
+    points, truth = trajectories(count, epochs, seed=7)
+    timestamps = np.arange(epochs, dtype=float)
+    mask = np.ones(points.shape[1:3], dtype=bool)
+
+    filtered, smoothed, single = [], [], []
+    smooth_seconds = 0.0
+    for k in range(count):
+        smooth_seconds += measure(lambda: tracking.smooth(timestamps, points[k], mask), repeat=1)
+        result = tracking.smooth(timestamps, points[k], mask)
+        filtered.append(
+            haversine(
+                result["filtered_lat"], result["filtered_lng"], truth[k, :, 0], truth[k, :, 1]
+            )
+        )
+        smoothed.append(haversine(result["lat"], result["lng"], truth[k, :, 0], truth[k, :, 1]))
+        fix = solver.solve_batch(points[k], solver.LM)
+        single.append(haversine(fix["lat"], fix["lng"], truth[k, :, 0], truth[k, :, 1]))
+
+    rows = [
+        (name, float(np.mean(errors)), float(np.percentile(errors, 95)))
+        for name, errors in (("Einzel-LM", single), ("EKF", filtered), ("RTS-Glätter", smoothed))
+    ]
+    print_table(
+        f"Positionsfehler in Metern ({count} Tracks x {epochs} Epochen, σ = 2 m)",
+        ("Verfahren", "Mittel", "95 %"),
+        rows,
+    )
+    print(f"\nGlätter: {count * epochs / smooth_seconds:.0f} Epochen/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--counts", type=int, nargs="+", default=[1, 100, 1000, 10000], help="gleichzeitige Tracks"
+    )
+    parser.add_argument("--epochs", type=int, default=11, help="Messepochen pro Durchsatzlauf")
+    parser.add_argument(
+        "--track-epochs", type=int, default=600, help="Epochen pro geglättetem Track"
+    )
+    parser.add_argument("--tracks", type=int, default=10, help="Tracks für die Genauigkeit")
+    args = parser.parse_args()
+    throughput(args.counts, args.epochs)
+    accuracy(args.track_epochs, args.tracks)
@@ -0,0 +1,104 @@
+"""
+Unsicherheit: Monte-Carlo-Stichproben pro Sekunde und Abdeckung der 95 %-Radien
+
+Durchsatz: uncertainty.monte_carlo je Verfahren und Punktanzahl sowie
+die analytische Kovarianz für einen ganzen Batch. Kalibrierung: Anteil
+der wahren Positionen innerhalb des 95 %-Radius über viele verrauschte
+Szenarien - gut kalibriert liegt er bei etwa 95 %.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import solver
+import uncertainty
+from geometry import haversine
+from benchmarks.common import synthetic_scenario, measure, print_table
+
+
+def throughput(samples: int, sizes) -> None:
+    rows = []
+    noise = uncertainty.NoiseModel(2.0)
+    for n in sizes:
+        points, _ = synthetic_scenario(1, n)
+        result = solver.solve(points[0])
+        for method in solver.METHODS:
+            seconds = measure(
+                lambda: uncertainty.monte_carlo(
+                    points[0], result.lat, result.lng, noise, method, samples
+                )
+            )
+            rows.append((n, method, samples, seconds * 1e3, samples / seconds))
+
+    print_table(
+        "Monte Carlo (eine Anfrage)",
+        ("Punkte", "Verfahren", "Stichproben", "Zeit ms", "Stichproben/s"),
+        rows,
+    )
+
+
+def analytic_batch(count: int, n: int) -> None:
+    points, _ = synthetic_scenario(count, n)
+    result = solver.solve_batch(points)
+    sigma = np.full(points.shape[:2], 2.0)
+
+    def run():
+        cov = uncertainty.covariance(points, result["lat"], result["lng"], sigma)
+        uncertainty.error_ellipse(cov)
+
+    seconds = measure(run)
+    print(
+        f"\nAnalytische Kovarianz + Ellipse: {count} Probleme (n = {n}) in "
+        f"{seconds * 1e3:.1f} ms, {count / seconds:,.0f} pro Sekunde"
+    )
+
+
+def coverage(count: int, n: int, noise: float) -> None:
+    rows = []
+    points, truth = synthetic_scenario(count, n, noise=noise)
+    model = uncertainty.NoiseModel(noise)
+    for method in (solver.LM, solver.WLS):
+        result = solver.solve_batch(points, method)
+        error = haversine(result["lat"], result["lng"], truth[:, 0], truth[:, 1])
+        cov = uncertainty.covariance(
+            points, result["lat"], result["lng"], model.sigmas(points[..., 2])
+        )
+        radius = uncertainty.error_ellipse(cov)["radius_95"]
+
+        start = time.perf_counter()
+        mc_inside = 0
+        mc_count = min(count, 200)
+        for k in range(mc_count):
+            report = uncertainty.monte_carlo(
+                points[k], result["lat"][k], result["lng"][k], model, method, samples=500
+            )
+            mc_inside += error[k] <= report["radius_95"]
+        mc_seconds = time.perf_counter() - start
+
+        rows.append(
+            (
+                method,
+                f"{(error <= radius).mean():.1%}",
+                f"{mc_inside / mc_count:.1%}",
+                mc_seconds / mc_count * 1e3,
+            )
+        )
+
+    print_table(
+        f"Abdeckung der 95 %-Radien (σ = {noise} m, n = {n})",
+        ("Verfahren", "analytisch", "Monte Carlo", "MC ms/Anfrage"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=2000, help="Monte-Carlo-Stichproben")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 10, 50])
+    parser.add_argument("--count", type=int, default=2000, help="Szenarien für die Abdeckung")
+    args = parser.parse_args()
+    throughput(args.samples, args.sizes)
+    analytic_batch(10000, 10)
+    coverage(args.count, 8, 2.0)
@@ -0,0 +1,78 @@
+"""
+Punktvalidierung: Gitter-Nachbarsuche gegen paarweise Schleife
+
+Misst geometry.analyze_geometry und den Endpunkt /api/points/validate
+(inklusive JSON) für n = 10 bis 50k Punkte, gleichmäßig verteilt und
+stark gehäuft. Die frühere O(n²)-Schleife über alle Punktpaare läuft
+nur bis --legacy-max Punkte.
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+from app import app
+from geometry import analyze_geometry
+from benchmarks.common import synthetic_scenario, measure, print_table
+
+
+def legacy_spacing(points) -> tuple:
+    """Frühere Implementierung: alle Paare, Gradabstand mal 111 km"""
+    distances = []
+    for i in range(len(points)):
+        for j in range(i + 1, len(points)):
+            p1, p2 = points[i], points[j]
+            distances.append(math.sqrt((p1["lat"] - p2["lat"]) ** 2 + (p1["lng"] - p2["lng"]) ** 2))
+    return min(distances) * 111000, max(distances) * 111000
+
+
+def clustered(data: np.ndarray, seed: int = 7) -> np.ndarray:
+    """Zieht die Hälfte der Punkte in fünf Häufungen von wenigen Metern zusammen"""
+    rng = np.random.default_rng(seed)
+    data = data.copy()
+    half = len(data) // 2
+    centers = data[rng.integers(0, len(data), 5), :2]
+    data[:half, :2] = centers[rng.integers(0, 5, half)] + rng.normal(0, 2e-5, (half, 2))
+    return data
+
+
+def run(sizes, legacy_max: int) -> None:
+    client = app.test_client()
+    rows = []
+
+    for n in sizes:
+        uniform = synthetic_scenario(1, n, spread=0.05)[0][0]
+        for layout, data in (("gleichmäßig", uniform), ("gehäuft", clustered(uniform))):
+            points = [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in data.tolist()]
+            kernel = measure(lambda: analyze_geometry(data), repeat=3)
+            endpoint = measure(
+                lambda: client.post("/api/points/validate", json={"points": points}), repeat=3
+            )
+            legacy = measure(lambda: legacy_spacing(points), repeat=1) if n <= legacy_max else None
+            rows.append(
+                (
+                    n,
+                    layout,
+                    kernel * 1e3,
+                    endpoint * 1e3,
+                    legacy * 1e3 if legacy is not None else "-",
+                    f"{legacy / kernel:.0f}x" if legacy is not None else "-",
+                )
+            )
+
+    print_table(
+        "Validierung /api/points/validate",
+        ("Punkte", "Verteilung", "Analyse ms", "Endpunkt ms", "Paarschleife ms", "Faktor"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 50000])
+    parser.add_argument(
+        "--legacy-max", type=int, default=2000, help="größte Punktanzahl für die paarweise Schleife"
+    )
+    args = parser.parse_args()
+    run(args.sizes, args.legacy_max)
@@ -0,0 +1,102 @@
+"""
+Übertragungsformate: JSON gegen MessagePack und gepackte float64-Arrays
+
+Misst Größe von Anfrage und Antwort sowie die Latenz über den
+Test-Client (Kodieren, Anfrage, Dekodieren) für /api/triangulate und
+/api/triangulate/batch. Einzelanfragen treffen nach dem ersten Aufruf
+den Ergebnis-Cache, dort bleibt vor allem die Kodierung. MessagePack-
+Zeilen entfallen, wenn das Paket msgpack nicht installiert ist.
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+import wire
+from app import app
+from benchmarks.common import synthetic_scenario, measure, print_table
+
+
+def as_point_list(points: np.ndarray):
+    return [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in points.tolist()]
+
+
+def codecs(points: np.ndarray, batch: bool):
+    """
+    (Name, Kodierung, Content-Type, Accept, Query, Dekodierung) je Format
+
+    Kodierung und Dekodierung laufen im Messzeitraum, wie bei einem Client.
+    """
+    key = "point_sets" if batch else "points"
+    query = f"?n={points.shape[-2]}" if batch else ""
+
+    def json_body():
+        value = [as_point_list(p) for p in points] if batch else as_point_list(points)
+        return json.dumps({key: value}).encode()
+
+    yield ("JSON", json_body, "application/json", "application/json", "", json.loads)
+
+    def msgpack_body():
+        value = [p.tobytes() for p in points] if batch else points.tobytes()
+        return wire.encode({key: value})
+
+    yield (
+        "MessagePack",
+        msgpack_body,
+        "application/msgpack",
+        "application/msgpack",
+        "",
+        wire.decode,
+    )
+
+    yield (
+        "gepackt",
+        lambda: points.astype("<f8").tobytes(),
+        "application/octet-stream",
+        "application/octet-stream",
+        query,
+        lambda data: np.frombuffer(data, "<f8").reshape(-1, len(wire.PACKED_FIELDS)),
+    )
+
+
+def run(count: int, n: int, repeat: int) -> None:
+    client = app.test_client()
+    points, _ = synthetic_scenario(count, n)
+    rows = []
+
+    for batch, label, data in ((False, "einzeln", points[0]), (True, f"Batch {count}", points)):
+        url = "/api/triangulate/batch" if batch else "/api/triangulate"
+        for name, encode, content_type, accept, query, decode in codecs(data, batch):
+
+            def roundtrip():
+                response = client.post(
+                    url + query,
+                    data=encode(),
+                    content_type=content_type,
+                    headers={"Accept": accept},
+                )
+                return decode(response.data)
+
+            response = client.post(
+                url + query, data=encode(), content_type=content_type, headers={"Accept": accept}
+            )
+            assert response.status_code == 200, response.data[:200]
+            calls = 1 if batch else repeat
+            seconds = measure(lambda: [roundtrip() for _ in range(calls)]) / calls
+            rows.append((label, name, len(encode()), len(response.data), seconds * 1e3))
+
+    print_table(
+        f"Übertragungsformate (n = {n}, Methode wls)",
+        ("Anfrage", "Format", "Bytes hin", "Bytes zurück", "Latenz ms"),
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=5000, help="Punktmengen im Batch")
+    parser.add_argument("--n", type=int, default=8, help="Punkte pro Punktmenge")
+    parser.add_argument("--repeat", type=int, default=200, help="Einzelanfragen pro Messung")
+    args = parser.parse_args()
+    run(args.count, args.n, args.repeat)
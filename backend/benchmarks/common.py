@@ -0,0 +1,165 @@
+"""
+Gemeinsame Hilfsfunktionen für Benchmarks
+"""
+
+import math
+import time
+import numpy as np
+from typing import Callable, Dict, List, Tuple
+
+from geometry import haversine
+
+METERS_PER_DEGREE = 111195.0
+
+# Anordnungen der Referenzpunkte für scenario()
+GEOMETRIES = ("uniform", "ring", "cluster", "line")
+
+
+def synthetic_scenario(
+    count: int,
+    n: int,
+    noise: float = 2.0,
+    spread: float = 0.01,
+    seed: int = 42,
+    outliers: float = 0.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Erzeugt reproduzierbare Punktmengen um zufällige wahre Positionen
+
+    Args:
+        count: Anzahl der Punktmengen
+        n: Referenzpunkte pro Punktmenge
+        noise: Standardabweichung des Entfernungsrauschens in Metern
+        spread: Streuung der Referenzpunkte in Grad
+        seed: Zufalls-Seed
+        outliers: Anteil der Entfernungen mit grobem Fehler (100-1000 m)
+
+    Returns:
+        (points, truth): Punkte (count, n, 3) als lat/lng/distance und
+        wahre Positionen (count, 2) als lat/lng
+    """
+    rng = np.random.default_rng(seed)
+    true_lat = 52.5 + rng.normal(0, 0.5, count)
+    true_lng = 13.4 + rng.normal(0, 0.5, count)
+    lat = true_lat[:, None] + rng.normal(0, spread, (count, n))
+    lng = true_lng[:, None] + rng.normal(0, spread, (count, n))
+
+    dx = (lng - true_lng[:, None]) * METERS_PER_DEGREE * np.cos(np.radians(true_lat))[:, None]
+    dy = (lat - true_lat[:, None]) * METERS_PER_DEGREE
+    distance = np.abs(np.hypot(dx, dy) + rng.normal(0, noise, (count, n))) + 0.1
+    if outliers:
+        gross = rng.random((count, n)) < outliers
+        distance += gross * rng.uniform(100, 1000, (count, n))
+
+    return np.stack((lat, lng, distance), axis=-1), np.stack((true_lat, true_lng), axis=-1)
+
+
+def scenario(
+    count: int,
+    n: int,
+    geometry: str = "uniform",
+    radius: float = 1000.0,
+    noise: float = 2.0,
+    outliers: float = 0.0,
+    seed: int = 42,
+    lat: float = 52.5,
+    lng: float = 13.4,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reproduzierbare Szenarien mit bekannter wahrer Position und wählbarer Geometrie
+
+    Die wahren Positionen streuen um ±0,1° um (lat, lng); die Entfernungen
+    sind Haversine-Entfernungen (Kugelmodell der App) plus Rauschen.
+
+    Args:
+        count: Anzahl der Punktmengen
+        n: Referenzpunkte pro Punktmenge (3 bis 100k)
+        geometry: 'uniform' (Kreisscheibe), 'ring' (gleichmäßig auf dem
+            Kreis), 'cluster' (Häufung auf einer Seite, ungünstiger GDOP)
+            oder 'line' (nahezu kollinear)
+        radius: Ausdehnung der Referenzpunkte in Metern
+        noise: Standardabweichung des Entfernungsrauschens in Metern
+        outliers: Anteil der Entfernungen mit grobem Fehler (+100-1000 m)
+        seed: Zufalls-Seed
+
+    Returns:
+        (points, truth) wie synthetic_scenario
+    """
+    if geometry not in GEOMETRIES:
+        raise ValueError(f"Unbekannte Geometrie '{geometry}' - erlaubt: {', '.join(GEOMETRIES)}")
+
+    rng = np.random.default_rng(seed)
+    true_lat = lat + rng.uniform(-0.1, 0.1, count)
+    true_lng = lng + rng.uniform(-0.1, 0.1, count)
+
+    if geometry == "ring":
+        angle = rng.uniform(0, 2 * math.pi, (count, 1)) + np.linspace(
+            0, 2 * math.pi, n, endpoint=False
+        )
+        east, north = radius * np.sin(angle), radius * np.cos(angle)
+    elif geometry == "cluster":
+        direction = rng.uniform(0, 2 * math.pi, (count, 1))
+        angle = rng.uniform(0, 2 * math.pi, (count, n))
+        spread = radius / 5 * np.sqrt(rng.random((count, n)))
+        east = radius * np.sin(direction) + spread * np.sin(angle)
+        north = radius * np.cos(direction) + spread * np.cos(angle)
+    elif geometry == "line":
+        direction = rng.uniform(0, 2 * math.pi, (count, 1))
+        along = rng.uniform(-radius, radius, (count, n))
+        across = radius * 0.01 * rng.standard_normal((count, n)) + radius / 2
+        east = along * np.sin(direction) + across * np.cos(direction)
+        north = along * np.cos(direction) - across * np.sin(direction)
+    else:
+        angle = rng.uniform(0, 2 * math.pi, (count, n))
+        distance = radius * np.sqrt(rng.random((count, n)))
+        east, north = distance * np.sin(angle), distance * np.cos(angle)
+
+    point_lat = true_lat[:, None] + north / METERS_PER_DEGREE
+    point_lng = true_lng[:, None] + east / (
+        METERS_PER_DEGREE * np.cos(np.radians(true_lat))[:, None]
+    )
+    distance = haversine(true_lat[:, None], true_lng[:, None], point_lat, point_lng)
+    distance = distance + rng.normal(0, noise, (count, n))
+    if outliers:
+        gross = rng.random((count, n)) < outliers
+        distance += gross * rng.uniform(100, 1000, (count, n))
+
+    return (
+        np.stack((point_lat, point_lng, np.abs(distance) + 0.1), axis=-1),
+        np.stack((true_lat, true_lng), axis=-1),
+    )
+
+
+def synthetic_point_sets(
+    count: int, n: int, noise: float = 2.0, spread: float = 0.01, seed: int = 42
+) -> List[List[Dict]]:
+    """Wie synthetic_scenario, aber als Listen von Punkt-Dictionaries"""
+    points, _ = synthetic_scenario(count, n, noise, spread, seed)
+    return [
+        [{"lat": la, "lng": lo, "distance": d} for la, lo, d in rows] for rows in points.tolist()
+    ]
+
+
+def position_error(lat: np.ndarray, lng: np.ndarray, truth: np.ndarray) -> np.ndarray:
+    """Abstand in Metern zwischen berechneten und wahren Positionen"""
+    dy = (lat - truth[:, 0]) * METERS_PER_DEGREE
+    dx = (lng - truth[:, 1]) * METERS_PER_DEGREE * np.cos(np.radians(truth[:, 0]))
+    return np.hypot(dx, dy)
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> float:
+    """Beste Laufzeit in Sekunden aus mehreren Wiederholungen"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_table(title: str, header: Tuple[str, ...], rows: List[Tuple]) -> None:
+    """Gibt eine einfache Ergebnistabelle aus"""
+    print(f"\n{title}")
+    print("  " + " | ".join(f"{h:>14}" for h in header))
+    for row in rows:
+        print("  " + " | ".join(f"{v:>14.1f}" if isinstance(v, float) else f"{v:>14}" for v in row))
@@ -0,0 +1,392 @@
+"""
+Reproduzierbare Benchmark- und Regressions-Suite
+
+Misst mit festen Seeds (siehe common.scenario):
+    calculate_position  Latenz pro Aufruf für n = 3 bis 100k und je Methode
+    solver              Durchsatz von solver.solve_batch je Lösungspfad
+    routes              Latenz der Flask-Routen über den Test-Client
+    accuracy            Positionsfehler gegen die wahre Position je
+                        Geometrie, Methode, Rauschen und Ausreißeranteil
+    startup             Importzeit und erster Request in frischen
+                        Prozessen (siehe bench_startup)
+
+Aufruf aus dem backend/ Verzeichnis:
+    python -m benchmarks.suite run --output baseline.json
+    python -m benchmarks.suite run --output current.json --baseline baseline.json
+    python -m benchmarks.suite compare baseline.json current.json
+
+'compare' (und 'run --baseline') endet mit Exit-Code 1, wenn eine
+Kennzahl schlechter als die Toleranz ist: Zeiten relativ
+(--tolerance), Fehler relativ plus absolut (--accuracy-tolerance,
+ACCURACY_FLOOR). Genauigkeiten sind deterministisch, Zeiten hängen von
+der Maschine ab und sind nur auf derselben Maschine vergleichbar.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+import solver
+from app import AdvancedTriangulationCalculator, app, result_cache
+from geometry import haversine
+from benchmarks.bench_startup import probe
+from benchmarks.common import scenario, measure, print_table
+
+SCHEMA_VERSION = 1
+
+LOWER = "lower"
+HIGHER = "higher"
+
+TIME_BUDGET = 0.2  # Sekunden pro Messung; --quick viertelt
+ACCURACY_FLOOR = 0.01  # Meter, unterhalb derer Fehleränderungen nicht zählen
+
+POSITION_SIZES = (3, 4, 8, 20, 100, 1000, 10000, 100000)
+QUICK_POSITION_SIZES = (3, 8, 100, 10000)
+
+
+class Suite:
+    """Sammelt Ergebnisse als {Fall: {Kennzahl: Wert}}"""
+
+    def __init__(self, quick: bool, pattern: Optional[str]):
+        self.quick = quick
+        self.pattern = pattern
+        self.budget = TIME_BUDGET / 4 if quick else TIME_BUDGET
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    def wanted(self, case: str) -> bool:
+        return self.pattern is None or self.pattern in case
+
+    def record(self, case: str, metric: str, value: float, unit: str, better: str) -> None:
+        self.results.setdefault(case, {})[metric] = {
+            "value": float(value),
+            "unit": unit,
+            "better": better,
+        }
+
+    def time_call(self, func: Callable[[], object]) -> float:
+        """Sekunden pro Aufruf; Wiederholungen so, dass budget gefüllt wird"""
+        single = measure(func, repeat=1)
+        number = max(1, min(10000, int(self.budget / max(single, 1e-7))))
+        return measure(lambda: [func() for _ in range(number)], repeat=3) / number
+
+    def latency(self, case: str, func: Callable[[], object]) -> None:
+        if self.wanted(case):
+            self.record(case, "latency_us", self.time_call(func) * 1e6, "µs", LOWER)
+
+    def throughput(self, case: str, func: Callable[[], object], items: int) -> None:
+        if self.wanted(case):
+            self.record(case, "throughput", items / self.time_call(func), "1/s", HIGHER)
+
+
+def as_point_list(points: np.ndarray) -> List[Dict[str, float]]:
+    return [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in points.tolist()]
+
+
+def uncached(func: Callable[[], object]) -> Callable[[], object]:
+    """Leert den Ergebnis-Cache vor jedem Aufruf, damit gerechnet wird"""
+
+    def call():
+        result_cache.clear()
+        return func()
+
+    return call
+
+
+def bench_calculate_position(suite: Suite) -> None:
+    sizes = QUICK_POSITION_SIZES if suite.quick else POSITION_SIZES
+    for n in sizes:
+        points = as_point_list(scenario(1, n, seed=n)[0][0])
+        suite.latency(
+            f"calculate_position/wls/n={n}",
+            uncached(lambda: AdvancedTriangulationCalculator.calculate_position(points)),
+        )
+
+    points = as_point_list(scenario(1, 8, outliers=0.1, seed=8)[0][0])
+    for method in (solver.LM, solver.RANSAC):
+        suite.latency(
+            f"calculate_position/{method}/n=8",
+            uncached(lambda: AdvancedTriangulationCalculator.calculate_position(points, method)),
+        )
+
+
+def bench_solver(suite: Suite) -> None:
+    count = 200 if suite.quick else 1000
+    trilateration, _ = scenario(count, 3, seed=3)
+    points, _ = scenario(count, 8, outliers=0.1, seed=8)
+
+    suite.throughput(
+        f"solver/trilateration/B={count}", lambda: solver.solve_batch(trilateration), count
+    )
+    for method in solver.METHODS:
+        suite.throughput(
+            f"solver/{method}/B={count}/n=8", lambda: solver.solve_batch(points, method), count
+        )
+    suite.latency("solver/solve/n=8", lambda: solver.solve(points[0]))
+
+
+def bench_routes(suite: Suite) -> None:
+    client = app.test_client()
+    points = as_point_list(scenario(1, 8, seed=1)[0][0])
+    sets = [as_point_list(p) for p in scenario(100, 8, seed=2)[0]]
+    many = as_point_list(scenario(1, 1000, radius=5000, seed=4)[0][0])
+    sites = [{"lat": p["lat"], "lng": p["lng"]} for p in many[:100]]
+    stream = "\n".join(json.dumps(p) for p in sets).encode()
+
+    requests = (
+        ("POST /api/triangulate", lambda: client.post("/api/triangulate", json={"points": points})),
+        (
+            "POST /api/triangulate lm",
+            lambda: client.post("/api/triangulate", json={"points": points, "method": "lm"}),
+        ),
+        (
+            "POST /api/triangulate/batch 100",
+            lambda: client.post("/api/triangulate/batch", json={"point_sets": sets}),
+        ),
+        (
+            "POST /api/triangulate/stream 100",
+            lambda: client.post("/api/triangulate/stream", data=stream),
+        ),
+        (
+            "POST /api/triangulate/preview",
+            lambda: client.post("/api/triangulate/preview", json={"points": points}),
+        ),
+        (
+            "POST /api/points/validate 1000",
+            lambda: client.post("/api/points/validate", json={"points": many}),
+        ),
+        (
+            "POST /api/distance",
+            lambda: client.post("/api/distance", json={"point1": sites[0], "point2": sites[1]}),
+        ),
+        (
+            "POST /api/distance/matrix 100x100",
+            lambda: client.post(
+                "/api/distance/matrix", json={"origins": sites, "destinations": sites}
+            ),
+        ),
+        ("GET /api/health", lambda: client.get("/api/health")),
+    )
+    for name, request in requests:
+        response = request()
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: Status {response.status_code}")
+        suite.latency(f"routes/{name}", uncached(request))
+
+
+def accuracy_cases(quick: bool) -> Iterable[Dict[str, Any]]:
+    """Szenarien der Genauigkeitsmessung"""
+    for geometry in ("uniform", "ring", "cluster"):
+        for method in solver.METHODS:
+            yield {"geometry": geometry, "method": method, "n": 8, "noise": 2.0, "outliers": 0.0}
+    for method in solver.METHODS:
+        yield {"geometry": "uniform", "method": method, "n": 8, "noise": 2.0, "outliers": 0.15}
+    yield {"geometry": "uniform", "method": solver.WLS, "n": 3, "noise": 2.0, "outliers": 0.0}
+    yield {"geometry": "uniform", "method": solver.LM, "n": 50, "noise": 5.0, "outliers": 0.0}
+    yield {"geometry": "line", "method": solver.LM, "n": 8, "noise": 2.0, "outliers": 0.0}
+
+
+def bench_accuracy(suite: Suite) -> None:
+    count = 200 if suite.quick else 1000
+    for seed, case in enumerate(accuracy_cases(suite.quick)):
+        name = (
+            f"accuracy/{case['method']}/{case['geometry']}/n={case['n']}"
+            f"/noise={case['noise']:g}/outliers={case['outliers']:g}"
+        )
+        if not suite.wanted(name):
+            continue
+        points, truth = scenario(
+            count,
+            case["n"],
+            case["geometry"],
+            noise=case["noise"],
+            outliers=case["outliers"],
+            seed=1000 + seed,
+        )
+        result = solver.solve_batch(points, case["method"])
+        valid = result["valid"]
+        error = haversine(
+            result["lat"][valid], result["lng"][valid], truth[valid, 0], truth[valid, 1]
+        )
+        suite.record(name, "mean_m", error.mean() if len(error) else np.nan, "m", LOWER)
+        suite.record(name, "p95_m", np.percentile(error, 95) if len(error) else np.nan, "m", LOWER)
+        suite.record(name, "failure_rate", 1 - valid.mean(), "", LOWER)
+
+
+def bench_startup(suite: Suite) -> None:
+    runs = 3 if suite.quick else 7
+    for module in ("app", "wsgi"):
+        if not suite.wanted(f"startup/{module}"):
+            continue
+        timings = probe(module, runs)
+        for name, seconds in timings.items():
+            suite.record(f"startup/{module}/{name}", "latency_us", seconds * 1e6, "µs", LOWER)
+
+
+GROUPS = {
+    "calculate_position": bench_calculate_position,
+    "solver": bench_solver,
+    "routes": bench_routes,
+    "accuracy": bench_accuracy,
+    "startup": bench_startup,
+}
+
+
+def metadata(quick: bool) -> Dict[str, Any]:
+    try:
+        commit = (
+            subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10
+            ).stdout.strip()
+            or None
+        )
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "quick": quick,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def run(groups: List[str], quick: bool, pattern: Optional[str]) -> Dict[str, Any]:
+    suite = Suite(quick, pattern)
+    for group in groups:
+        print(f"… {group}", file=sys.stderr)
+        GROUPS[group](suite)
+    return {"schema": SCHEMA_VERSION, "meta": metadata(quick), "results": suite.results}
+
+
+def show(report: Dict[str, Any]) -> None:
+    rows = [
+        (case, metric, f"{entry['value']:.4g} {entry['unit']}".strip())
+        for case, metrics in report["results"].items()
+        for metric, entry in metrics.items()
+    ]
+    print_table("Benchmark-Suite", ("Fall", "Kennzahl", "Wert"), rows)
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float, accuracy_tolerance: float
+) -> bool:
+    """
+    Vergleicht zwei Berichte und gibt Abweichungen aus
+
+    Returns:
+        True, wenn keine Kennzahl die Toleranz überschreitet
+    """
+    if baseline.get("schema") != current.get("schema"):
+        print(f"Warnung: Schema {baseline.get('schema')} gegen {current.get('schema')}")
+    if baseline["meta"].get("quick") != current["meta"].get("quick"):
+        print(
+            "Warnung: Baseline und aktueller Lauf nutzen unterschiedliche Szenariogrößen (--quick)"
+        )
+
+    rows, regressions = [], 0
+    for case, metrics in current["results"].items():
+        for metric, entry in metrics.items():
+            base = baseline["results"].get(case, {}).get(metric)
+            if base is None:
+                rows.append((case, metric, "-", f"{entry['value']:.4g}", "-", "neu"))
+                continue
+
+            old, new = base["value"], entry["value"]
+            timing = entry["unit"] in ("µs", "1/s")
+            allowed = tolerance if timing else accuracy_tolerance
+            floor = 0.0 if timing else ACCURACY_FLOOR
+            if entry["better"] == LOWER:
+                worse = new > old * (1 + allowed) + floor
+                better = new < old / (1 + allowed) - floor
+            else:
+                worse = new < old / (1 + allowed)
+                better = new > old * (1 + allowed)
+            if not np.isfinite(old) or not np.isfinite(new):
+                worse, better = np.isfinite(old) and not np.isfinite(new), False
+
+            status = "REGRESSION" if worse else "besser" if better else "ok"
+            regressions += bool(worse)
+            change = f"{(new / old - 1) * 100:+.1f} %" if old else "-"
+            rows.append((case, metric, f"{old:.4g}", f"{new:.4g}", change, status))
+
+    missing = [case for case in baseline["results"] if case not in current["results"]]
+    print_table(
+        f"Vergleich gegen {baseline['meta'].get('commit') or 'Baseline'} "
+        f"(Zeiten ±{tolerance:.0%}, Fehler ±{accuracy_tolerance:.0%})",
+        ("Fall", "Kennzahl", "Baseline", "Aktuell", "Änderung", "Status"),
+        rows,
+    )
+    if missing:
+        print(f"\nNicht gemessen: {', '.join(missing)}")
+    print(f"\n{regressions} Regression(en)")
+    return regressions == 0
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Suite ausführen")
+    run_parser.add_argument("--groups", nargs="+", choices=list(GROUPS), default=list(GROUPS))
+    run_parser.add_argument(
+        "--quick", action="store_true", help="kleinere Szenarien und kürzere Messungen"
+    )
+    run_parser.add_argument("--filter", help="nur Fälle, deren Name diesen Text enthält")
+    run_parser.add_argument("--output", help="Ergebnis als JSON schreiben")
+    run_parser.add_argument("--baseline", help="anschließend gegen diese Baseline vergleichen")
+
+    compare_parser = commands.add_parser("compare", help="zwei Ergebnisdateien vergleichen")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+
+    for command in (run_parser, compare_parser):
+        command.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="erlaubte relative Verschlechterung von Zeiten",
+        )
+        command.add_argument(
+            "--accuracy-tolerance",
+            type=float,
+            default=0.05,
+            help="erlaubte relative Verschlechterung von Fehlern",
+        )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run(args.groups, args.quick, args.filter)
+        show(report)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as handle:
+                json.dump(report, handle, indent=2)
+        if args.baseline:
+            sys.exit(
+                0
+                if compare(load(args.baseline), report, args.tolerance, args.accuracy_tolerance)
+                else 1
+            )
+    else:
+        sys.exit(
+            0
+            if compare(
+                load(args.baseline), load(args.current), args.tolerance, args.accuracy_tolerance
+            )
+            else 1
+        )
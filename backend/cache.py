@@ -0,0 +1,116 @@
+"""
+Begrenzter In-Process-Cache für Triangulationsergebnisse
+
+Vorschau und vollständige Berechnung liefern für dieselben Punkte
+dasselbe Ergebnis; der Cache sitzt deshalb vor calculate_position und
+wird von beiden Endpunkten gemeinsam genutzt. Jeder Gunicorn-Worker hat
+seinen eigenen Cache, die Größe ist pro Worker begrenzt.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Rundung der Schlüssel: 1e-7 Grad sind ca. 1 cm, Entfernungen auf mm
+COORDINATE_DECIMALS = 7
+DISTANCE_DECIMALS = 3
+
+
+def point_set_key(points: np.ndarray, method: str) -> str:
+    """
+    Kanonischer Hash einer Punktmenge (n, 3) mit lat, lng, distance
+
+    Werte werden vor dem Hashen gerundet, sodass Eingaben mit
+    Darstellungsunterschieden unterhalb der Messgenauigkeit denselben
+    Schlüssel erhalten. Die Reihenfolge der Punkte bleibt Teil des
+    Schlüssels, da Antworten Punkt-IDs enthalten.
+    """
+    rounded = np.empty(points.shape, dtype=np.float64)
+    rounded[:, :2] = np.round(points[:, :2], COORDINATE_DECIMALS)
+    rounded[:, 2] = np.round(points[:, 2], DISTANCE_DECIMALS)
+    rounded += 0.0  # -0.0 und 0.0 vereinheitlichen
+
+    digest = hashlib.blake2b(method.encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update(rounded.tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Thread-sicherer LRU-Cache mit optionaler Ablaufzeit
+
+    Gespeicherte Werte werden geteilt zurückgegeben und dürfen vom
+    Aufrufer nicht verändert werden.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        """
+        Args:
+            max_size: maximale Anzahl Einträge, 0 deaktiviert den Cache
+            ttl: Lebensdauer eines Eintrags in Sekunden, None für unbegrenzt
+        """
+        self.max_size = max_size
+        self.ttl = ttl or None
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Liefert den Eintrag oder None und markiert ihn als zuletzt genutzt"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires, value = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Speichert einen Eintrag und verdrängt bei Bedarf die ältesten"""
+        if self.max_size <= 0:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Leert den Cache, Zähler bleiben erhalten"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /api/health"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
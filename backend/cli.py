@@ -0,0 +1,45 @@
+"""
+Kommandozeile für die Offline-Triangulation großer NDJSON-Dateien
+
+Liest eine Punktmenge pro Zeile (Punktliste oder {"id": ..., "points": [...]})
+und schreibt ein Ergebnis pro Zeile, blockweise und mit konstantem
+Speicherbedarf - identisch zu POST /api/triangulate/stream.
+
+    python cli.py messungen.ndjson -o ergebnisse.ndjson --method lm
+    cat messungen.ndjson | python cli.py - > ergebnisse.ndjson
+"""
+
+import argparse
+import sys
+
+import solver
+from app import STREAM_CHUNK_SIZE, stream_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="NDJSON-Punktmengen triangulieren")
+    parser.add_argument("input", help="NDJSON-Eingabedatei oder - für stdin")
+    parser.add_argument("-o", "--output", default="-", help="Ausgabedatei oder - für stdout")
+    parser.add_argument("--method", choices=solver.METHODS, default=solver.WLS)
+    parser.add_argument(
+        "--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="Punktmengen pro Block"
+    )
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error("--chunk-size muss mindestens 1 sein")
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    target = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        target.writelines(stream_results(source, args.method, args.chunk_size))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not sys.stdout:
+            target.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Vektorisierte Geometrie-Analyse von Referenzpunkten
+
+Nächste Nachbarn über ein gleichmäßiges Gitter in lokalen Metern statt
+aller Punktpaare: Kandidaten stammen nur aus den 3x3 Nachbarzellen, die
+Zellgröße wird für Punkte ohne ausreichend nahen Kandidaten schrittweise
+verdoppelt. Abstände werden abschließend per Haversine bestimmt.
+"""
+
+import math
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+import projection
+import solver
+
+# Mittlere Belegung der eigenen Zelle je Punkt, ab der das Gitter verfeinert wird
+GRID_PAIR_BUDGET = 4
+
+# Abstand in Metern, unter dem zwei Referenzpunkte als nahezu identisch gelten
+NEAR_DUPLICATE_DISTANCE = 1.0
+
+# Richtungen für die Schätzung des größten Punktabstands
+DIAMETER_DIRECTIONS = 16
+
+# Entfernungsmodelle: Kugel (Haversine) und WGS84-Ellipsoid (Vincenty)
+HAVERSINE = "haversine"
+VINCENTY = "vincenty"
+DISTANCE_MODES = (HAVERSINE, VINCENTY)
+
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = WGS84_A * (1 - WGS84_F)
+VINCENTY_TOLERANCE = 1e-12
+VINCENTY_MAX_ITERATIONS = 200
+
+_OFFSETS = np.array([(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)], dtype=np.int64)
+
+
+def haversine(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """Großkreisabstand in Metern; Argumente in Grad, broadcastfähig"""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * projection.EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def vincenty(lat1, lng1, lat2, lng2) -> np.ndarray:
+    """
+    Ellipsoidischer Abstand (WGS84) in Metern nach Vincenty, broadcastfähig
+
+    Iteriert werden nur noch nicht konvergierte Paare. Nahezu antipodale
+    Paare, für die die Iteration nicht konvergiert, erhalten den
+    Haversine-Abstand (Fehler unter 0,5 %).
+    """
+    lat1, lng1, lat2, lng2 = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (lat1, lng1, lat2, lng2))
+    )
+    shape = lat1.shape
+    lat1, lng1, lat2, lng2 = (np.radians(v.ravel()) for v in (lat1, lng1, lat2, lng2))
+
+    L = lng2 - lng1
+    U1 = np.arctan((1 - WGS84_F) * np.tan(lat1))
+    U2 = np.arctan((1 - WGS84_F) * np.tan(lat2))
+    sinU1, cosU1, sinU2, cosU2 = np.sin(U1), np.cos(U1), np.sin(U2), np.cos(U2)
+
+    def geodesic(lam, i):
+        """Hilfsgrößen der Iteration für die Paare i bei Längendifferenz lam"""
+        sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+        sin_sigma = np.hypot(
+            cosU2[i] * sin_lam, cosU1[i] * sinU2[i] - sinU1[i] * cosU2[i] * cos_lam
+        )
+        cos_sigma = sinU1[i] * sinU2[i] + cosU1[i] * cosU2[i] * cos_lam
+        sigma = np.arctan2(sin_sigma, cos_sigma)
+        safe = np.where(sin_sigma == 0, 1.0, sin_sigma)
+        sin_alpha = np.where(sin_sigma == 0, 0.0, cosU1[i] * cosU2[i] * sin_lam / safe)
+        cos2_alpha = 1 - sin_alpha**2
+        # Äquatoriale Linien: cos²α = 0
+        cos_2sigma_m = np.where(
+            cos2_alpha == 0,
+            0.0,
+            cos_sigma - 2 * sinU1[i] * sinU2[i] / np.where(cos2_alpha == 0, 1.0, cos2_alpha),
+        )
+        return sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m
+
+    lam = L.copy()
+    active = np.arange(len(L))
+    for _ in range(VINCENTY_MAX_ITERATIONS):
+        if not active.size:
+            break
+        sin_sigma, cos_sigma, sigma, sin_alpha, cos2_alpha, cos_2sigma_m = geodesic(
+            lam[active], active
+        )
+        C = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+        previous = lam[active]
+        lam[active] = L[active] + (1 - C) * WGS84_F * sin_alpha * (
+            sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (2 * cos_2sigma_m**2 - 1))
+        )
+        active = active[np.abs(lam[active] - previous) > VINCENTY_TOLERANCE]
+
+    everything = np.arange(len(L))
+    sin_sigma, cos_sigma, sigma, _, cos2_alpha, cos_2sigma_m = geodesic(lam, everything)
+    u2 = cos2_alpha * (WGS84_A**2 - WGS84_B**2) / WGS84_B**2
+    A = 1 + u2 / 16384 * (4096 + u2 * (-768 + u2 * (320 - 175 * u2)))
+    B = u2 / 1024 * (256 + u2 * (-128 + u2 * (74 - 47 * u2)))
+    delta_sigma = (
+        B
+        * sin_sigma
+        * (
+            cos_2sigma_m
+            + B
+            / 4
+            * (
+                cos_sigma * (2 * cos_2sigma_m**2 - 1)
+                - B / 6 * cos_2sigma_m * (4 * sin_sigma**2 - 3) * (4 * cos_2sigma_m**2 - 3)
+            )
+        )
+    )
+    result = WGS84_B * A * (sigma - delta_sigma)
+
+    if active.size:
+        result[active] = haversine(*(np.degrees(v[active]) for v in (lat1, lng1, lat2, lng2)))
+    return result.reshape(shape)
+
+
+def distances(lat1, lng1, lat2, lng2, mode: str = HAVERSINE) -> np.ndarray:
+    """Abstand in Metern im Modell 'mode' (siehe DISTANCE_MODES), broadcastfähig"""
+    if mode == VINCENTY:
+        return vincenty(lat1, lng1, lat2, lng2)
+    return haversine(lat1, lng1, lat2, lng2)
+
+
+def _query_cells(
+    xy: np.ndarray, queries: np.ndarray, lo: np.ndarray, cell: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nächster Nachbar der Punkte 'queries' unter allen Punkten der 3x3
+    Nachbarzellen; liefert quadrierte Abstände und Indizes (-1 ohne Kandidat)
+    """
+    cells = ((xy - lo) // cell).astype(np.int64)
+    keys = cells[:, 0] * (1 << 32) + cells[:, 1]
+    order = np.argsort(keys, kind="stable")
+    unique_keys, starts, counts = np.unique(keys[order], return_index=True, return_counts=True)
+
+    neighbour = cells[queries][:, None, :] + _OFFSETS
+    neighbour_keys = (neighbour[..., 0] * (1 << 32) + neighbour[..., 1]).ravel()
+    pos = np.minimum(np.searchsorted(unique_keys, neighbour_keys), len(unique_keys) - 1)
+    found = unique_keys[pos] == neighbour_keys
+    segment_counts = np.where(found, counts[pos], 0)
+    segment_starts = np.where(found, starts[pos], 0)
+
+    # Kandidaten aller Zellen als flaches Array, gruppiert nach Anfragepunkt
+    offsets = np.cumsum(segment_counts) - segment_counts
+    flat = np.repeat(segment_starts - offsets, segment_counts) + np.arange(segment_counts.sum())
+    candidates = order[flat]
+    owner = np.repeat(np.repeat(np.arange(len(queries)), len(_OFFSETS)), segment_counts)
+
+    delta = xy[candidates] - xy[queries][owner]
+    squared = np.einsum("ij,ij->i", delta, delta)
+    squared[candidates == queries[owner]] = np.inf
+
+    # Jeder Punkt liegt in seiner eigenen Zelle, kein Segment ist leer
+    per_query = segment_counts.reshape(len(queries), -1).sum(axis=1)
+    best = np.minimum.reduceat(squared, np.cumsum(per_query) - per_query)
+    is_best = squared == best[owner]
+    _, first = np.unique(owner[is_best], return_index=True)
+    index = np.where(np.isfinite(best), candidates[is_best][first], -1)
+    return best, index
+
+
+def _grid_nearest(xy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Nächste Nachbarn paarweise verschiedener Punkte (m, 2), m >= 2"""
+    m = len(xy)
+    lo = xy.min(axis=0)
+    span = xy.max(axis=0) - lo
+    extent = float(span.max())
+    # Untergrenze hält Zellindizes unter 2^31
+    min_cell = max(extent / 2**30, 1e-9)
+
+    area = float(span[0] * span[1])
+    cell = max(math.sqrt(area / m) if area > 0 else extent / m, min_cell)
+
+    # Dichte Häufungen: Zellen verkleinern, bis die Kandidatenzahl begrenzt ist
+    while cell > min_cell:
+        keys = ((xy - lo) // cell).astype(np.int64)
+        _, counts = np.unique(keys[:, 0] * (1 << 32) + keys[:, 1], return_counts=True)
+        if np.dot(counts, counts) <= GRID_PAIR_BUDGET * m:
+            break
+        cell = max(cell / 2, min_cell)
+
+    squared = np.full(m, np.inf)
+    index = np.full(m, -1)
+    pending = np.arange(m)
+    while pending.size:
+        best, found = _query_cells(xy, pending, lo, cell)
+        better = best < squared[pending]
+        squared[pending[better]] = best[better]
+        index[pending[better]] = found[better]
+
+        # Exakt, sobald der Kandidat näher als eine Zellgröße liegt oder
+        # das Gitter alle Punkte umfasst
+        if cell >= extent:
+            break
+        pending = pending[squared[pending] > cell * cell]
+        cell *= 2
+
+    return np.sqrt(squared), index
+
+
+def nearest_neighbors(xy: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nächster Nachbar jedes Punktes
+
+    Args:
+        xy: lokale Koordinaten (n, 2) in Metern, n >= 2
+
+    Returns:
+        (distance, index): Abstand in Metern und Index des Nachbarn (n,)
+    """
+    n = len(xy)
+    distance = np.zeros(n)
+    index = np.empty(n, dtype=np.int64)
+
+    # Exakte Duplikate vorab zusammenfassen: Abstand 0 zum nächsten Gruppenmitglied
+    _, first, inverse, counts = np.unique(
+        xy, axis=0, return_index=True, return_inverse=True, return_counts=True
+    )
+    inverse = inverse.ravel()
+    order = np.argsort(inverse, kind="stable")
+    groups = inverse[order]
+    group_start = np.searchsorted(groups, groups)
+    same_next = np.append(groups[1:] == groups[:-1], False)
+    partner = order[np.where(same_next, np.arange(n) + 1, group_start)]
+    duplicate = counts[inverse] > 1
+    index[duplicate] = partner[np.argsort(order)][duplicate]
+
+    single = ~duplicate
+    if len(first) >= 2:
+        unique_distance, unique_index = _grid_nearest(xy[first])
+        distance[single] = unique_distance[inverse[single]]
+        index[single] = first[unique_index[inverse[single]]]
+    else:
+        distance[single] = np.inf
+        index[single] = -1
+    return distance, index
+
+
+def diameter_pair(xy: np.ndarray) -> Tuple[int, int]:
+    """
+    Schätzt das Punktpaar mit dem größten Abstand
+
+    Kandidaten sind die Extrempunkte in DIAMETER_DIRECTIONS Richtungen;
+    der Abstand wird um höchstens den Faktor cos(π / 2D) unterschätzt.
+    """
+    angles = np.linspace(0, np.pi, DIAMETER_DIRECTIONS, endpoint=False)
+    projected = xy @ np.stack((np.cos(angles), np.sin(angles)))
+    candidates = np.unique(np.concatenate((projected.argmin(axis=0), projected.argmax(axis=0))))
+    delta = xy[candidates][:, None, :] - xy[candidates][None, :, :]
+    i, j = np.unravel_index(np.einsum("ijk,ijk->ij", delta, delta).argmax(), delta.shape[:2])
+    return int(candidates[i]), int(candidates[j])
+
+
+def gdop(xy: np.ndarray, position: np.ndarray) -> float:
+    """
+    Horizontale GDOP für Entfernungsmessungen an der Position (2,)
+
+    sqrt(trace((HᵀH)⁻¹)) mit den Einheitsvektoren H von der Position zu
+    den Referenzpunkten; unendlich bei entarteter Geometrie.
+    """
+    delta = xy - position
+    ranges = np.sqrt(np.einsum("ni,ni->n", delta, delta))
+    H = delta[ranges > 0] / ranges[ranges > 0, None]
+    G = H.T @ H
+    det = G[0, 0] * G[1, 1] - G[0, 1] * G[1, 0]
+    trace = G[0, 0] + G[1, 1]
+    if det <= trace * trace * 1e-12:
+        return math.inf
+    return math.sqrt(trace / det)
+
+
+def analyze_geometry(points: np.ndarray, projection_mode: str = projection.AUTO) -> Dict[str, Any]:
+    """
+    Geometrie-Kennzahlen einer Punktmenge (n, 3) mit lat, lng, distance
+
+    Args:
+        points: Punktmenge (n, 3)
+        projection_mode: Projektion wie beim Lösen (siehe projection.PROJECTIONS),
+            damit Kennzahlen und GDOP im selben Bezugssystem entstehen
+
+    Returns:
+        Dictionary mit min_spacing_m, max_spacing_m, mean_nn_distance_m,
+        clustering_index (Clark-Evans: < 1 gehäuft, ~1 zufällig,
+        > 1 regelmäßig), gdop, near_duplicates (Indexpaare i < j) und
+        projection (verwendetes Bezugssystem)
+    """
+    n = len(points)
+    xy, frame = projection.project(points[None], projection_mode)
+    xy = xy[0]
+    lat, lng = points[:, 0], points[:, 1]
+
+    _, neighbour = nearest_neighbors(xy)
+    nn_distance = np.where(
+        neighbour >= 0, haversine(lat, lng, lat[neighbour], lng[neighbour]), np.inf
+    )
+    i, j = diameter_pair(xy)
+
+    span = xy.max(axis=0) - xy.min(axis=0)
+    area = float(span[0] * span[1])
+    clustering_index: Optional[float] = None
+    if area > 0:
+        clustering_index = float(nn_distance.mean() / (0.5 * math.sqrt(area / n)))
+
+    close = np.flatnonzero(nn_distance < NEAR_DUPLICATE_DISTANCE)
+    pairs = np.unique(np.sort(np.stack((close, neighbour[close]), axis=1), axis=1), axis=0)
+
+    geometry_dop: Optional[float] = None
+    if n >= 3:
+        result = solver.solve_batch(points[None], projection_mode=projection_mode)
+        if result["valid"][0]:
+            value = gdop(xy, np.array([result["x"][0], result["y"][0]]))
+            geometry_dop = value if math.isfinite(value) else None
+
+    return {
+        "min_spacing_m": float(nn_distance.min()),
+        "max_spacing_m": float(haversine(lat[i], lng[i], lat[j], lng[j])),
+        "mean_nn_distance_m": float(nn_distance.mean()),
+        "clustering_index": clustering_index,
+        "gdop": geometry_dop,
+        "near_duplicates": pairs.tolist(),
+        "projection": projection.ENU if frame.enu[0] else projection.EQUIRECTANGULAR,
+    }
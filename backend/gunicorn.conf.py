@@ -0,0 +1,94 @@
+"""
+Gunicorn-Konfiguration für Produktion
+
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+Standardmäßig läuft ein Worker-Prozess: Live-Sitzungen (/api/sessions)
+und Tracks (/api/tracks) liegen im Speicher des Workers, der sie angelegt
+hat; bei mehreren Workern beantwortet ein anderer Worker Folgeanfragen
+mit 404. Parallelität kommt deshalb aus Threads, zwei pro verfügbarer
+CPU (CPU-Affinität und cgroup-Kontingent des Containers, nicht die CPUs
+des Hosts); NumPy gibt bei größeren Arrays den GIL frei. Große Batches
+verteilt der Prozesspool (SOLVE_WORKERS) auf weitere CPUs. Auf langsamen
+Instanzen mit einer CPU ist das Timeout für große Batches länger.
+
+Asynchrone Jobs (/api/jobs) laufen in Job-Threads desselben Workers.
+Ohne Prozesspool rechnen sie dort und halten bei jedem Block den GIL,
+den auch die Anfrage-Threads brauchen: ein großer Job verlängert dann die
+Antwortzeit interaktiver Anfragen, weshalb es ohne Pool höchstens einen
+Job-Thread gibt (JOB_WORKERS wird auf 1 begrenzt). Mit SOLVE_WORKERS > 1
+lösen Jobs jeden Block im Pool; Job-Threads lesen und schreiben dann nur
+Dateien, und interaktive Anfragen teilen sich nur die CPUs des Pools mit
+ihnen.
+
+Mehr Worker (WEB_CONCURRENCY > 1) nur mit Sticky Routing pro Sitzung und
+Track vor Gunicorn oder ohne Nutzung von Sitzungen und Tracks. Projekte,
+Jobs und zwischengespeicherte Ergebnisse funktionieren mit jeder Zahl
+von Workern (SQLite bzw. Cache pro Worker).
+
+Überschreibbar per Umgebung:
+    PORT                Port (Standard 5000)
+    WEB_CONCURRENCY     Worker-Prozesse (Standard 1, siehe oben)
+    GUNICORN_THREADS    Threads pro Worker
+    GUNICORN_TIMEOUT    Sekunden bis ein hängender Worker neu startet
+    GUNICORN_PRELOAD    App im Master laden und aufwärmen (Standard true)
+"""
+
+import logging
+import math
+import os
+import time
+
+_started = time.monotonic()
+
+
+def available_cpus() -> int:
+    """CPUs, die dieser Prozess tatsächlich nutzen kann"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # nicht unter Linux
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2: "<Kontingent> <Periode>" oder "max <Periode>"
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+cpus = available_cpus()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", max(2, 2 * cpus)))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", max(60, 120 // cpus)))
+graceful_timeout = 30
+keepalive = 5
+
+# App einmal im Master importieren und aufwärmen (wsgi.warm_up); bei
+# mehreren Workern teilen diese die geladenen Module per Copy-on-Write. Job-Threads und
+# Prozesspool starten erst im Worker.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() not in ("0", "false", "no")
+
+# Meldungen der App-Module (z.B. Aufwärmzeit aus wsgi.py, Fehler in Job-Threads) nach
+# stderr wie das Fehlerlog; Gunicorns eigene Logger propagieren nicht zur Wurzel
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s] [%(process)d] [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S %z",
+)
+
+# Heartbeat-Dateien im RAM statt auf dem (in Containern oft langsamen) Overlay-Dateisystem
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    server.log.info(
+        f"Bereit nach {time.monotonic() - _started:.2f} s: {workers} Worker x {threads} Threads, "
+        f"Timeout {timeout} s, Preload {'an' if preload_app else 'aus'} ({cpus} CPUs)"
+    )
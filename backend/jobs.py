@@ -0,0 +1,402 @@
+"""
+Asynchrone Jobs für lange Batch-Lösungen
+
+Jobs liegen in einer SQLite-Datenbank im Job-Verzeichnis, Eingaben und
+Ergebnisse als NDJSON-Dateien daneben. Damit sehen alle Gunicorn-Worker
+eines Hosts dieselben Jobs, ohne externen Broker: jeder Worker startet
+beim ersten Zugriff eigene Job-Threads, die wartende Jobs atomar aus der
+Datenbank übernehmen. Ein Job wird blockweise gelöst; nach jedem Block
+werden die Ergebnisse angehängt und der Fortschritt festgeschrieben, sodass
+GET /api/jobs/<id> Teilergebnisse liefern kann.
+
+Abgeschlossene Ergebnisse bleiben bis JOB_RETENTION erhalten; übersteigt
+das Verzeichnis die Größengrenze, werden die ältesten zuerst gelöscht.
+Jobs, deren Worker abgestürzt ist (kein Lebenszeichen seit
+JOB_STALE_TIMEOUT), werden neu eingereiht.
+"""
+
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+FINISHED = (COMPLETED, FAILED)
+
+JOB_STALE_TIMEOUT = 300.0  # Sekunden ohne Lebenszeichen bis zur Neueinreihung
+JOB_POLL_INTERVAL = 1.0  # Wartezeit leerlaufender Job-Threads in Sekunden
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    method TEXT NOT NULL,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    heartbeat REAL,
+    total INTEGER NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    result_bytes INTEGER NOT NULL DEFAULT 0,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created);
+"""
+
+# Läufer: (Eingabezeilen, Methode) → Generator von (NDJSON-Block, Fehlerergebnisse im Block)
+Runner = Callable[[Iterable[bytes], str], Iterator[Tuple[str, int]]]
+
+
+class JobQueue:
+    """
+    SQLite-basierte Job-Warteschlange mit lokalen Job-Threads
+
+    Der Läufer erhält die Eingabezeilen eines Jobs und liefert die
+    Ergebnisse als NDJSON-Blöcke in Eingabereihenfolge, je eine Zeile
+    pro nicht-leerer Eingabezeile, zusammen mit der Anzahl der
+    Fehlerergebnisse im Block (siehe app.stream_blocks).
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        runner: Runner,
+        workers: int = 1,
+        max_queued: int = 100,
+        max_bytes: int = 256 * 1024 * 1024,
+        retention: float = 86400.0,
+    ):
+        """
+        Args:
+            directory: Job-Verzeichnis für Datenbank, Ein- und Ausgaben
+            runner: Lösungsfunktion, siehe Runner
+            workers: Job-Threads pro Prozess, 0 nimmt nur Jobs an
+            max_queued: maximale Anzahl wartender Jobs
+            max_bytes: Größengrenze aller Ergebnisdateien
+            retention: Sekunden, die abgeschlossene Jobs erhalten bleiben
+        """
+        self.directory = directory
+        self.runner = runner
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_bytes = max_bytes
+        self.retention = retention
+        self._threads: List[threading.Thread] = []
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._initialized = False
+
+    def submit(
+        self, lines: Iterable[bytes], method: str, max_sets: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Schreibt die Eingabe (NDJSON-Zeilen) auf die Platte und reiht den Job ein
+
+        Raises:
+            ValueError: bei leerer Eingabe oder mehr als max_sets Punktmengen
+            OverflowError: wenn bereits max_queued Jobs warten
+        """
+        self._ensure_workers()
+        with self._connect() as db:
+            queued = db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[
+                0
+            ]
+        if queued >= self.max_queued:
+            raise OverflowError(f"Maximal {self.max_queued} wartende Jobs")
+
+        job_id = uuid.uuid4().hex
+        path = self._path(job_id, "input")
+        total = 0
+        try:
+            with open(path, "wb") as handle:
+                # Leerzeilen bleiben erhalten, damit "line" der Eingabe entspricht
+                for line in lines:
+                    handle.write(line if line.endswith(b"\n") else line + b"\n")
+                    if not line.strip():
+                        continue
+                    total += 1
+                    if max_sets is not None and total > max_sets:
+                        raise ValueError(f"Maximal {max_sets} Punktmengen pro Job")
+            if total == 0:
+                raise ValueError("Keine Punktmengen übergeben")
+        except BaseException:
+            _remove(path)
+            raise
+
+        with self._connect() as db:
+            db.execute(
+                "INSERT INTO jobs (id, status, method, created, total) VALUES (?, ?, ?, ?, ?)",
+                (job_id, QUEUED, method, time.time(), total),
+            )
+        self._wakeup.set()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status eines Jobs oder None"""
+        self._ensure_workers()
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else _job_state(row)
+
+    def results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[str]:
+        """
+        Bisher vorliegende Ergebniszeilen ab 'offset' (0-basiert)
+
+        Liest nur bis zum festgeschriebenen Fortschritt, sodass ein
+        gerade geschriebener Block nie halb erscheint.
+        """
+        state = self.get(job_id)
+        if state is None:
+            return
+        stop = (
+            state["progress"]["done"]
+            if limit is None
+            else min(state["progress"]["done"], offset + limit)
+        )
+        try:
+            handle = open(self._path(job_id, "ndjson"), "r", encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with handle:
+            yield from itertools.islice(handle, offset, max(stop, offset))
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Bricht einen Job ab und löscht seine Dateien
+
+        Laufende Jobs halten nach dem aktuellen Block an.
+        """
+        with self._connect() as db:
+            deleted = db.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount
+        if deleted:
+            self._delete_files(job_id)
+        return bool(deleted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /api/health"""
+        self._ensure_workers()
+        with self._connect() as db:
+            counts = dict(
+                db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+            )
+            result_bytes = db.execute("SELECT COALESCE(SUM(result_bytes), 0) FROM jobs").fetchone()[
+                0
+            ]
+        return {
+            "workers": self.workers,
+            "started": sum(thread.is_alive() for thread in self._threads),
+            "jobs": {status: counts.get(status, 0) for status in (QUEUED, RUNNING) + FINISHED},
+            "result_bytes": result_bytes,
+            "max_bytes": self.max_bytes,
+            "retention_seconds": self.retention,
+        }
+
+    def cleanup(self) -> int:
+        """
+        Löscht abgelaufene Jobs und die ältesten Ergebnisse über der Größengrenze
+
+        Returns:
+            Anzahl gelöschter Jobs
+        """
+        now = time.time()
+        with self._connect() as db:
+            expired = [
+                row[0]
+                for row in db.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?) AND finished < ?",
+                    (*FINISHED, now - self.retention),
+                )
+            ]
+            rows = db.execute(
+                "SELECT id, result_bytes FROM jobs WHERE status IN (?, ?) AND finished >= ? "
+                "ORDER BY finished",
+                (*FINISHED, now - self.retention),
+            ).fetchall()
+            total = db.execute("SELECT COALESCE(SUM(result_bytes), 0) FROM jobs").fetchone()[0]
+            total -= sum(size for job_id, size in rows if job_id in expired)
+            for job_id, size in rows:
+                if total <= self.max_bytes:
+                    break
+                expired.append(job_id)
+                total -= size
+
+            db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+        for job_id in expired:
+            self._delete_files(job_id)
+        return len(expired)
+
+    def run_pending(self) -> bool:
+        """
+        Übernimmt und bearbeitet einen wartenden Job
+
+        Returns:
+            False, wenn kein Job wartete
+        """
+        job = self._claim()
+        if job is None:
+            return False
+        self._run(job)
+        self.cleanup()
+        return True
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Setzt den ältesten wartenden Job atomar auf 'running'"""
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            # Jobs abgestürzter Worker von vorn beginnen
+            db.execute(
+                "UPDATE jobs SET status = ?, done = 0, failed = 0, result_bytes = 0 "
+                "WHERE status = ? AND heartbeat < ?",
+                (QUEUED, RUNNING, now - JOB_STALE_TIMEOUT),
+            )
+            row = db.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE jobs SET status = ?, started = ?, heartbeat = ? WHERE id = ?",
+                    (RUNNING, now, now, row["id"]),
+                )
+        return row
+
+    def _run(self, job: sqlite3.Row) -> None:
+        job_id = job["id"]
+        done = failed = size = 0
+        status, error = COMPLETED, None
+        try:
+            with open(self._path(job_id, "input"), "rb") as source, open(
+                self._path(job_id, "ndjson"), "w", encoding="utf-8"
+            ) as target:
+                for block, block_failed in self.runner(source, job["method"]):
+                    target.write(block)
+                    target.flush()
+                    done += block.count("\n")
+                    failed += block_failed
+                    size += len(block.encode("utf-8"))
+                    if not self._progress(job_id, done, failed, size):
+                        # Abgebrochen: Dateien gehören keinem Job mehr
+                        self._delete_files(job_id)
+                        return
+        except Exception as e:
+            status, error = FAILED, f"Berechnungsfehler: {str(e)}"
+
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, finished = ?, error = ?, done = ?, failed = ?, "
+                "result_bytes = ? WHERE id = ? AND status = ?",
+                (status, time.time(), error, done, failed, size, job_id, RUNNING),
+            )
+        _remove(self._path(job_id, "input"))
+
+    def _progress(self, job_id: str, done: int, failed: int, size: int) -> bool:
+        """Schreibt den Fortschritt fest; False, wenn der Job nicht mehr läuft"""
+        with self._connect() as db:
+            return (
+                db.execute(
+                    "UPDATE jobs SET done = ?, failed = ?, result_bytes = ?, heartbeat = ? "
+                    "WHERE id = ? AND status = ?",
+                    (done, failed, size, time.time(), job_id, RUNNING),
+                ).rowcount
+                > 0
+            )
+
+    def _work(self) -> None:
+        while True:
+            try:
+                if self.run_pending():
+                    continue
+            except Exception:
+                # Job-Thread läuft weiter, z.B. nach gesperrter oder voller Datenbank
+                logger.exception("Job-Thread: Fehler beim Bearbeiten wartender Jobs")
+            self._wakeup.wait(JOB_POLL_INTERVAL)
+            self._wakeup.clear()
+
+    def _ensure_workers(self) -> None:
+        """Legt die Datenbank an und startet die Job-Threads dieses Prozesses"""
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            if not self._initialized:
+                os.makedirs(self.directory, exist_ok=True)
+                with self._connect() as db:
+                    db.executescript(_SCHEMA)
+                self._initialized = True
+            # Nach einem Fork laufen die Threads des Elternprozesses nicht mit
+            self._threads = [
+                threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+            self._pid = pid
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Verbindung im Autocommit-Modus; offene Transaktionen enden mit dem Block"""
+        db = sqlite3.connect(
+            os.path.join(self.directory, "jobs.sqlite"), timeout=30, isolation_level=None
+        )
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+            if db.in_transaction:
+                db.commit()
+        except BaseException:
+            if db.in_transaction:
+                db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{job_id}.{suffix}")
+
+    def _delete_files(self, job_id: str) -> None:
+        for suffix in ("input", "ndjson"):
+            _remove(self._path(job_id, suffix))
+
+
+def _job_state(row: sqlite3.Row) -> Dict[str, Any]:
+    """Status eines Jobs als JSON-fähiges Dictionary"""
+    total, done = row["total"], row["done"]
+    state = {
+        "job_id": row["id"],
+        "status": row["status"],
+        "method": row["method"],
+        "progress": {
+            "done": done,
+            "total": total,
+            "fraction": round(done / total, 4) if total else 1.0,
+        },
+        "failed": row["failed"],
+        "created": row["created"],
+        "started": row["started"],
+        "finished": row["finished"],
+        "result_bytes": row["result_bytes"],
+    }
+    if row["error"]:
+        state["error"] = row["error"]
+    return state
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,187 @@
+"""
+Leichtgewichtige Latenzmessung mit Histogrammen im Prometheus-Textformat
+
+Ein StageTimer sammelt die Stufenzeiten einer Anfrage (Parsen,
+Validierung, Projektion, Lösen, Formatieren, Serialisieren); die
+MetricsRegistry verdichtet sie zu Histogrammen je Endpunkt, Verfahren
+und Punktanzahl-Klasse. Ohne Timer kosten die Messpunkte nur einen
+Funktionsaufruf. Jeder Gunicorn-Worker zählt für sich; die Werte eines
+Scrapes stammen vom jeweils antwortenden Worker.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+
+# Histogramm-Grenzen in Sekunden
+DEFAULT_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+# Messpunkt ohne aktiven Timer
+NULL_STAGE = nullcontext()
+
+
+def point_bucket(n: Optional[int]) -> str:
+    """Punktanzahl-Klasse als Label-Wert"""
+    if n is None:
+        return "none"
+    if n <= 3:
+        return "3"
+    if n <= 10:
+        return "4-10"
+    if n <= 100:
+        return "11-100"
+    if n <= 1000:
+        return "101-1000"
+    return ">1000"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Stage:
+    """Kontextmanager für eine Stufe; addiert wiederholte Stufen"""
+
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer: "StageTimer", name: str):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimer:
+    """
+    Stufenzeiten und Labels einer einzelnen Anfrage
+    """
+
+    __slots__ = ("start", "stages", "algorithm", "point_count")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.algorithm = "none"
+        self.point_count: Optional[int] = None
+
+    def stage(self, name: str) -> _Stage:
+        return _Stage(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def label(self, algorithm: str, point_count: Optional[int] = None) -> None:
+        self.algorithm = algorithm
+        if point_count is not None:
+            self.point_count = point_count
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total: float) -> str:
+        """Wert für den Server-Timing-Header, Dauer in Millisekunden"""
+        entries = [f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.stages.items()]
+        entries.append(f"total;dur={total * 1000:.3f}")
+        return ", ".join(entries)
+
+
+class Histogram:
+    """
+    Thread-sicheres Histogramm mit festen Labels
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Tuple[str, ...],
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Tuple[str, ...]) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [
+                (labels, list(counts), total, count)
+                for labels, (counts, total, count) in sorted(self._series.items())
+            ]
+
+        for labels, counts, total, count in series:
+            label_text = ",".join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels)
+            )
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label_text}}} {total}")
+            lines.append(f"{self.name}_count{{{label_text}}} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Histogramme für Anfrage- und Stufenlatenzen
+    """
+
+    def __init__(self):
+        self.requests = Histogram(
+            "triangulation_request_duration_seconds",
+            "Bearbeitungszeit pro Anfrage",
+            ("endpoint", "algorithm", "points"),
+        )
+        self.stages = Histogram(
+            "triangulation_stage_duration_seconds",
+            "Bearbeitungszeit pro Stufe einer Anfrage",
+            ("endpoint", "stage", "algorithm", "points"),
+        )
+
+    def record(self, endpoint: str, timer: StageTimer, total: float) -> None:
+        points = point_bucket(timer.point_count)
+        self.requests.observe(total, (endpoint, timer.algorithm, points))
+        for name, seconds in timer.stages.items():
+            self.stages.observe(seconds, (endpoint, name, timer.algorithm, points))
+
+    def render(self) -> str:
+        return "\n".join(self.requests.render() + self.stages.render()) + "\n"
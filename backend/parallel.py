@@ -0,0 +1,118 @@
+"""
+Prozesspool für große Batch- und Stream-Lösungen
+
+Gunicorn-Sync-Worker bearbeiten eine Anfrage auf einem Kern. Große
+Batches und Streams werden deshalb in Blöcke zerlegt und auf einen
+ProcessPoolExecutor verteilt; Blöcke werden als Arrays bzw. Rohtext
+übergeben, nicht als Punkt-Dictionaries. Ergebnisse kommen in
+Eingabereihenfolge zurück.
+
+Der Pool startet erst beim ersten großen Batch, wenn im Worker schon
+Job-Threads laufen und SQLite-Verbindungen offen sind. Ein Fork dieses
+Prozesses könnte Sperren im gesperrten Zustand erben; die Prozesse
+entstehen deshalb über einen Forkserver (bzw. spawn, wo es keinen gibt).
+"""
+
+import atexit
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+# Startmethode der Pool-Prozesse; nie 'fork' (siehe oben)
+POOL_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+# In Pool-Prozessen gesetzt; verhindert verschachtelte Pools
+_IN_WORKER = False
+
+
+def _mark_worker() -> None:
+    global _IN_WORKER
+    _IN_WORKER = True
+
+
+class SolvePool:
+    """
+    Lazily gestarteter Prozesspool mit geordneter, begrenzter Abarbeitung
+
+    Mit weniger als 2 Prozessen und innerhalb von Pool-Prozessen wird
+    seriell im aufrufenden Prozess gerechnet.
+    """
+
+    def __init__(
+        self, workers: int, max_pending: Optional[int] = None, preload: Sequence[str] = ()
+    ):
+        """
+        Args:
+            workers: Anzahl Prozesse, 0 oder 1 für serielle Ausführung
+            max_pending: maximal gleichzeitig ausstehende Blöcke,
+                Standard 2 pro Prozess
+            preload: Module, die der Forkserver einmal vorab importiert,
+                statt sie in jedem Pool-Prozess neu zu laden
+        """
+        self.workers = workers
+        self.max_pending = max_pending or 2 * max(workers, 1)
+        self.preload = list(preload)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 1 and not _IN_WORKER
+
+    def imap(self, func: Callable, tasks: Iterable[Tuple], serial: bool = False) -> Iterator[Any]:
+        """
+        Wendet func auf jedes Argument-Tupel an, Ergebnisse in Eingabereihenfolge
+
+        Es werden höchstens max_pending Aufgaben gleichzeitig vergeben,
+        sodass auch unbegrenzte Eingaben mit konstantem Speicher laufen.
+
+        Args:
+            func: auf Modulebene definierte (picklebare) Funktion
+            tasks: Argument-Tupel, wird lazy gelesen
+            serial: im aufrufenden Prozess rechnen, z.B. für kleine Eingaben
+        """
+        if serial or not self.enabled:
+            for args in tasks:
+                yield func(*args)
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        for args in tasks:
+            pending.append(executor.submit(func, *args))
+            if len(pending) >= self.max_pending:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /api/health"""
+        return {
+            "workers": self.workers,
+            "enabled": self.enabled,
+            "started": self._executor is not None,
+            "start_method": POOL_START_METHOD,
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = multiprocessing.get_context(POOL_START_METHOD)
+                if POOL_START_METHOD == "forkserver" and self.preload:
+                    context.set_forkserver_preload(self.preload)
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=context, initializer=_mark_worker
+                )
+                atexit.register(self.shutdown)
+            return self._executor
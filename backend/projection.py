@@ -0,0 +1,172 @@
+"""
+Projektion geografischer Koordinaten in lokale Ebenen
+
+Beide Verfahren nutzen das Kugelmodell der übrigen App (EARTH_RADIUS):
+    'equirectangular'  lineare Skalierung um den Schwerpunkt - schnell,
+                       der Fehler wächst aber mit der Ausdehnung
+    'enu'              lokale Tangentialebene über ECEF, azimutal
+                       abstandstreu: Entfernungen vom Bezugspunkt bleiben
+                       exakt, andere Entfernungen verzerren um ~r²/6R²
+    'auto'             equirectangular, solange der geschätzte Fehler
+                       unter der Toleranz bleibt, sonst enu (je Problem)
+
+Die Konstanten eines Bezugspunkts (Meter pro Grad, Rotation ECEF → ENU)
+werden einmal pro Problem in einem Frame abgelegt und für Hin- und
+Rücktransformation wiederverwendet.
+"""
+
+import math
+import numpy as np
+from typing import NamedTuple, Optional, Tuple
+
+EARTH_RADIUS = 6371000  # Erdradius in Metern
+METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+
+AUTO = "auto"
+EQUIRECTANGULAR = "equirectangular"
+ENU = "enu"
+PROJECTIONS = (AUTO, EQUIRECTANGULAR, ENU)
+
+# Geschätzter Fehler in Metern, bis zu dem 'auto' äquirektangular projiziert
+PROJECTION_TOLERANCE = 0.5
+
+# Kalibrierfaktor der Fehlerschätzung, siehe equirectangular_error
+ERROR_SCALE = 0.125
+
+
+class Frame(NamedTuple):
+    """Bezugssysteme von B Problemen"""
+
+    center: np.ndarray  # (B, 2) lat, lng in Grad
+    scale: np.ndarray  # (B, 2) Meter pro Grad für lat, lng
+    enu: np.ndarray  # (B,) True, wenn das Problem über ENU projiziert ist
+    rotation: np.ndarray  # (B, 3, 3) Zeilen east, north, up in ECEF
+
+
+def make_frame(center: np.ndarray, enu: np.ndarray) -> Frame:
+    """Berechnet die Konstanten der Bezugspunkte (B, 2)"""
+    lat, lng = np.radians(center[:, 0]), np.radians(center[:, 1])
+    sin_lat, cos_lat, sin_lng, cos_lng = np.sin(lat), np.cos(lat), np.sin(lng), np.cos(lng)
+
+    scale = np.empty(center.shape)
+    scale[:, 0] = METERS_PER_DEGREE
+    scale[:, 1] = METERS_PER_DEGREE * cos_lat
+
+    zero = np.zeros_like(lat)
+    rotation = np.stack(
+        (
+            np.stack((-sin_lng, cos_lng, zero), axis=-1),
+            np.stack((-sin_lat * cos_lng, -sin_lat * sin_lng, cos_lat), axis=-1),
+            np.stack((cos_lat * cos_lng, cos_lat * sin_lng, sin_lat), axis=-1),
+        ),
+        axis=1,
+    )
+    return Frame(center, scale, enu, rotation)
+
+
+def _unit_vectors(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """ECEF-Einheitsvektoren (..., 3) zu Koordinaten in Grad"""
+    lat, lng = np.radians(lat), np.radians(lng)
+    cos_lat = np.cos(lat)
+    return np.stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)), axis=-1)
+
+
+def _enu_forward(latlng: np.ndarray, rotation: np.ndarray) -> np.ndarray:
+    """Azimutal abstandstreue Koordinaten (k, n, 2) in der Tangentialebene"""
+    local = np.einsum("kij,knj->kni", rotation, _unit_vectors(latlng[..., 0], latlng[..., 1]))
+    horizontal = np.hypot(local[..., 0], local[..., 1])
+    angle = np.arctan2(horizontal, local[..., 2])
+    factor = EARTH_RADIUS * angle / np.where(horizontal > 0, horizontal, 1.0)
+    return local[..., :2] * factor[..., None]
+
+
+def _enu_inverse(
+    x: np.ndarray, y: np.ndarray, rotation: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Rücktransformation von _enu_forward für je einen Punkt pro Problem (k,)"""
+    radius = np.hypot(x, y)
+    angle = radius / EARTH_RADIUS
+    safe = np.where(radius > 0, radius, 1.0)
+    direction = (x / safe)[:, None] * rotation[:, 0] + (y / safe)[:, None] * rotation[:, 1]
+    unit = np.cos(angle)[:, None] * rotation[:, 2] + np.sin(angle)[:, None] * direction
+    lat = np.degrees(np.arcsin(np.clip(unit[:, 2], -1.0, 1.0)))
+    lng = np.degrees(np.arctan2(unit[:, 1], unit[:, 0]))
+    return lat, lng
+
+
+def equirectangular_error(xy: np.ndarray, distance: np.ndarray, center: np.ndarray) -> np.ndarray:
+    """
+    Geschätzter Positionsfehler (B,) der äquirektangularen Projektion in Metern
+
+    Maßgeblich ist die Reichweite L des Problems - Abstand vom Schwerpunkt
+    plus gemessene Entfernung - über die sich der Längengrad-Maßstab um
+    tan(φ)·L/R ändert; dazu kommt die Krümmung mit (L/R)². Der Faktor
+    ERROR_SCALE ist gegen rauschfreie Szenarien kalibriert und bleibt
+    konservativ (siehe benchmarks/bench_projection.py).
+    """
+    reach = (np.sqrt(np.einsum("bni,bni->bn", xy, xy)) + distance).max(axis=1) / EARTH_RADIUS
+    tan_lat = np.abs(np.tan(np.radians(center[:, 0])))
+    return ERROR_SCALE * EARTH_RADIUS * reach * reach * (tan_lat + reach)
+
+
+def project(
+    points: np.ndarray,
+    mode: str = AUTO,
+    center: Optional[np.ndarray] = None,
+    tolerance: float = PROJECTION_TOLERANCE,
+) -> Tuple[np.ndarray, Frame]:
+    """
+    Projiziert B Probleme um ihren Schwerpunkt
+
+    Args:
+        points: Array (B, n, 3) mit lat, lng, distance
+        mode: Verfahren, siehe PROJECTIONS
+        center: optional vorgegebene Bezugspunkte (B, 2) als (lat, lng)
+        tolerance: Fehlerschwelle in Metern für 'auto'
+
+    Returns:
+        (xy, frame): lokale Koordinaten (B, n, 2) in Metern und Bezugssysteme
+    """
+    if mode not in PROJECTIONS:
+        raise ValueError(f"Unbekannte Projektion '{mode}'")
+
+    latlng = points[..., :2]
+    if center is None:
+        center = latlng.sum(axis=1) / points.shape[1]
+
+    batch = len(center)
+    if mode == EQUIRECTANGULAR:
+        enu = np.zeros(batch, dtype=bool)
+    elif mode == ENU:
+        enu = np.ones(batch, dtype=bool)
+    else:
+        enu = None
+
+    frame = make_frame(center, enu)
+    if mode == ENU:
+        return _enu_forward(latlng, frame.rotation), frame
+
+    # Spaltenreihenfolge (lat, lng) → (x, y)
+    xy = ((latlng - center[:, None, :]) * frame.scale[:, None, :])[..., ::-1]
+
+    if enu is None:
+        enu = equirectangular_error(xy, points[..., 2], center) > tolerance
+        frame = frame._replace(enu=enu)
+    if enu.all():
+        xy = _enu_forward(latlng, frame.rotation)
+    elif enu.any():
+        xy = xy.copy()
+        xy[enu] = _enu_forward(latlng[enu], frame.rotation[enu])
+    return xy, frame
+
+
+def unproject(x: np.ndarray, y: np.ndarray, frame: Frame) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rücktransformation lokaler Koordinaten (B,) zu Geo-Koordinaten
+    """
+    center, scale, enu = frame.center, frame.scale, frame.enu
+    lat = center[:, 0] + y / scale[:, 0]
+    lng = center[:, 1] + x / scale[:, 1]
+    if enu.any():
+        lat[enu], lng[enu] = _enu_inverse(x[enu], y[enu], frame.rotation[enu])
+    return lat, lng
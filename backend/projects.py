@@ -0,0 +1,511 @@
+"""
+Serverseitige Projektablage
+
+Projekte liegen in einer SQLite-Datenbank mit drei Tabellen: Projekte
+(Metadaten und Bounding Box der Punkte), Punkte (eine Zeile pro Punkt,
+Schlüssel Projekt + Punkt-ID) und zwischengespeicherte Lösungen pro
+Methode und Projektion. Punkte werden über Deltas geändert (add, update,
+remove), sodass ein Speichern nur die geänderten Zeilen schreibt statt
+das ganze Projekt. Jede Punktänderung erhöht die Revision des Projekts;
+eine gespeicherte Lösung gilt, solange Revision oder Punkt-Hash
+(cache.point_set_key über Punkte und Punkt-IDs) übereinstimmen.
+
+Bounding-Box-Abfragen nutzen B-Baum-Indizes auf den Koordinaten; Boxen
+über den 180. Längengrad hinweg werden nicht unterstützt.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from cache import point_set_key
+
+PROJECT_PAGE_SIZE = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    settings TEXT NOT NULL DEFAULT '{}',
+    created REAL NOT NULL,
+    updated REAL NOT NULL,
+    revision INTEGER NOT NULL DEFAULT 0,
+    next_point_id INTEGER NOT NULL DEFAULT 1,
+    point_count INTEGER NOT NULL DEFAULT 0,
+    min_lat REAL,
+    max_lat REAL,
+    min_lng REAL,
+    max_lng REAL
+);
+CREATE INDEX IF NOT EXISTS projects_bbox ON projects (min_lat, max_lat, min_lng, max_lng);
+CREATE INDEX IF NOT EXISTS projects_updated ON projects (updated);
+
+CREATE TABLE IF NOT EXISTS points (
+    project_id TEXT NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    point_id INTEGER NOT NULL,
+    lat REAL NOT NULL,
+    lng REAL NOT NULL,
+    distance REAL NOT NULL,
+    name TEXT,
+    PRIMARY KEY (project_id, point_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS points_location ON points (project_id, lat, lng);
+
+CREATE TABLE IF NOT EXISTS results (
+    project_id TEXT NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    method TEXT NOT NULL,
+    projection TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    points_key TEXT NOT NULL,
+    result TEXT NOT NULL,
+    failed INTEGER NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (project_id, method, projection)
+) WITHOUT ROWID;
+"""
+
+# Lösungsfunktion: (Punkte (n, 3), Punkt-IDs) → API-Ergebnis
+Solver = Callable[[np.ndarray, List[int]], Dict[str, Any]]
+
+# Bounding Box als (min_lat, min_lng, max_lat, max_lng)
+BoundingBox = Tuple[float, float, float, float]
+
+
+class Solution(NamedTuple):
+    """Lösung eines Projekts als fertiger JSON-Text"""
+
+    body: str
+    stored: bool
+    failed: bool
+    point_count: int
+
+
+class RevisionConflict(Exception):
+    """Die erwartete Revision eines Projekts ist veraltet"""
+
+
+class ProjectStore:
+    """
+    SQLite-Projektablage, von allen Workern eines Hosts gemeinsam genutzt
+
+    Jede Methode öffnet eine eigene Verbindung; Schreibzugriffe laufen in
+    BEGIN IMMEDIATE-Transaktionen, Lesezugriffe sehen dank WAL einen
+    konsistenten Stand ohne Schreiber zu blockieren.
+    """
+
+    def __init__(self, path: str, max_points: int = 100000):
+        """
+        Args:
+            path: Datei der SQLite-Datenbank
+            max_points: maximale Anzahl Punkte pro Projekt
+        """
+        self.path = path
+        self.max_points = max_points
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def create(
+        self,
+        name: str,
+        description: str = "",
+        settings: Optional[Dict[str, Any]] = None,
+        points: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Legt ein Projekt an, optional mit Startpunkten
+
+        Raises:
+            ValueError: bei mehr als max_points Punkten
+        """
+        points = points or []
+        if len(points) > self.max_points:
+            raise ValueError(f"Maximal {self.max_points} Punkte pro Projekt")
+
+        project_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "INSERT INTO projects (id, name, description, settings, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (project_id, name, description, json.dumps(settings or {}), now, now),
+            )
+            added_ids = self._insert_points(db, project_id, 1, points)
+            self._refresh(db, project_id, 1 + len(points), bool(points), now)
+            project = self._project(db, project_id)
+        project["point_ids"] = added_ids
+        return project
+
+    def get(self, project_id: str, include_points: bool = True) -> Optional[Dict[str, Any]]:
+        """Projekt mit Punkten in ID-Reihenfolge oder None"""
+        with self._connect() as db:
+            db.execute("BEGIN")
+            project = self._project(db, project_id)
+            if project is not None and include_points:
+                project["points"] = self._points(db, project_id)
+        return project
+
+    def list(
+        self, bbox: Optional[BoundingBox] = None, offset: int = 0, limit: int = PROJECT_PAGE_SIZE
+    ) -> Dict[str, Any]:
+        """
+        Projekte ohne Punkte, zuletzt geänderte zuerst
+
+        Args:
+            bbox: nur Projekte, deren Punkte-Box diese Box schneidet
+        """
+        where, params = "", []
+        if bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            where = "WHERE min_lat <= ? AND max_lat >= ? AND min_lng <= ? AND max_lng >= ?"
+            params = [max_lat, min_lat, max_lng, min_lng]
+
+        with self._connect() as db:
+            db.execute("BEGIN")
+            total = db.execute(f"SELECT COUNT(*) FROM projects {where}", params).fetchone()[0]
+            rows = db.execute(
+                f"SELECT * FROM projects {where} ORDER BY updated DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return {
+            "projects": [_project_state(row) for row in rows],
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+        }
+
+    def points(
+        self, project_id: str, bbox: Optional[BoundingBox] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Punkte eines Projekts, optional nur innerhalb der Box; None ohne Projekt"""
+        with self._connect() as db:
+            db.execute("BEGIN")
+            if not db.execute("SELECT 1 FROM projects WHERE id = ?", (project_id,)).fetchone():
+                return None
+            return self._points(db, project_id, bbox)
+
+    def update(self, project_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Ändert name, description und/oder settings; die Revision bleibt"""
+        assignments = [
+            f"{field} = ?" for field in ("name", "description", "settings") if field in fields
+        ]
+        values = [
+            json.dumps(fields[field]) if field == "settings" else fields[field]
+            for field in ("name", "description", "settings")
+            if field in fields
+        ]
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            cursor = db.execute(
+                f"UPDATE projects SET {', '.join(assignments + ['updated = ?'])} WHERE id = ?",
+                values + [time.time(), project_id],
+            )
+            if cursor.rowcount == 0:
+                return None
+            return self._project(db, project_id)
+
+    def delete(self, project_id: str) -> bool:
+        """Löscht ein Projekt mit Punkten und Lösungen"""
+        with self._connect() as db:
+            return db.execute("DELETE FROM projects WHERE id = ?", (project_id,)).rowcount > 0
+
+    def update_points(
+        self,
+        project_id: str,
+        add: List[Dict[str, Any]],
+        update: List[Dict[str, Any]],
+        remove: List[int],
+        revision: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Wendet ein Punkt-Delta atomar an (Reihenfolge: remove, update, add)
+
+        Args:
+            add: neue Punkte mit lat, lng, distance und optional name
+            update: geänderte Punkte mit zusätzlicher 'id'; fehlendes name
+                lässt den Namen unverändert
+            remove: zu entfernende Punkt-IDs
+            revision: erwartete aktuelle Revision (optimistische Sperre)
+
+        Returns:
+            Projektzustand mit 'added_ids' oder None ohne Projekt
+
+        Raises:
+            ValueError: bei unbekannten IDs oder zu vielen Punkten
+            RevisionConflict: wenn revision nicht der aktuellen entspricht
+        """
+        remove = list(dict.fromkeys(remove))
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT revision, next_point_id, point_count FROM projects WHERE id = ?",
+                (project_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            if revision is not None and revision != row["revision"]:
+                raise RevisionConflict(
+                    f"Revision {revision} ist veraltet, aktuell {row['revision']}"
+                )
+
+            referenced = remove + [point["id"] for point in update]
+            if referenced:
+                known = self._known_ids(db, project_id, referenced)
+                for point_id in remove:
+                    if point_id not in known:
+                        raise ValueError(f"remove: Punkt-ID {point_id} unbekannt")
+                removed = set(remove)
+                for i, point in enumerate(update):
+                    if point["id"] not in known:
+                        raise ValueError(f"update: Punkt {i+1}: Punkt-ID {point['id']} unbekannt")
+                    if point["id"] in removed:
+                        raise ValueError(
+                            f"update: Punkt {i+1}: Punkt-ID {point['id']} wird entfernt"
+                        )
+
+            point_count = row["point_count"] - len(remove) + len(add)
+            if point_count > self.max_points:
+                raise ValueError(f"Maximal {self.max_points} Punkte pro Projekt")
+
+            db.executemany(
+                "DELETE FROM points WHERE project_id = ? AND point_id = ?",
+                [(project_id, point_id) for point_id in remove],
+            )
+            db.executemany(
+                "UPDATE points SET lat = ?, lng = ?, distance = ?, name = COALESCE(?, name) "
+                "WHERE project_id = ? AND point_id = ?",
+                [
+                    (
+                        point["lat"],
+                        point["lng"],
+                        point["distance"],
+                        point.get("name"),
+                        project_id,
+                        point["id"],
+                    )
+                    for point in update
+                ],
+            )
+            added_ids = self._insert_points(db, project_id, row["next_point_id"], add)
+
+            changed = bool(remove or update or add)
+            self._refresh(db, project_id, row["next_point_id"] + len(add), changed, time.time())
+            project = self._project(db, project_id)
+        project["added_ids"] = added_ids
+        return project
+
+    def solve(
+        self, project_id: str, method: str, projection: str, solver: Solver
+    ) -> Optional[Solution]:
+        """
+        Lösung der aktuellen Punkte, wenn möglich aus der Ablage
+
+        Ohne Punktänderung seit der gespeicherten Lösung (gleiche Revision)
+        werden weder Punkte gelesen noch JSON dekodiert; sonst entscheidet
+        der Punkt-Hash, ob neu gelöst werden muss. Der Hash umfasst die
+        Punkt-IDs, da die gespeicherte Antwort sie enthält. Auch
+        Fehlerergebnisse werden gespeichert.
+
+        Returns:
+            Solution oder None ohne Projekt
+        """
+        with self._connect() as db:
+            db.execute("BEGIN")
+            project = db.execute(
+                "SELECT revision, point_count FROM projects WHERE id = ?", (project_id,)
+            ).fetchone()
+            if project is None:
+                return None
+            revision, point_count = project
+            stored = db.execute(
+                "SELECT revision, points_key, result, failed FROM results "
+                "WHERE project_id = ? AND method = ? AND projection = ?",
+                (project_id, method, projection),
+            ).fetchone()
+            if stored is not None and stored["revision"] == revision:
+                return Solution(stored["result"], True, bool(stored["failed"]), point_count)
+
+            rows = db.execute(
+                "SELECT point_id, lat, lng, distance FROM points WHERE project_id = ? ORDER BY point_id",
+                (project_id,),
+            ).fetchall()
+
+        points = np.array([tuple(row)[1:] for row in rows], dtype=np.float64).reshape(-1, 3)
+        point_ids = [row["point_id"] for row in rows]
+        key = point_set_key(points, f"{method}:{','.join(map(str, point_ids))}")
+
+        with self._connect() as db:
+            if stored is not None and stored["points_key"] == key:
+                db.execute(
+                    "UPDATE results SET revision = ? WHERE project_id = ? AND method = ? AND projection = ?",
+                    (revision, project_id, method, projection),
+                )
+                return Solution(stored["result"], True, bool(stored["failed"]), point_count)
+
+            result = solver(points, point_ids)
+            body = json.dumps(result)
+            # Projekt kann inzwischen gelöscht sein
+            db.execute(
+                "INSERT OR REPLACE INTO results "
+                "(project_id, method, projection, revision, points_key, result, failed, created) "
+                "SELECT ?, ?, ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM projects WHERE id = ?)",
+                (
+                    project_id,
+                    method,
+                    projection,
+                    revision,
+                    key,
+                    body,
+                    "error" in result,
+                    time.time(),
+                    project_id,
+                ),
+            )
+        return Solution(body, False, "error" in result, point_count)
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /api/health"""
+        with self._connect() as db:
+            projects, points = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(point_count), 0) FROM projects"
+            ).fetchone()
+            results = db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return {
+            "projects": projects,
+            "points": points,
+            "stored_results": results,
+            "max_points": self.max_points,
+        }
+
+    def _insert_points(
+        self, db: sqlite3.Connection, project_id: str, first_id: int, points: List[Dict[str, Any]]
+    ) -> List[int]:
+        ids = list(range(first_id, first_id + len(points)))
+        db.executemany(
+            "INSERT INTO points (project_id, point_id, lat, lng, distance, name) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    project_id,
+                    point_id,
+                    point["lat"],
+                    point["lng"],
+                    point["distance"],
+                    point.get("name"),
+                )
+                for point_id, point in zip(ids, points)
+            ],
+        )
+        return ids
+
+    def _refresh(
+        self, db: sqlite3.Connection, project_id: str, next_point_id: int, changed: bool, now: float
+    ) -> None:
+        """Aktualisiert Punktzahl, Bounding Box und Revision nach einer Punktänderung"""
+        if not changed:
+            return
+        db.execute(
+            "UPDATE projects SET (point_count, min_lat, max_lat, min_lng, max_lng) = "
+            "(SELECT COUNT(*), MIN(lat), MAX(lat), MIN(lng), MAX(lng) FROM points WHERE project_id = ?), "
+            "next_point_id = ?, revision = revision + 1, updated = ? WHERE id = ?",
+            (project_id, next_point_id, now, project_id),
+        )
+
+    def _known_ids(self, db: sqlite3.Connection, project_id: str, point_ids: List[Any]) -> set:
+        known = set()
+        unique = list(dict.fromkeys(point_ids))
+        # SQLite begrenzt die Anzahl der Parameter pro Anweisung
+        for start in range(0, len(unique), 500):
+            chunk = unique[start : start + 500]
+            known.update(
+                row[0]
+                for row in db.execute(
+                    f"SELECT point_id FROM points WHERE project_id = ? AND point_id IN ({', '.join('?' * len(chunk))})",
+                    [project_id] + chunk,
+                )
+            )
+        return known
+
+    def _project(self, db: sqlite3.Connection, project_id: str) -> Optional[Dict[str, Any]]:
+        row = db.execute("SELECT * FROM projects WHERE id = ?", (project_id,)).fetchone()
+        return _project_state(row) if row is not None else None
+
+    def _points(
+        self, db: sqlite3.Connection, project_id: str, bbox: Optional[BoundingBox] = None
+    ) -> List[Dict[str, Any]]:
+        query = "SELECT point_id, lat, lng, distance, name FROM points WHERE project_id = ?"
+        params: List[Any] = [project_id]
+        if bbox is not None:
+            query += " AND lat BETWEEN ? AND ? AND lng BETWEEN ? AND ?"
+            params += [bbox[0], bbox[2], bbox[1], bbox[3]]
+        rows = db.execute(query + " ORDER BY point_id", params).fetchall()
+        return [
+            {"id": point_id, "lat": lat, "lng": lng, "distance": distance, "name": name}
+            for point_id, lat, lng, distance, name in rows
+        ]
+
+    def _ensure_schema(self) -> None:
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30)
+            try:
+                db.execute("PRAGMA journal_mode = WAL")
+                db.executescript(_SCHEMA)
+            finally:
+                db.close()
+            self._initialized = True
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Verbindung im Autocommit-Modus; offene Transaktionen enden mit dem Block"""
+        self._ensure_schema()
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA foreign_keys = ON")
+        db.execute("PRAGMA synchronous = NORMAL")
+        try:
+            yield db
+            if db.in_transaction:
+                db.commit()
+        except BaseException:
+            if db.in_transaction:
+                db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+def _project_state(row: sqlite3.Row) -> Dict[str, Any]:
+    """Projekt ohne Punkte als JSON-fähiges Dictionary"""
+    bbox = None
+    if row["min_lat"] is not None:
+        bbox = {
+            "min_lat": row["min_lat"],
+            "min_lng": row["min_lng"],
+            "max_lat": row["max_lat"],
+            "max_lng": row["max_lng"],
+        }
+    return {
+        "project_id": row["id"],
+        "name": row["name"],
+        "description": row["description"],
+        "settings": json.loads(row["settings"]),
+        "created": row["created"],
+        "updated": row["updated"],
+        "revision": row["revision"],
+        "point_count": row["point_count"],
+        "bbox": bbox,
+    }
@@ -0,0 +1,396 @@
+"""
+Triangulation innerhalb einer Region (Geofence)
+
+Ist bekannt, in welchem Gebiet die Position liegt (Gelände, Gebäude,
+Suchbereich), liefert eine Gittersuche über der Region die Startlösungen.
+Die lineare Lösung allein landet bei schlechter Geometrie (fast
+kollineare Punkte, Spiegellösung bei 3 Punkten) oder Ausreißern oft weit
+außerhalb.
+
+    Stufe 0      GRID_BASE x GRID_BASE Zellen über der Bounding Box
+    Stufe k + 1  jede Zelle in 2 x 2 Kinder geteilt, GRID_LEVELS Stufen
+
+Welche Zellen in der Region liegen, wird einmal pro Region und Projektion
+berechnet (feinste Stufe per Scanline-Füllung, gröbere Stufen als ODER
+der Kinder) und im LRU-Cache des Aufrufers gehalten (region_grid).
+
+Die Suche bewertet alle Zellen der Stufe 0 und verfolgt danach die
+GRID_BEAM besten Zellen jeder Stufe. Kosten einer Zelle sind die auf τ
+begrenzten quadrierten unteren Schranken der Entfernungsresiduen in der
+Zelle (truncated_cost); Ausreißer tragen so höchstens τ² bei. Zellen und
+Punkte werden in einem vektorisierten Durchgang bewertet.
+
+Die GRID_STARTS besten Zellen der feinsten Stufe und die lineare Lösung
+(sofern sie in der Region liegt) starten gemeinsam Levenberg-Marquardt
+auf ihren Inliern (solver.refine_inliers); es gilt das Ergebnis in der
+Region mit den geringsten Kosten. Liegt keines in der Region, gilt der
+nächste Randpunkt oder die beste Zelle, je nachdem welche besser passt:
+Ergebnisse liegen immer in der Region (Rand eingeschlossen).
+
+Aufwand je Problem: GRID_BASE² + 4 · GRID_BEAM · (GRID_LEVELS - 1)
+Zellen (hier höchstens 416), unabhängig von der Größe der Region.
+"""
+
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+import projection
+import solver
+from cache import ResultCache
+from metrics import NULL_STAGE
+
+GRID_BASE = 16
+GRID_LEVELS = 6  # feinste Stufe 512 x 512
+GRID_BEAM = 8
+GRID_STARTS = 3  # beste Zellen als Start der Verfeinerung
+
+MAX_REGION_VERTICES = 1000
+MIN_REGION_EXTENT = 1.0  # Meter
+MAX_REGION_EXTENT = 1000000.0  # Meter
+
+# Residuen (Zellen x Punkte) pro Rechenblock
+_GRID_ROUND_ELEMENTS = 1 << 16
+
+# Kinder einer Zelle als (Zeile, Spalte)
+_CHILDREN = np.array([[0, 0], [0, 1], [1, 0], [1, 1]])
+
+
+def bbox_polygon(min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> np.ndarray:
+    """Eckpunkte (4, 2) einer Bounding Box als lat, lng"""
+    return np.array(
+        [[min_lat, min_lng], [min_lat, max_lng], [max_lat, max_lng], [max_lat, min_lng]],
+        dtype=np.float64,
+    )
+
+
+def region_key(polygon: np.ndarray, mode: str) -> str:
+    """Cache-Schlüssel einer Region; Koordinaten auf 7 Nachkommastellen gerundet"""
+    digest = hashlib.blake2b(mode.encode(), digest_size=16)
+    digest.update(b"\0")
+    digest.update((np.round(polygon, 7) + 0.0).tobytes())
+    return digest.hexdigest()
+
+
+def grid_mode(points: np.ndarray, polygon: np.ndarray, mode: str = projection.AUTO) -> str:
+    """
+    Projektion für das Gitter einer Region
+
+    Bei 'auto' ENU, sobald die äquirektangulare Projektion für Punkte
+    oder Eckpunkte der Region um deren Mitte zu ungenau wäre.
+
+    Args:
+        points: Punktmengen (B, n, 3)
+        polygon: Eckpunkte (V, 2) als lat, lng
+    """
+    if mode != projection.AUTO:
+        return mode
+
+    center = (polygon.min(axis=0) + polygon.max(axis=0)) / 2
+    vertices = np.concatenate((polygon, np.zeros((len(polygon), 1))), axis=1)
+    combined = np.concatenate((points.reshape(-1, 3), vertices))
+    _, frame = projection.project(combined[None], projection.AUTO, center[None])
+    return projection.ENU if frame.enu[0] else projection.EQUIRECTANGULAR
+
+
+class RegionGrid:
+    """
+    Vorberechnetes Stufengitter einer Region in einer lokalen Projektion
+
+    Attributes:
+        mode: Projektion (EQUIRECTANGULAR oder ENU)
+        frame: Bezugssystem um die Mitte der Bounding Box (ein Problem)
+        polygon: Eckpunkte (V, 2) in lokalen Metern
+        origin, size: untere linke Ecke und Ausdehnung des Gitters in Metern
+        masks: je Stufe (N, N) bool, Zeile = y, Spalte = x
+    """
+
+    def __init__(self, polygon: np.ndarray, mode: str):
+        """
+        Args:
+            polygon: Eckpunkte (V, 2) als lat, lng
+            mode: projection.EQUIRECTANGULAR oder projection.ENU
+
+        Raises:
+            ValueError: bei zu kleiner oder zu großer Region
+        """
+        center = (polygon.min(axis=0) + polygon.max(axis=0)) / 2
+        vertices = np.concatenate((polygon, np.zeros((len(polygon), 1))), axis=1)
+        xy, self.frame = projection.project(vertices[None], mode, center[None])
+        self.mode = mode
+        self.polygon = xy[0]
+        self.origin = self.polygon.min(axis=0)
+        self.size = self.polygon.max(axis=0) - self.origin
+
+        if self.size.min() < MIN_REGION_EXTENT:
+            raise ValueError(f"Region ist schmaler als {MIN_REGION_EXTENT:g} m")
+        if self.size.max() > MAX_REGION_EXTENT:
+            raise ValueError(f"Region ist größer als {MAX_REGION_EXTENT / 1000:g} km")
+
+        finest = _fill(self.polygon, self.origin, self.size, GRID_BASE << (GRID_LEVELS - 1))
+        if not finest.any():
+            raise ValueError("Region enthält keine Gitterzelle")
+
+        self.masks = [finest]
+        for _ in range(GRID_LEVELS - 1):
+            n = len(self.masks[0]) // 2
+            self.masks.insert(0, self.masks[0].reshape(n, 2, n, 2).any(axis=(1, 3)))
+        self.level0 = np.argwhere(self.masks[0])
+
+    def cell_size(self, level: int) -> np.ndarray:
+        """Zellgröße (2,) in Metern als x, y"""
+        return self.size / (GRID_BASE << level)
+
+    def slack(self, level: int) -> float:
+        """Halbe Zelldiagonale: größter Abstand eines Zellpunkts zur Mitte"""
+        return float(np.hypot(*self.cell_size(level))) / 2
+
+    def centers(self, level: int, cells: np.ndarray) -> np.ndarray:
+        """Mittelpunkte (..., 2) als x, y der Zellen (..., 2) mit Zeile, Spalte"""
+        return self.origin + (cells[..., ::-1] + 0.5) * self.cell_size(level)
+
+    def contains(self, xy: np.ndarray) -> np.ndarray:
+        """Ob Positionen (B, 2) in der Region liegen (gerade-ungerade-Regel)"""
+        crosses, x_cross = _crossings(self.polygon, xy[:, 1])
+        return ((crosses & (x_cross < xy[:, :1])).sum(axis=1) & 1).astype(bool)
+
+    def nearest_boundary(self, xy: np.ndarray) -> np.ndarray:
+        """Nächste Punkte (B, 2) auf dem Rand der Region"""
+        start = self.polygon
+        edge = np.roll(start, -1, axis=0) - start
+        length = np.maximum(np.einsum("vi,vi->v", edge, edge), 1e-12)
+        offset = xy[:, None, :] - start
+        t = np.clip(np.einsum("bvi,vi->bv", offset, edge) / length, 0.0, 1.0)
+        nearest = start + t[..., None] * edge
+        gap = xy[:, None, :] - nearest
+        best = np.einsum("bvi,bvi->bv", gap, gap).argmin(axis=1)
+        return nearest[np.arange(len(xy)), best]
+
+
+def _crossings(polygon: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Schnitte waagerechter Geraden mit den Kanten
+
+    Returns:
+        (crosses, x): (m, V) ob die Kante die Gerade y schneidet, und wo
+    """
+    x1, y1 = polygon[:, 0], polygon[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    crosses = (y1 > y[:, None]) != (y2 > y[:, None])
+    dy = np.where(y2 != y1, y2 - y1, 1.0)
+    return crosses, x1 + (y[:, None] - y1) * (x2 - x1) / dy
+
+
+def _fill(polygon: np.ndarray, origin: np.ndarray, size: np.ndarray, n: int) -> np.ndarray:
+    """
+    Zellen (n, n), deren Mittelpunkt im Polygon liegt, dazu die Zellen der Eckpunkte
+
+    Scanline-Füllung: jeder Kantenschnitt einer Zeile kippt alle Zellen
+    rechts davon; die kumulierte Summe modulo 2 ergibt die Innenzellen.
+    """
+    cell = size / n
+    y = origin[1] + (np.arange(n) + 0.5) * cell[1]
+    crosses, x_cross = _crossings(polygon, y)
+    column = np.clip(np.floor((x_cross - origin[0]) / cell[0] - 0.5) + 1, 0, n).astype(np.int64)
+    rows = np.broadcast_to(np.arange(n)[:, None], crosses.shape)
+
+    toggles = np.zeros((n, n + 1), dtype=np.int32)
+    np.add.at(toggles, (rows[crosses], column[crosses]), 1)
+    inside = (np.cumsum(toggles, axis=1)[:, :n] & 1).astype(bool)
+
+    # Schmale Teile der Region ohne getroffenen Mittelpunkt: Eckpunkte markieren
+    vertex = np.clip(((polygon - origin) / cell).astype(np.int64), 0, n - 1)
+    inside[vertex[:, 1], vertex[:, 0]] = True
+    return inside
+
+
+def _stage(timer: Optional[Any], name: str):
+    """Stufe eines optionalen StageTimers"""
+    return NULL_STAGE if timer is None else timer.stage(name)
+
+
+def region_grid(polygon: np.ndarray, mode: str, cache: ResultCache) -> RegionGrid:
+    """
+    Gitter einer Region aus dem Cache oder neu berechnet
+
+    Raises:
+        ValueError: siehe RegionGrid
+    """
+    key = region_key(polygon, mode)
+    grid = cache.get(key)
+    if grid is None:
+        grid = RegionGrid(polygon, mode)
+        cache.put(key, grid)
+    return grid
+
+
+def truncated_cost(
+    candidates: np.ndarray,
+    xy: np.ndarray,
+    d: np.ndarray,
+    slack: float = 0.0,
+    tau: float = solver.RANSAC_THRESHOLD,
+) -> np.ndarray:
+    """
+    Σ min(max(|r| - slack, 0)², τ²) über alle Punkte für Kandidaten (B, K, 2)
+
+    Mit slack = halbe Zelldiagonale ist |r| - slack eine untere Schranke
+    des Residuums jedes Punkts der Zelle (Dreiecksungleichung): die Zelle
+    mit der Lösung hat für alle Inlier Kosten nahe 0.
+
+    Returns:
+        Kosten (B, K)
+    """
+    batch, count = candidates.shape[:2]
+    n = xy.shape[1]
+    cost = np.empty((batch, count))
+    limit = tau * tau
+
+    # Blöcke von höchstens _GRID_ROUND_ELEMENTS Residuen
+    cells = max(1, min(count, _GRID_ROUND_ELEMENTS // n))
+    rows = max(1, _GRID_ROUND_ELEMENTS // (cells * n))
+    for b in range(0, batch, rows):
+        for k in range(0, count, cells):
+            part = candidates[b : b + rows, k : k + cells, None, :]
+            dx = part[..., 0] - xy[b : b + rows, None, :, 0]
+            dy = part[..., 1] - xy[b : b + rows, None, :, 1]
+            dx *= dx
+            dy *= dy
+            dx += dy
+            r = np.sqrt(dx, out=dx)
+            r -= d[b : b + rows, None]
+            r = np.abs(r, out=r)
+            r -= slack
+            r = np.maximum(r, 0.0, out=r)
+            r *= r
+            cost[b : b + rows, k : k + cells] = np.minimum(r, limit, out=r).sum(axis=2)
+    return cost
+
+
+def search(
+    grid: RegionGrid, xy: np.ndarray, d: np.ndarray, threshold: float = solver.RANSAC_THRESHOLD
+) -> Tuple[np.ndarray, int]:
+    """
+    Beste Zellen der feinsten Stufe per Strahlsuche
+
+    Args:
+        xy: Punkte (B, n, 2) im Bezugssystem des Gitters
+        d: Entfernungen (B, n)
+        threshold: τ, Residuen-Grenze über der Zellgröße hinaus
+
+    Returns:
+        (positions, cells): Mitten (B, GRID_STARTS, 2) der besten Zellen,
+        beste zuerst, und bewertete Zellen je Problem
+    """
+    batch = len(xy)
+    cells = np.broadcast_to(grid.level0, (batch,) + grid.level0.shape)
+    cost = truncated_cost(grid.centers(0, cells), xy, d, grid.slack(0), threshold)
+    evaluated = cells.shape[1]
+
+    for level in range(1, GRID_LEVELS):
+        beam = min(GRID_BEAM, cells.shape[1])
+        best = np.argpartition(cost, beam - 1, axis=1)[:, :beam]
+        parents = np.take_along_axis(cells, best[..., None], axis=1)
+        cells = (2 * parents[:, :, None, :] + _CHILDREN).reshape(batch, 4 * beam, 2)
+
+        cost = truncated_cost(grid.centers(level, cells), xy, d, grid.slack(level), threshold)
+        cost[~grid.masks[level][cells[..., 0], cells[..., 1]]] = np.inf
+        evaluated += 4 * beam
+
+    best = np.argsort(cost, axis=1)[:, :GRID_STARTS]
+    return (
+        grid.centers(GRID_LEVELS - 1, np.take_along_axis(cells, best[..., None], axis=1)),
+        evaluated,
+    )
+
+
+def solve_batch(
+    points: np.ndarray,
+    grid: RegionGrid,
+    timer: Optional[Any] = None,
+    threshold: float = solver.RANSAC_THRESHOLD,
+) -> Dict[str, np.ndarray]:
+    """
+    Löst B Probleme innerhalb der Region eines Gitters
+
+    Args:
+        points: Array (B, n, 3) mit lat, lng, distance
+        grid: Gitter der Region, siehe region_grid
+        timer: optionaler metrics.StageTimer ('project', 'solve')
+
+    Returns:
+        Dictionary wie solver.solve_batch (algorithm REGION); 'hypotheses'
+        ist die Zahl bewerteter Zellen
+    """
+    points = np.asarray(points, dtype=np.float64)
+    batch, n = points.shape[:2]
+    with _stage(timer, "project"):
+        center = np.broadcast_to(grid.frame.center, (batch, 2))
+        xy, frame = projection.project(points, grid.mode, center)
+    d = points[..., 2]
+
+    with _stage(timer, "solve"):
+        starts, evaluated = search(grid, xy, d, threshold)
+
+        # Lineare Lösung als weiterer Start, sofern gültig und in der Region
+        linear = solver.trilaterate(xy, d) if n == 3 else solver.multilaterate(xy, d)
+        position = np.stack((linear["x"], linear["y"]), axis=1)
+        usable = linear["valid"] & np.isfinite(position).all(axis=1)
+        usable[usable] = grid.contains(position[usable])
+        starts = np.concatenate(
+            (starts, np.where(usable[:, None], position, starts[:, 0])[:, None]), axis=1
+        )
+
+        # Alle Starts gemeinsam verfeinern, Inlier bis τ plus halbe Zelldiagonale
+        count = starts.shape[1]
+        xy_all = np.repeat(xy, count, axis=0)
+        d_all = np.repeat(d, count, axis=0)
+        starts = starts.reshape(-1, 2)
+        residuals = np.linalg.norm(starts[:, None, :] - xy_all, axis=2) - d_all
+        inliers = np.abs(residuals) <= grid.slack(GRID_LEVELS - 1) + threshold
+        refined = solver.refine_inliers(
+            xy_all, d_all, starts, np.ones(len(starts), dtype=bool), inliers, threshold
+        )
+
+        # Bestes Ergebnis in der Region; ohne solches zunächst das der besten Zelle
+        position = np.stack((refined["x"], refined["y"]), axis=1)
+        cost = truncated_cost(position.reshape(batch, count, 2), xy, d, tau=threshold)
+        cost[~grid.contains(position).reshape(batch, count)] = np.inf
+        chosen = np.arange(batch) * count + cost.argmin(axis=1)
+        result = {key: value[chosen] for key, value in refined.items()}
+
+        outside = ~np.isfinite(cost.min(axis=1))
+        if outside.any():
+            # Randpunkt oder beste Zelle, je nachdem was besser passt
+            first = starts[chosen[outside]]
+            candidates = np.stack((grid.nearest_boundary(position[chosen[outside]]), first), axis=1)
+            cost = truncated_cost(candidates, xy[outside], d[outside], tau=threshold)
+            cost[~grid.contains(first), 1] = np.inf
+            fallback = candidates[np.arange(len(candidates)), cost.argmin(axis=1)]
+            clamped = solver.refine_inliers(
+                xy[outside],
+                d[outside],
+                fallback,
+                result["valid"][outside],
+                inliers[chosen[outside]],
+                threshold,
+                max_iterations=0,
+            )
+            for key, value in clamped.items():
+                result[key][outside] = value
+        result["hypotheses"] = np.full(batch, evaluated)
+
+    with _stage(timer, "project"):
+        lat, lng = projection.unproject(result["x"], result["y"], frame)
+
+    result.update(
+        {
+            "lat": lat,
+            "lng": lng,
+            "algorithm": solver.REGION,
+            "center": frame.center,
+            "enu": frame.enu,
+        }
+    )
+    return result
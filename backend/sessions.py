@@ -0,0 +1,198 @@
+"""
+Zustandsbehaftete Sitzungen für den Live-Modus
+
+Eine Sitzung hält die Punkte einer laufenden Eingabe zusammen mit den
+akkumulierten Momentsummen (siehe solver.point_moments). Hinzufügen,
+Ändern und Entfernen eines Punktes aktualisiert die Summen in O(1),
+die Position folgt ohne Neuaufbau der Designmatrix. Sitzungen liegen
+im Speicher des jeweiligen Workers und verfallen nach Inaktivität.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import projection
+import solver
+
+# Nach so vielen Subtraktionen werden die Summen neu aufgebaut, damit
+# sich Rundungsfehler nicht aufschaukeln
+SESSION_REBUILD_INTERVAL = 256
+
+
+class SolveSession:
+    """
+    Punkte und Momentsummen einer Sitzung
+
+    Punkte erhalten fortlaufende IDs, die über Änderungen hinweg stabil
+    bleiben. Aufrufer serialisieren Zugriffe über 'lock'.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.lock = threading.Lock()
+        self.last_access = time.monotonic()
+        self._points = np.empty((0, 3))
+        self._ids: List[int] = []
+        self._next_id = 1
+        self._anchor: Optional[np.ndarray] = None
+        self._moments = np.zeros(solver.MOMENT_COUNT)
+        self._downdates = 0
+
+    @property
+    def points(self) -> np.ndarray:
+        """Aktuelle Punkte (n, 3) in ID-Reihenfolge"""
+        return self._points
+
+    @property
+    def point_ids(self) -> List[int]:
+        return list(self._ids)
+
+    def add(self, points: np.ndarray) -> List[int]:
+        """Fügt Punkte (k, 3) hinzu und liefert ihre IDs"""
+        if len(points) == 0:
+            return []
+        if self._anchor is None:
+            self._anchor = points[0, :2].copy()
+
+        ids = list(range(self._next_id, self._next_id + len(points)))
+        self._next_id += len(points)
+        self._points = np.concatenate((self._points, points))
+        self._ids.extend(ids)
+        self._moments += solver.point_moments(points, self._anchor).sum(axis=0)
+        return ids
+
+    def update(self, point_id: int, point: np.ndarray) -> None:
+        """Ersetzt die Werte (3,) eines Punktes"""
+        index = self._index(point_id)
+        changed = np.stack((self._points[index], point))
+        moments = solver.point_moments(changed, self._anchor)
+        self._moments += moments[1] - moments[0]
+        self._points[index] = point
+        self._downdated(1)
+
+    def remove(self, point_ids: List[int]) -> None:
+        """Entfernt Punkte anhand ihrer IDs"""
+        point_ids = list(dict.fromkeys(point_ids))
+        indices = [self._index(point_id) for point_id in point_ids]
+        self._moments -= solver.point_moments(self._points[indices], self._anchor).sum(axis=0)
+        self._points = np.delete(self._points, indices, axis=0)
+        removed = set(point_ids)
+        self._ids = [point_id for point_id in self._ids if point_id not in removed]
+        self._downdated(len(indices))
+
+    def has_point(self, point_id: Any) -> bool:
+        return point_id in self._ids
+
+    def solve(self, projection_mode: str = projection.AUTO) -> Optional[solver.SolveResult]:
+        """
+        Löst die aktuelle Punktmenge
+
+        Ab 4 Punkten aus den Momentsummen (äquirektangular); für 3 Punkte
+        (exakte Trilateration), schlecht konditionierte Normalgleichungen,
+        weiträumige Punktmengen und die ENU-Projektion über den
+        vollständigen Solver. None bei weniger als 3 Punkten.
+        """
+        if len(self._points) < 3:
+            return None
+
+        result = None
+        if len(self._points) > 3 and projection_mode != projection.ENU:
+            result = solver.solve_moments(self._points, self._moments, self._anchor)
+        if result is None:
+            result = solver.solve_batch(self._points[None], projection_mode=projection_mode)
+        return solver.unpack(result)[0]
+
+    def _index(self, point_id: int) -> int:
+        try:
+            return self._ids.index(point_id)
+        except ValueError:
+            raise KeyError(point_id) from None
+
+    def _downdated(self, count: int) -> None:
+        """Zählt Subtraktionen und baut die Summen bei Bedarf neu auf"""
+        self._downdates += count
+        if self._downdates < SESSION_REBUILD_INTERVAL and len(self._points):
+            return
+
+        self._downdates = 0
+        if len(self._points) == 0:
+            self._anchor = None
+            self._moments = np.zeros(solver.MOMENT_COUNT)
+            return
+        self._anchor = self._points[0, :2].copy()
+        self._moments = solver.point_moments(self._points, self._anchor).sum(axis=0)
+
+
+class SessionStore:
+    """
+    Begrenzter Speicher für Sitzungen mit Ablauf nach Inaktivität
+
+    Ist der Speicher voll, wird die am längsten unbenutzte Sitzung verdrängt.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_timeout: float = 900.0):
+        """
+        Args:
+            max_sessions: maximale Anzahl gleichzeitiger Sitzungen
+            idle_timeout: Sekunden ohne Zugriff bis zum Verfall
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, SolveSession]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def create(self) -> SolveSession:
+        """Legt eine neue, leere Sitzung an"""
+        session = SolveSession(uuid.uuid4().hex)
+        with self._lock:
+            self._expire(time.monotonic())
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted += 1
+            self._sessions[session.session_id] = session
+            self.created += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[SolveSession]:
+        """Liefert eine aktive Sitzung und erneuert ihre Ablaufzeit"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /api/health"""
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_timeout_seconds": self.idle_timeout,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+    def _expire(self, now: float) -> None:
+        """Entfernt verfallene Sitzungen; die ältesten stehen vorne"""
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_access < self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
@@ -0,0 +1,839 @@
+"""
+Vektorisierte Triangulations-Kernel
+
+Die Kernel arbeiten auf gestapelten float64-Arrays: B unabhängige
+Probleme mit jeweils n Referenzpunkten, als Array der Form (B, n, 3)
+mit den Spalten lat, lng, distance. Projektion, Ausgleichsrechnung und
+Fehleranalyse laufen als Array-Operationen über alle Probleme
+gleichzeitig, ohne Python-Schleifen pro Problem oder Punkt.
+
+Öffentliche API:
+    solve(points)        Einzelproblem aus (n, 3)- oder strukturiertem Array
+    solve_batch(points)  B Probleme gleicher Größe als Array (B, n, 3)
+    unpack(result)       Batch-Ergebnis in SolveResult-Records zerlegen
+
+Verfahren (Parameter 'method'):
+    'wls'  lineare Lösung - exakte Trilateration für 3 Punkte,
+           Weighted Least Squares ab 4 Punkten (Standard)
+    'lm'   Levenberg-Marquardt auf den echten Entfernungsresiduen,
+           gestartet von der linearen Lösung
+    'ransac'  robuste Schätzung: Konsens über minimale 3-Punkt-Teilmengen,
+           anschließend Levenberg-Marquardt nur auf den Inliern
+
+Die Projektion in die Ebene (Parameter 'projection_mode', siehe
+projection) ist standardmäßig 'auto': äquirektangular für kleine
+Ausdehnungen, lokale ENU-Tangentialebene für weiträumige Punktmengen.
+"""
+
+import itertools
+import math
+import numpy as np
+from contextlib import nullcontext
+from numpy.lib import recfunctions
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import projection
+from projection import METERS_PER_DEGREE
+
+# Maximale Konditionszahl des linearisierten Systems; darüber gilt die
+# Punktkonfiguration als entartet (kollinear, doppelt, ...). Im Gegensatz
+# zu einer Determinanten-Schwelle unabhängig von der Skalierung.
+MAX_CONDITION = 1e8
+
+# Algorithmen; WLS und LM sind über den Parameter 'method' wählbar
+TRILATERATION = "trilateration"
+WLS = "wls"
+LM = "lm"
+RANSAC = "ransac"
+METHODS = (WLS, LM, RANSAC)
+REGION = "region"  # Gittersuche in einer Region, siehe region.py
+
+LM_MAX_ITERATIONS = 20
+LM_TOLERANCE = 1e-3  # Schrittweite in Metern, ab der die Lösung als konvergiert gilt
+LM_INITIAL_DAMPING = 1e-3
+LM_MAX_DAMPING = 1e8
+
+RANSAC_THRESHOLD = 10.0  # Entfernungsfehler in Metern, bis zu dem ein Punkt Inlier ist
+RANSAC_MAX_HYPOTHESES = 500  # Budget an 3-Punkt-Teilmengen pro Problem
+RANSAC_CONFIDENCE = 0.99  # Abbruch, sobald eine bessere Teilmenge so unwahrscheinlich ist
+RANSAC_SEED = 0
+RANSAC_ROUND_SIZE = 32  # Hypothesen pro Problem und Runde
+_RANSAC_ROUND_ELEMENTS = 1 << 21  # Obergrenze für Residuen (Probleme x Hypothesen x n) pro Runde
+
+# Strukturiertes Eingabeformat: eine Zeile pro Referenzpunkt
+POINT_DTYPE = np.dtype([("lat", "<f8"), ("lng", "<f8"), ("distance", "<f8")])
+
+
+class SolveResult(NamedTuple):
+    """Kompaktes Ergebnis einer einzelnen Triangulation"""
+
+    valid: bool
+    method: str
+    algorithm: str
+    lat: float
+    lng: float
+    x: float
+    y: float
+    accuracy: float
+    confidence: float
+    max_error: float
+    mean_error: float
+    distance_errors: np.ndarray
+    outlier_mask: np.ndarray
+    residuals: Optional[np.ndarray] = None
+    weights: Optional[np.ndarray] = None
+    iterations: int = 0
+    converged: bool = True
+    hypotheses: int = 0
+    projection: str = projection.EQUIRECTANGULAR
+
+
+_SCALAR_FIELDS = (
+    "valid",
+    "lat",
+    "lng",
+    "x",
+    "y",
+    "accuracy",
+    "confidence",
+    "max_error",
+    "mean_error",
+)
+_ITERATION_FIELDS = ("iterations", "converged", "hypotheses")
+
+
+def _well_conditioned(m00, m01, m10, m11) -> np.ndarray:
+    """
+    Prüft cond(M) < MAX_CONDITION für gestapelte 2x2-Matrizen
+
+    Für Singulärwerte σ₁ ≥ σ₂ gilt ‖M‖²_F = σ₁² + σ₂² und |det M| = σ₁σ₂,
+    also ‖M‖²_F / |det M| = κ + 1/κ mit κ = σ₁/σ₂ - ohne SVD und ohne
+    Division, auch für singuläre Matrizen.
+    """
+    frobenius = m00 * m00 + m01 * m01 + m10 * m10 + m11 * m11
+    det = np.abs(m00 * m11 - m01 * m10)
+    return det * (MAX_CONDITION + 1 / MAX_CONDITION) > frobenius
+
+
+def _range_weights(d: np.ndarray) -> np.ndarray:
+    """Gewichtung basierend auf Entfernung (nähere Punkte = höhere Genauigkeit)"""
+    return 1000.0 / (1000.0 + d)
+
+
+def _error_stats(distance_errors: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Mittelwert, RMSE und Standardabweichung der Fehler je Problem"""
+    n = distance_errors.shape[1]
+    mean_error = distance_errors.sum(axis=1) / n
+    rmse = np.sqrt(np.einsum("bn,bn->b", distance_errors, distance_errors) / n)
+    std_error = np.sqrt(np.abs(rmse * rmse - mean_error * mean_error))
+    return mean_error, rmse, std_error
+
+
+def _distance_errors(position: np.ndarray, xy: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """Absolute Entfernungsfehler |‖p - pᵢ‖ - dᵢ| der Form (B, n)"""
+    delta = xy - position[:, None, :]
+    return np.abs(np.sqrt(np.einsum("bni,bni->bn", delta, delta)) - d)
+
+
+def _trilaterate_position(xy: np.ndarray, d: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Position (B, 2) und Gültigkeit (B,) für B Probleme mit genau 3 Punkten
+
+    Differenzen aufeinanderfolgender Kreisgleichungen ergeben je ein
+    lineares 2x2-System 2 (pᵢ₊₁ - pᵢ) · p = qᵢ₊₁ - qᵢ mit qᵢ = ‖pᵢ‖² - dᵢ².
+    """
+    q = np.einsum("bni,bni->bn", xy, xy) - d * d
+    rhs = q[:, 1:] - q[:, :-1]
+    diffs = xy[:, 1:] - xy[:, :-1]
+    a, b = diffs[:, 0, 0], diffs[:, 0, 1]
+    c, e = diffs[:, 1, 0], diffs[:, 1, 1]
+
+    valid = _well_conditioned(a, b, c, e)
+    det = np.where(valid, 2 * (a * e - b * c), 1.0)
+
+    position = np.empty((xy.shape[0], 2))
+    position[:, 0] = (rhs[:, 0] * e - rhs[:, 1] * b) / det
+    position[:, 1] = (a * rhs[:, 1] - c * rhs[:, 0]) / det
+    return position, valid
+
+
+def trilaterate(xy: np.ndarray, d: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Exakte Trilateration für B Probleme mit genau 3 Punkten
+
+    Args:
+        xy: lokale Koordinaten (B, 3, 2)
+        d: Entfernungen (B, 3)
+
+    Returns:
+        Dictionary mit Arrays; 'valid' markiert nicht-kollineare Probleme.
+        Für ungültige Probleme sind die übrigen Werte bedeutungslos.
+    """
+    position, valid = _trilaterate_position(xy, d)
+    distance_errors = _distance_errors(position, xy, d)
+    max_error = distance_errors.max(axis=1)
+
+    return {
+        "x": position[:, 0],
+        "y": position[:, 1],
+        "valid": valid,
+        "accuracy": max_error,
+        "confidence": np.maximum(100 - max_error, 0.0),
+        "max_error": max_error,
+        "mean_error": distance_errors.sum(axis=1) / 3,
+        "distance_errors": distance_errors,
+        "outlier_mask": np.zeros(d.shape, dtype=bool),
+    }
+
+
+def multilaterate(xy: np.ndarray, d: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Weighted Least Squares für B Probleme mit je n >= 3 Punkten
+
+    Zeilen von A sind 2pᵢ, b = ‖pᵢ‖² - dᵢ². Statt AᵀWA mit einer dichten
+    n x n Gewichtsmatrix zu bilden, werden die Zeilen mit √wᵢ skaliert
+    und das Ausgleichsproblem per QR-Zerlegung gelöst: O(n) Speicher und
+    Laufzeit, ohne die Kondition durch Normalgleichungen zu quadrieren.
+
+    Args:
+        xy: lokale Koordinaten (B, n, 2)
+        d: Entfernungen (B, n)
+
+    Returns:
+        Dictionary mit Arrays; 'valid' markiert gut konditionierte Probleme.
+        Für ungültige Probleme sind die übrigen Werte bedeutungslos.
+    """
+    b = np.einsum("bni,bni->bn", xy, xy) - d * d
+    weights = _range_weights(d)
+    sqrt_w = np.sqrt(weights)
+
+    # Zeilenskalierte Spalten von √W A und √W b
+    a1 = xy[..., 0] * (2 * sqrt_w)
+    a2 = xy[..., 1] * (2 * sqrt_w)
+    bw = b * sqrt_w
+
+    # Dünne QR-Zerlegung per modifiziertem Gram-Schmidt auf [√W A | √W b];
+    # für zwei Spalten deutlich schneller als gestapeltes np.linalg.qr
+    r00 = np.sqrt(np.einsum("bn,bn->b", a1, a1))
+    q1 = a1 / np.where(r00 > 0, r00, 1.0)[:, None]
+    r01 = np.einsum("bn,bn->b", q1, a2)
+    v = a2 - r01[:, None] * q1
+    r11 = np.sqrt(np.einsum("bn,bn->b", v, v))
+    q2 = v / np.where(r11 > 0, r11, 1.0)[:, None]
+    c0 = np.einsum("bn,bn->b", q1, bw)
+    c1 = np.einsum("bn,bn->b", q2, bw - c0[:, None] * q1)
+
+    # Rückwärtseinsetzen in R p = Qᵀ √W b
+    valid = _well_conditioned(r00, r01, 0.0, r11)
+    position = np.empty((xy.shape[0], 2))
+    position[:, 1] = c1 / np.where(valid, r11, 1.0)
+    position[:, 0] = (c0 - r01 * position[:, 1]) / np.where(valid, r00, 1.0)
+
+    return _multilateration_result(position, valid, xy, d, b, weights)
+
+
+def _multilateration_result(
+    position: np.ndarray,
+    valid: np.ndarray,
+    xy: np.ndarray,
+    d: np.ndarray,
+    b: np.ndarray,
+    weights: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Residuen, Fehleranalyse und Ausreißer einer WLS-Lösung im Format von multilaterate"""
+    residuals = b - 2 * (xy @ position[..., None])[..., 0]
+    distance_errors = _distance_errors(position, xy, d)
+
+    mean_error, rmse, std_error = _error_stats(distance_errors)
+    outlier_mask = distance_errors > (mean_error + 2 * std_error)[:, None]
+
+    return {
+        "x": position[:, 0],
+        "y": position[:, 1],
+        "valid": valid,
+        "accuracy": rmse,
+        "confidence": np.maximum(100 - 2 * rmse, 0.0),
+        "max_error": distance_errors.max(axis=1),
+        "mean_error": mean_error,
+        "distance_errors": distance_errors,
+        "outlier_mask": outlier_mask,
+        "residuals": residuals,
+        "weights": weights,
+    }
+
+
+def _range_residuals(position: np.ndarray, xy: np.ndarray, d: np.ndarray, weights: np.ndarray):
+    """Differenzvektoren, Entfernungen, Residuen ‖p - pᵢ‖ - dᵢ und gewichtete Kosten"""
+    delta = position[:, None, :] - xy
+    ranges = np.sqrt(np.einsum("bni,bni->bn", delta, delta))
+    residuals = ranges - d
+    cost = np.einsum("bn,bn,bn->b", weights, residuals, residuals)
+    return delta, ranges, residuals, cost
+
+
+def levenberg_marquardt(
+    xy: np.ndarray,
+    d: np.ndarray,
+    position: np.ndarray,
+    valid: np.ndarray,
+    max_iterations: int = LM_MAX_ITERATIONS,
+    tolerance: float = LM_TOLERANCE,
+    weights: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Nichtlineare Verfeinerung auf den echten Entfernungsresiduen
+
+    Minimiert Σ wᵢ (‖p - pᵢ‖ - dᵢ)² für B Probleme gleichzeitig mit
+    analytischer Jacobi-Matrix ∂rᵢ/∂p = (p - pᵢ) / ‖p - pᵢ‖. Die Dämpfung
+    wird pro Problem angepasst; konvergierte Probleme werden eingefroren.
+
+    Args:
+        xy: lokale Koordinaten (B, n, 2)
+        d: Entfernungen (B, n)
+        position: Startlösung (B, 2), z.B. aus multilaterate
+        valid: nur diese Probleme werden verfeinert
+        max_iterations: Obergrenze der Iterationen
+        tolerance: Schrittweite in Metern für Konvergenz
+        weights: Gewichte (B, n); Standard ist die Entfernungsgewichtung,
+            Gewicht 0 schließt einen Punkt aus
+
+    Returns:
+        Dictionary im Format von multilaterate, ergänzt um 'iterations'
+        und 'converged'; 'residuals' sind die Entfernungsresiduen in Metern
+    """
+    batch = xy.shape[0]
+    if weights is None:
+        weights = _range_weights(d)
+    position = np.array(position, dtype=np.float64)
+    damping = np.full(batch, LM_INITIAL_DAMPING)
+    iterations = np.zeros(batch, dtype=np.int64)
+    converged = ~valid
+    active = valid.copy()
+
+    delta, ranges, residuals, cost = _range_residuals(position, xy, d, weights)
+
+    for _ in range(max_iterations):
+        if not active.any():
+            break
+
+        # Gauß-Newton-System JᵀWJ δ = -JᵀWr mit Marquardt-Dämpfung der Diagonale
+        jacobian = delta / np.maximum(ranges, 1e-12)[..., None]
+        H = np.einsum("bni,bn,bnj->bij", jacobian, weights, jacobian)
+        g = np.einsum("bni,bn->bi", jacobian, weights * residuals)
+        h01 = H[:, 0, 1]
+        m00 = H[:, 0, 0] * (1 + damping)
+        m11 = H[:, 1, 1] * (1 + damping)
+        det = m00 * m11 - h01 * h01
+        det = np.where(det > 0, det, 1.0)
+
+        step = np.empty((batch, 2))
+        step[:, 0] = (h01 * g[:, 1] - m11 * g[:, 0]) / det
+        step[:, 1] = (h01 * g[:, 0] - m00 * g[:, 1]) / det
+
+        candidate = _range_residuals(position + step, xy, d, weights)
+        accept = active & (candidate[3] <= cost)
+
+        position = np.where(accept[:, None], position + step, position)
+        delta = np.where(accept[:, None, None], candidate[0], delta)
+        ranges = np.where(accept[:, None], candidate[1], ranges)
+        residuals = np.where(accept[:, None], candidate[2], residuals)
+        cost = np.where(accept, candidate[3], cost)
+        damping = np.where(accept, damping * 0.1, damping * 10)
+        iterations += active
+
+        # Konvergiert: akzeptierter Schritt unter der Toleranz oder keine
+        # Verbesserung mehr möglich (Dämpfung am Anschlag)
+        done = (accept & (np.hypot(step[:, 0], step[:, 1]) < tolerance)) | (
+            active & (damping > LM_MAX_DAMPING)
+        )
+        converged |= done
+        active &= ~done
+
+    distance_errors = np.abs(residuals)
+    mean_error, rmse, std_error = _error_stats(distance_errors)
+    outlier_mask = distance_errors > (mean_error + 2 * std_error)[:, None]
+
+    return {
+        "x": position[:, 0],
+        "y": position[:, 1],
+        "valid": valid,
+        "accuracy": rmse,
+        "confidence": np.maximum(100 - 2 * rmse, 0.0),
+        "max_error": distance_errors.max(axis=1),
+        "mean_error": mean_error,
+        "distance_errors": distance_errors,
+        "outlier_mask": outlier_mask,
+        "residuals": residuals,
+        "weights": weights,
+        "iterations": iterations,
+        "converged": converged,
+    }
+
+
+def _sample_subsets(rng: np.random.Generator, shape: Tuple[int, ...], n: int) -> np.ndarray:
+    """Gleichverteilte 3-Teilmengen verschiedener Indizes aus range(n), Form shape + (3,)"""
+    a = rng.integers(0, n, shape)
+    b = rng.integers(0, n - 1, shape)
+    b += b >= a
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    c = rng.integers(0, n - 2, shape)
+    c += c >= lo
+    c += c >= hi
+    return np.stack((a, b, c), axis=-1)
+
+
+def _consensus(
+    position: np.ndarray, xy: np.ndarray, d: np.ndarray, threshold_sq: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    MSAC-Bewertung von K Hypothesen (B, K, 2) gegen alle n Punkte
+
+    Returns:
+        (cost, inliers): Σ min(rᵢ², t²) der Form (B, K) und Inlier-Maske (B, K, n)
+    """
+    delta = xy[:, None, :, :] - position[:, :, None, :]
+    residuals = np.sqrt(np.einsum("bkni,bkni->bkn", delta, delta)) - d[:, None, :]
+    squared = residuals * residuals
+    return np.minimum(squared, threshold_sq).sum(axis=2), squared <= threshold_sq
+
+
+def ransac(
+    xy: np.ndarray,
+    d: np.ndarray,
+    start: np.ndarray,
+    valid: np.ndarray,
+    threshold: float = RANSAC_THRESHOLD,
+    max_hypotheses: int = RANSAC_MAX_HYPOTHESES,
+    confidence: float = RANSAC_CONFIDENCE,
+    seed: int = RANSAC_SEED,
+) -> Dict[str, np.ndarray]:
+    """
+    Robuste Schätzung per RANSAC über minimale 3-Punkt-Teilmengen
+
+    Jede Runde zieht pro aktivem Problem bis zu RANSAC_ROUND_SIZE
+    Teilmengen, trianguliert sie gemeinsam und bewertet alle Hypothesen
+    vektorisiert mit abgeschnittenen quadratischen Residuen (MSAC). Ein
+    Problem scheidet aus, sobald bei der besten Inlier-Quote w nach
+    log(1 - confidence) / log(1 - w³) Ziehungen eine bessere Teilmenge
+    unwahrscheinlich ist, spätestens nach max_hypotheses. Passen alle
+    Teilmengen ins Budget, werden sie vollständig in zufälliger
+    Reihenfolge geprüft. Die beste Lösung wird anschließend per
+    Levenberg-Marquardt nur auf ihren Inliern verfeinert.
+
+    Args:
+        xy: lokale Koordinaten (B, n, 2)
+        d: Entfernungen (B, n)
+        start: lineare Lösung (B, 2), bewertet als erste Hypothese
+        valid: nur diese Probleme werden geschätzt
+        threshold: Inlier-Schwelle für den Entfernungsfehler in Metern
+        max_hypotheses: Budget an Teilmengen pro Problem
+        confidence: Wahrscheinlichkeit für den adaptiven Abbruch
+        seed: Zufalls-Seed; gleiche Eingabe liefert gleiche Ergebnisse
+
+    Returns:
+        Dictionary im Format von levenberg_marquardt, ergänzt um
+        'hypotheses'; 'outlier_mask' markiert die ausgeschlossenen Punkte,
+        Fehlerkennzahlen beziehen sich nur auf die Inlier
+    """
+    batch, n = d.shape
+    rng = np.random.default_rng(seed)
+    threshold_sq = threshold * threshold
+
+    best_position = np.array(start, dtype=np.float64)
+    best_cost, best_inliers = _consensus(best_position[:, None], xy, d, threshold_sq)
+    best_cost, best_inliers = best_cost[:, 0], best_inliers[:, 0]
+    hypotheses = np.zeros(batch, dtype=np.int64)
+
+    subset_count = math.comb(n, 3)
+    if subset_count <= max_hypotheses:
+        subsets = rng.permutation(np.array(list(itertools.combinations(range(n), 3))))
+        budget = subset_count
+    else:
+        subsets = None
+        budget = max_hypotheses
+
+    round_size = max(1, min(RANSAC_ROUND_SIZE, _RANSAC_ROUND_ELEMENTS // (batch * n)))
+    log_failure = math.log(1 - confidence)
+    active = valid.copy()
+    drawn = 0
+
+    while drawn < budget:
+        index = np.flatnonzero(active)
+        if index.size == 0:
+            break
+
+        k = min(round_size, budget - drawn)
+        if subsets is None:
+            subset = _sample_subsets(rng, (index.size, k), n)
+        else:
+            subset = np.broadcast_to(subsets[drawn : drawn + k], (index.size, k, 3))
+        drawn += k
+
+        rows = index[:, None, None]
+        position, fit_valid = _trilaterate_position(
+            xy[rows, subset].reshape(-1, 3, 2), d[rows, subset].reshape(-1, 3)
+        )
+        cost, inliers = _consensus(position.reshape(-1, k, 2), xy[index], d[index], threshold_sq)
+        cost[~fit_valid.reshape(-1, k)] = np.inf
+
+        pick = cost.argmin(axis=1)
+        local = np.arange(index.size)
+        better = cost[local, pick] < best_cost[index]
+        winners, pick = local[better], pick[better]
+        updated = index[better]
+        best_cost[updated] = cost[winners, pick]
+        best_position[updated] = position.reshape(-1, k, 2)[winners, pick]
+        best_inliers[updated] = inliers[winners, pick]
+        hypotheses[index] += k
+
+        # Adaptiver Abbruch über die Wahrscheinlichkeit, dass noch keine
+        # ausreißerfreie Teilmenge gezogen wurde
+        ratio = best_inliers[index].sum(axis=1) / n
+        clean = np.minimum(ratio * ratio * ratio, 1 - 1e-12)
+        required = log_failure / np.minimum(np.log1p(-clean), -1e-12)
+        active[index] = hypotheses[index] < required
+
+    result = refine_inliers(xy, d, best_position, valid, best_inliers, threshold)
+    result["hypotheses"] = hypotheses
+    return result
+
+
+def refine_inliers(
+    xy: np.ndarray,
+    d: np.ndarray,
+    position: np.ndarray,
+    valid: np.ndarray,
+    inliers: np.ndarray,
+    threshold: float = RANSAC_THRESHOLD,
+    max_iterations: int = LM_MAX_ITERATIONS,
+) -> Dict[str, np.ndarray]:
+    """
+    Levenberg-Marquardt nur auf den Inliern, Fehlerkennzahlen über die Inlier
+
+    Bei weniger als 3 Inliern wird auf alle Punkte zurückgefallen. Punkte,
+    die nach der Verfeinerung innerhalb von threshold passen, zählen
+    ebenfalls als Inlier; 'outlier_mask' markiert die übrigen.
+
+    Args:
+        position: Startlösung (B, 2)
+        inliers: Inlier-Maske (B, n) der Startlösung
+        max_iterations: 0 bewertet nur die Startlösung
+    """
+    # Zu kleiner Konsens: auf alle Punkte zurückfallen
+    mask = inliers | (inliers.sum(axis=1) < 3)[:, None]
+    weights = _range_weights(d) * mask
+    result = levenberg_marquardt(xy, d, position, valid, max_iterations, weights=weights)
+
+    # Nach der Verfeinerung passende Punkte zählen ebenfalls als Inlier
+    distance_errors = result["distance_errors"]
+    inliers = mask | (distance_errors <= threshold)
+    count = inliers.sum(axis=1)
+    inlier_errors = distance_errors * inliers
+    mean_error = inlier_errors.sum(axis=1) / count
+    rmse = np.sqrt(np.einsum("bn,bn->b", inlier_errors, inlier_errors) / count)
+
+    result.update(
+        {
+            "accuracy": rmse,
+            "confidence": np.maximum(100 - 2 * rmse, 0.0),
+            "max_error": inlier_errors.max(axis=1),
+            "mean_error": mean_error,
+            "outlier_mask": ~inliers,
+        }
+    )
+    return result
+
+
+def solve_batch(
+    points: np.ndarray,
+    method: str = WLS,
+    timer: Optional[Any] = None,
+    projection_mode: str = projection.AUTO,
+) -> Dict[str, np.ndarray]:
+    """
+    Löst B Triangulationsprobleme gleicher Punktanzahl in einem Durchgang
+
+    Args:
+        points: Array (B, n, 3) mit lat, lng, distance und n >= 3
+        method: 'wls' für die lineare Lösung, 'lm' für die nichtlineare
+            Verfeinerung, 'ransac' für die robuste Schätzung (siehe METHODS)
+        timer: optional ein metrics.StageTimer für die Stufen
+            'project' und 'solve'
+        projection_mode: Projektion in die Ebene, siehe projection.PROJECTIONS
+
+    Returns:
+        Dictionary mit Arrays des jeweiligen Kernels, ergänzt um
+        'lat', 'lng', 'center' (B, 2), 'enu' (B,) und 'algorithm'
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Methode '{method}'")
+
+    points = np.asarray(points, dtype=np.float64)
+    with _stage(timer, "project"):
+        xy, frame = projection.project(points, projection_mode)
+    distance = points[..., 2]
+
+    with _stage(timer, "solve"):
+        if points.shape[1] == 3:
+            result = trilaterate(xy, distance)
+            algorithm = TRILATERATION
+        else:
+            result = multilaterate(xy, distance)
+            algorithm = WLS
+
+        if method == LM:
+            start = np.stack((result["x"], result["y"]), axis=1)
+            result = levenberg_marquardt(xy, distance, start, result["valid"])
+            algorithm = LM
+        elif method == RANSAC:
+            start = np.stack((result["x"], result["y"]), axis=1)
+            result = ransac(xy, distance, start, result["valid"])
+            algorithm = RANSAC
+
+    with _stage(timer, "project"):
+        result["lat"], result["lng"] = projection.unproject(result["x"], result["y"], frame)
+    result["algorithm"] = algorithm
+    result["center"] = frame.center
+    result["enu"] = frame.enu
+    return result
+
+
+_NULL_STAGE = nullcontext()
+
+
+def _stage(timer: Optional[Any], name: str):
+    """Messpunkt einer Stufe; ohne Timer ein leerer Kontext"""
+    return _NULL_STAGE if timer is None else timer.stage(name)
+
+
+# Momente für die inkrementelle Lösung (siehe point_moments)
+MOMENT_COUNT = 16
+
+
+def point_moments(points: np.ndarray, anchor: np.ndarray) -> np.ndarray:
+    """
+    Momentvektoren einzelner Punkte für die inkrementelle WLS-Lösung
+
+    Mit u, v als Längen-/Breitendifferenz zum festen Anker und dem
+    Gewicht w = w(d) enthält jeder Vektor 1, u, v sowie
+    w·[1, u, v, u², uv, v², u³, u²v, uv², v³, d², ud², vd²]. Die Summe
+    über alle Punkte bestimmt AᵀWA und AᵀWb für jeden Bezugspunkt,
+    insbesondere den aktuellen Schwerpunkt. Hinzufügen oder Entfernen
+    eines Punktes ist damit eine Addition oder Subtraktion.
+
+    Args:
+        points: Array (n, 3) mit lat, lng, distance
+        anchor: fester Bezugspunkt (2,) als (lat, lng)
+
+    Returns:
+        Array (n, MOMENT_COUNT)
+    """
+    u = points[:, 1] - anchor[1]
+    v = points[:, 0] - anchor[0]
+    d2 = points[:, 2] * points[:, 2]
+    w = _range_weights(points[:, 2])
+    wu, wv = w * u, w * v
+    wuu, wuv, wvv = wu * u, wu * v, wv * v
+    return np.stack(
+        (
+            np.ones_like(u),
+            u,
+            v,
+            w,
+            wu,
+            wv,
+            wuu,
+            wuv,
+            wvv,
+            wuu * u,
+            wuu * v,
+            wvv * u,
+            wvv * v,
+            w * d2,
+            wu * d2,
+            wv * d2,
+        ),
+        axis=1,
+    )
+
+
+def solve_moments(
+    points: np.ndarray, moments: np.ndarray, anchor: np.ndarray
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    WLS-Lösung eines Problems aus akkumulierten Momenten
+
+    Die Position folgt in O(1) aus den Momentsummen: die Normalgleichungen
+    werden für den Schwerpunkt als Bezugspunkt aufgestellt, wie in
+    multilaterate. Nur die Fehleranalyse läuft vektorisiert über die Punkte.
+
+    Args:
+        points: aktuelle Punkte (n, 3) mit n >= 4
+        moments: Summe von point_moments über diese Punkte (MOMENT_COUNT,)
+        anchor: Anker der Momente (2,) als (lat, lng)
+
+    Returns:
+        Ergebnis im Format von solve_batch mit B = 1 oder None, wenn die
+        Normalgleichungen schlecht konditioniert sind oder die Ausdehnung
+        die äquirektangulare Näherung übersteigt; dann ist die
+        vollständige Lösung per solve_batch zu verwenden
+    """
+    count, su, sv, w, wu, wv, wuu, wuv, wvv, wuuu, wuuv, wuvv, wvvv, wd2, wud2, wvd2 = (
+        moments.tolist()
+    )
+    cu, cv = su / count, sv / count
+    center_lat = anchor[0] + cv
+    sx = METERS_PER_DEGREE * math.cos(math.radians(center_lat))
+    sy = METERS_PER_DEGREE
+
+    # Gewichtete Momente relativ zum Schwerpunkt (X = u - cu, Y = v - cv)
+    xx = wuu - 2 * cu * wu + cu * cu * w
+    xy = wuv - cv * wu - cu * wv + cu * cv * w
+    yy = wvv - 2 * cv * wv + cv * cv * w
+    xxx = wuuu - 3 * cu * wuu + 3 * cu * cu * wu - cu**3 * w
+    xxy = wuuv - cv * wuu - 2 * cu * wuv + 2 * cu * cv * wu + cu * cu * wv - cu * cu * cv * w
+    xyy = wuvv - cu * wvv - 2 * cv * wuv + 2 * cu * cv * wv + cv * cv * wu - cu * cv * cv * w
+    yyy = wvvv - 3 * cv * wvv + 3 * cv * cv * wv - cv**3 * w
+    xd2 = wud2 - cu * wd2
+    yd2 = wvd2 - cv * wd2
+
+    # AᵀWA und AᵀWb mit Zeilen 2 (x, y) und b = x² + y² - d²
+    n00, n01, n11 = 4 * sx * sx * xx, 4 * sx * sy * xy, 4 * sy * sy * yy
+    r0 = 2 * sx * (sx * sx * xxx + sy * sy * xyy - xd2)
+    r1 = 2 * sy * (sx * sx * xxy + sy * sy * yyy - yd2)
+
+    # Normalgleichungen quadrieren die Kondition von R
+    if not _well_conditioned(n00, n01, n01, n11):
+        return None
+
+    det = n00 * n11 - n01 * n01
+    position = np.array([[(n11 * r0 - n01 * r1) / det, (n00 * r1 - n01 * r0) / det]])
+    valid = np.ones(1, dtype=bool)
+
+    center = np.array([[center_lat, anchor[1] + cu]])
+    batch = points[None]
+    xy_points, frame = projection.project(batch, projection.EQUIRECTANGULAR, center)
+    d = batch[..., 2]
+    if projection.equirectangular_error(xy_points, d, center)[0] > projection.PROJECTION_TOLERANCE:
+        return None
+    b = np.einsum("bni,bni->bn", xy_points, xy_points) - d * d
+
+    result = _multilateration_result(position, valid, xy_points, d, b, _range_weights(d))
+    result["algorithm"] = WLS
+    result["lat"], result["lng"] = projection.unproject(result["x"], result["y"], frame)
+    result["center"] = center
+    result["enu"] = frame.enu
+    return result
+
+
+def method_name(algorithm: str, n: int) -> str:
+    """Anzeigename des Verfahrens für n Punkte"""
+    if algorithm == TRILATERATION:
+        return "Exakte Trilateration (3 Punkte)"
+    if algorithm == LM:
+        return f"Levenberg-Marquardt ({n} Punkte)"
+    if algorithm == RANSAC:
+        return f"RANSAC + Levenberg-Marquardt ({n} Punkte)"
+    if algorithm == REGION:
+        return f"Regionsgitter + Levenberg-Marquardt ({n} Punkte)"
+    return f"Weighted Least Squares ({n} Punkte)"
+
+
+def points_to_array(points: List[Dict]) -> np.ndarray:
+    """
+    Konvertiert eine Liste von Punkt-Dictionaries in ein (n, 3)-Array
+    mit den Spalten lat, lng, distance
+    """
+    return np.array(
+        [(p["lat"], p["lng"], p["distance"]) for p in points], dtype=np.float64
+    ).reshape(-1, 3)
+
+
+def as_point_array(
+    points: np.ndarray, lng: Optional[np.ndarray] = None, distance: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Normalisiert die unterstützten Eingabeformate auf ein (n, 3)-Array
+
+    Akzeptiert ein (n, 3)-Array, ein strukturiertes Array mit den
+    Feldern lat, lng, distance oder drei 1D-Arrays.
+    """
+    if lng is not None:
+        return np.stack((points, lng, distance), axis=-1).astype(np.float64, copy=False)
+
+    points = np.asarray(points)
+    if points.dtype == POINT_DTYPE and points.flags.c_contiguous:
+        # Gleiche Speicheranordnung wie (n, 3) float64 - ohne Kopie
+        return points.view(np.float64).reshape(-1, 3)
+    if points.dtype.names:
+        points = recfunctions.structured_to_unstructured(
+            points[["lat", "lng", "distance"]], dtype=np.float64
+        )
+    return np.asarray(points, dtype=np.float64)
+
+
+def unpack(result: Dict[str, np.ndarray]) -> List[SolveResult]:
+    """
+    Zerlegt ein Batch-Ergebnis in einzelne SolveResult-Records
+
+    Skalare werden einmal pro Spalte konvertiert, Per-Punkt-Werte
+    bleiben Zeilen-Views auf die Batch-Arrays.
+    """
+    batch, n = result["distance_errors"].shape
+    algorithm = result["algorithm"]
+    method = method_name(algorithm, n)
+    columns = {
+        field: result[field].tolist() if field in result else [math.nan] * batch
+        for field in _SCALAR_FIELDS
+    }
+    columns.update(
+        (field, result[field].tolist()) for field in _ITERATION_FIELDS if field in result
+    )
+    columns["projection"] = np.where(
+        result["enu"], projection.ENU, projection.EQUIRECTANGULAR
+    ).tolist()
+    residuals = result.get("residuals")
+    weights = result.get("weights")
+
+    return [
+        SolveResult(
+            method=method,
+            algorithm=algorithm,
+            distance_errors=result["distance_errors"][k],
+            outlier_mask=result["outlier_mask"][k],
+            residuals=None if residuals is None else residuals[k],
+            weights=None if weights is None else weights[k],
+            **{field: column[k] for field, column in columns.items()},
+        )
+        for k in range(batch)
+    ]
+
+
+def solve(
+    points: np.ndarray,
+    lng: Optional[np.ndarray] = None,
+    distance: Optional[np.ndarray] = None,
+    method: str = WLS,
+    timer: Optional[Any] = None,
+    projection_mode: str = projection.AUTO,
+) -> SolveResult:
+    """
+    Löst ein einzelnes Triangulationsproblem
+
+    Args:
+        points: (n, 3)-Array mit lat, lng, distance, ein strukturiertes
+            Array mit POINT_DTYPE oder - zusammen mit lng und distance -
+            ein 1D-Array der Breitengrade
+        method: Verfahren, siehe METHODS
+        timer: optional ein metrics.StageTimer, siehe solve_batch
+        projection_mode: Projektion, siehe projection.PROJECTIONS
+
+    Returns:
+        SolveResult; bei kollinearen oder singulären Konfigurationen
+        ist 'valid' False
+    """
+    points = as_point_array(points, lng, distance)
+    if points.ndim != 2 or points.shape[0] < 3 or points.shape[1] != 3:
+        raise ValueError("Mindestens 3 Referenzpunkte erforderlich")
+
+    return unpack(solve_batch(points[None], method, timer, projection_mode))[0]
@@ -0,0 +1,27 @@
+"""
+Gemeinsame Einrichtung der Backend-Tests
+
+Läuft aus backend/ (wie in der CI: pytest). Datenbanken der Projekte und
+Jobs liegen in einem temporären Verzeichnis, bevor app importiert wird.
+"""
+
+import os
+import sys
+import tempfile
+
+_directory = tempfile.mkdtemp(prefix="triangulation-tests-")
+os.environ.setdefault("PROJECT_DB", os.path.join(_directory, "projects.sqlite"))
+os.environ.setdefault("JOB_DIR", os.path.join(_directory, "jobs"))
+os.environ.setdefault("SOLVE_WORKERS", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    from app import app, result_cache
+
+    result_cache.clear()
+    return app.test_client()
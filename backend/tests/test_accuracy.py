@@ -0,0 +1,110 @@
+"""
+Genauigkeit der Solver gegen die wahre Position
+
+Feste Seeds wie in benchmarks.suite; die Grenzen liegen mit Abstand
+über den gemessenen Fehlern, damit nur echte Verschlechterungen
+auffallen.
+"""
+
+import numpy as np
+import pytest
+
+import projection
+import region
+import solver
+from app import AdvancedTriangulationCalculator
+from benchmarks.bench_region import boxes, outside
+from benchmarks.common import scenario, position_error
+from cache import ResultCache
+
+COUNT = 200
+
+# (Geometrie, Methode, Punkte, Rauschen m, Ausreißeranteil, Grenze Mittel m, Grenze p95 m)
+CASES = [
+    ("uniform", solver.WLS, 8, 2.0, 0.0, 12.0, 45.0),
+    ("uniform", solver.LM, 8, 2.0, 0.0, 2.5, 4.5),
+    ("uniform", solver.RANSAC, 8, 2.0, 0.0, 2.5, 4.5),
+    ("ring", solver.WLS, 8, 2.0, 0.0, 2.5, 4.0),
+    ("ring", solver.LM, 8, 2.0, 0.0, 2.5, 4.0),
+    ("ring", solver.RANSAC, 8, 2.0, 0.0, 2.5, 4.0),
+    ("cluster", solver.LM, 8, 2.0, 0.0, 10.0, 25.0),
+    ("cluster", solver.RANSAC, 8, 2.0, 0.0, 10.0, 25.0),
+    ("uniform", solver.RANSAC, 8, 2.0, 0.15, 2.5, 5.0),
+    ("uniform", solver.WLS, 3, 2.0, 0.0, 20.0, 55.0),
+    ("uniform", solver.LM, 50, 5.0, 0.0, 2.5, 4.5),
+]
+
+
+def errors(points: np.ndarray, truth: np.ndarray, method: str) -> np.ndarray:
+    result = solver.solve_batch(points, method)
+    assert result["valid"].all()
+    return position_error(result["lat"], result["lng"], truth)
+
+
+@pytest.mark.parametrize("geometry, method, n, noise, outliers, mean, p95", CASES)
+def test_solver_accuracy(geometry, method, n, noise, outliers, mean, p95):
+    points, truth = scenario(COUNT, n, geometry, noise=noise, outliers=outliers)
+    error = errors(points, truth, method)
+    assert error.mean() < mean
+    assert np.percentile(error, 95) < p95
+
+
+def test_ransac_rejects_outliers():
+    points, truth = scenario(COUNT, 8, outliers=0.15)
+    ransac = errors(points, truth, solver.RANSAC)
+    assert np.median(ransac) * 20 < np.median(errors(points, truth, solver.WLS))
+    assert np.median(ransac) * 20 < np.median(errors(points, truth, solver.LM))
+
+
+@pytest.mark.parametrize("method", solver.METHODS)
+def test_calculate_position_matches_batch(method):
+    points, _ = scenario(5, 8, noise=2.0)
+    batch = solver.solve_batch(points, method)
+    for k, rows in enumerate(points.tolist()):
+        result = AdvancedTriangulationCalculator.calculate_position(
+            [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in rows], method
+        )
+        assert result["lat"] == pytest.approx(batch["lat"][k], abs=1e-9)
+        assert result["lng"] == pytest.approx(batch["lng"][k], abs=1e-9)
+
+
+@pytest.mark.parametrize(
+    "geometry, outliers, median, p95",
+    [
+        ("line", 0.0, 2.5, 6.0),
+        ("line", 0.2, 3.0, 8.0),
+        ("cluster", 0.2, 12.0, 40.0),
+        ("uniform", 0.2, 3.0, 6.0),
+    ],
+)
+def test_region_accuracy(geometry, outliers, median, p95):
+    count = 100
+    points, truth = scenario(count, 8, geometry=geometry, outliers=outliers, seed=8)
+    cache = ResultCache(count)
+    grids = [
+        region.region_grid(polygon, projection.EQUIRECTANGULAR, cache)
+        for polygon in boxes(truth, 1000.0)
+    ]
+    results = [region.solve_batch(points[k : k + 1], grid) for k, grid in enumerate(grids)]
+    lat = np.concatenate([result["lat"] for result in results])
+    lng = np.concatenate([result["lng"] for result in results])
+
+    misses = [outside(grid, lat[k : k + 1], lng[k : k + 1])[0] for k, grid in enumerate(grids)]
+    assert not any(misses)
+    error = position_error(lat, lng, truth)
+    assert np.median(error) < median
+    assert np.percentile(error, 95) < p95
+
+
+def test_region_resolves_line_ambiguity():
+    points, truth = scenario(100, 8, geometry="line", seed=8)
+    grids = [
+        region.RegionGrid(polygon, projection.EQUIRECTANGULAR) for polygon in boxes(truth, 1000.0)
+    ]
+    results = [region.solve_batch(points[k : k + 1], grid) for k, grid in enumerate(grids)]
+    constrained = position_error(
+        np.concatenate([result["lat"] for result in results]),
+        np.concatenate([result["lng"] for result in results]),
+        truth,
+    )
+    assert np.percentile(constrained, 95) * 10 < np.percentile(errors(points, truth, solver.LM), 95)
@@ -0,0 +1,40 @@
+"""
+Kartesische Dictionary-API (trilaterate_3_points, multilaterate_advanced)
+"""
+
+import pytest
+
+from app import AdvancedTriangulationCalculator
+
+# Punkte um (30, 40) in Metern mit exakten Entfernungen
+POINTS = [
+    {"x": 0.0, "y": 0.0, "d": 50.0},
+    {"x": 60.0, "y": 0.0, "d": 50.0},
+    {"x": 30.0, "y": 80.0, "d": 40.0},
+    {"x": 0.0, "y": 80.0, "d": 50.0},
+]
+
+
+def test_trilaterate_3_points():
+    result = AdvancedTriangulationCalculator.trilaterate_3_points(POINTS)
+    assert "error" not in result, result.get("error")
+    assert result["x"] == pytest.approx(30.0, abs=1e-9)
+    assert result["y"] == pytest.approx(40.0, abs=1e-9)
+    assert result["distance_errors"] == pytest.approx([0.0] * 3, abs=1e-9)
+
+
+def test_multilaterate_advanced():
+    # Der lineare Ansatz 2pᵢ·x = ‖pᵢ‖² - dᵢ² ist im Ursprung exakt
+    points = [{"x": point["x"] - 30.0, "y": point["y"] - 40.0, "d": point["d"]} for point in POINTS]
+    result = AdvancedTriangulationCalculator.multilaterate_advanced(points)
+    assert "error" not in result, result.get("error")
+    assert result["x"] == pytest.approx(0.0, abs=1e-6)
+    assert result["y"] == pytest.approx(0.0, abs=1e-6)
+    assert result["projection"] == "equirectangular"
+    assert len(result["distance_errors"]) == 4
+    assert result["max_error"] < 1e-6
+
+
+def test_degenerate_points_report_error():
+    points = [{"x": float(k), "y": 0.0, "d": 1.0} for k in range(3)]
+    assert "error" in AdvancedTriangulationCalculator.trilaterate_3_points(points)
@@ -0,0 +1,170 @@
+"""
+Entfernungs-Kernel und /api/distance-Endpunkte
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+import app as backend
+import geometry
+from geometry import haversine, vincenty
+
+
+def dms(degrees: float, minutes: float, seconds: float) -> float:
+    sign = -1 if degrees < 0 else 1
+    return sign * (abs(degrees) + minutes / 60 + seconds / 3600)
+
+
+# Referenzbeispiel von Vincenty (1975) auf WGS84: Flinders Peak -> Buninyong
+FLINDERS_PEAK = (dms(-37, 57, 3.72030), dms(144, 25, 29.52440))
+BUNINYONG = (dms(-37, 39, 10.15610), dms(143, 55, 35.38390))
+
+ORIGINS = [
+    {"lat": 52.52, "lng": 13.405},
+    {"lat": 48.137, "lng": 11.575},
+    {"lat": 53.551, "lng": 9.993},
+]
+DESTINATIONS = [{"lat": 50.110, "lng": 8.682}, {"lat": 51.339, "lng": 12.377}]
+
+
+def test_vincenty_reference():
+    distance = vincenty(*FLINDERS_PEAK, *BUNINYONG)
+    assert float(distance) == pytest.approx(54972.271, abs=1e-3)
+
+
+def test_vincenty_special_cases():
+    assert float(vincenty(10.0, 20.0, 10.0, 20.0)) == 0.0
+    # Äquator: Bogen auf der großen Halbachse
+    assert float(vincenty(0.0, 0.0, 0.0, 1.0)) == pytest.approx(
+        geometry.WGS84_A * np.radians(1.0), rel=1e-9
+    )
+    # Meridianbogen Pol zu Pol
+    assert float(vincenty(-90.0, 0.0, 90.0, 0.0)) == pytest.approx(20003931.4586, abs=1e-3)
+    # Nahezu antipodal: keine Konvergenz, Haversine als Rückfall
+    antipodal = float(vincenty(0.0, 0.0, 0.5, 179.7))
+    assert antipodal == pytest.approx(float(haversine(0.0, 0.0, 0.5, 179.7)), rel=0.005)
+
+
+def test_kernels_broadcast():
+    lat = np.array([52.52, 48.137])[:, None]
+    lng = np.array([13.405, 11.575])[:, None]
+    for kernel in (haversine, vincenty):
+        matrix = kernel(lat, lng, np.array([[50.110, 51.339]]), np.array([[8.682, 12.377]]))
+        assert matrix.shape == (2, 2)
+        assert float(matrix[0, 1]) == pytest.approx(float(kernel(52.52, 13.405, 51.339, 12.377)))
+    assert float(haversine(*FLINDERS_PEAK, *BUNINYONG)) == pytest.approx(54972.271, rel=0.005)
+
+
+def expected_matrix(mode: str) -> np.ndarray:
+    origins = np.array([(p["lat"], p["lng"]) for p in ORIGINS])
+    destinations = np.array([(p["lat"], p["lng"]) for p in DESTINATIONS])
+    return geometry.distances(
+        origins[:, None, 0],
+        origins[:, None, 1],
+        destinations[None, :, 0],
+        destinations[None, :, 1],
+        mode,
+    )
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Zwei Zeilen pro Block, damit gestreamte Formate mehrere Blöcke liefern
+    monkeypatch.setattr(backend, "DISTANCE_BLOCK_CELLS", 2 * len(DESTINATIONS))
+
+
+@pytest.mark.parametrize("mode", geometry.DISTANCE_MODES)
+def test_matrix_json(client, small_blocks, mode):
+    body = {"origins": ORIGINS, "destinations": DESTINATIONS, "mode": mode}
+    result = client.post("/api/distance/matrix", json=body).get_json()
+    assert (result["mode"], result["rows"], result["columns"]) == (mode, 3, 2)
+    np.testing.assert_allclose(result["distances"], expected_matrix(mode), rtol=1e-12)
+
+
+def test_matrix_ndjson(client, small_blocks):
+    body = {
+        "origins": ORIGINS,
+        "destinations": DESTINATIONS,
+        "mode": "vincenty",
+        "format": "ndjson",
+    }
+    response = client.post("/api/distance/matrix", json=body)
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["row"] for row in rows] == [0, 1, 2]
+    np.testing.assert_allclose([row["distances"] for row in rows], expected_matrix("vincenty"))
+
+
+@pytest.mark.parametrize(
+    "body, headers",
+    [({"format": "binary"}, {}), ({}, {"Accept": "application/octet-stream"})],
+)
+def test_matrix_binary(client, small_blocks, body, headers):
+    body = {"origins": ORIGINS, "destinations": DESTINATIONS, **body}
+    response = client.post("/api/distance/matrix", json=body, headers=headers)
+    assert response.headers["X-Matrix-Rows"] == "3"
+    assert response.headers["X-Matrix-Columns"] == "2"
+    matrix = np.frombuffer(response.data, dtype="<f8").reshape(3, 2)
+    np.testing.assert_array_equal(matrix, expected_matrix(geometry.HAVERSINE))
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"origins": [], "destinations": DESTINATIONS},
+        {"origins": [{"lat": 91, "lng": 0}], "destinations": DESTINATIONS},
+        {"origins": ORIGINS, "destinations": [{"lat": "x"}]},
+        {"origins": ORIGINS, "destinations": DESTINATIONS, "mode": "flach"},
+        {"origins": ORIGINS, "destinations": DESTINATIONS, "format": "csv"},
+    ],
+)
+def test_matrix_rejects_invalid_input(client, body):
+    response = client.post("/api/distance/matrix", json=body)
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_matrix_cell_limit(client, monkeypatch):
+    monkeypatch.setattr(backend, "MAX_DISTANCE_CELLS", 5)
+    response = client.post(
+        "/api/distance/matrix", json={"origins": ORIGINS, "destinations": DESTINATIONS}
+    )
+    assert response.status_code == 400
+
+
+def test_distance_batch(client):
+    pairs = [
+        {
+            "point1": {"lat": FLINDERS_PEAK[0], "lng": FLINDERS_PEAK[1]},
+            "point2": {"lat": BUNINYONG[0], "lng": BUNINYONG[1]},
+        },
+        {"point1": ORIGINS[0], "point2": DESTINATIONS[1]},
+    ]
+    result = client.post(
+        "/api/distance/batch", json={"pairs": pairs, "mode": "vincenty"}
+    ).get_json()
+    assert result["count"] == 2
+    assert result["distances"][0] == pytest.approx(54972.271, abs=1e-3)
+
+    response = client.post(
+        "/api/distance/batch", json={"pairs": pairs, "mode": "vincenty", "format": "binary"}
+    )
+    assert response.headers["X-Distance-Count"] == "2"
+    np.testing.assert_array_equal(np.frombuffer(response.data, dtype="<f8"), result["distances"])
+
+    response = client.post("/api/distance/batch", json={"pairs": pairs, "format": "ndjson"})
+    assert response.status_code == 400
+
+
+def test_single_distance(client):
+    body = {
+        "point1": {"lat": FLINDERS_PEAK[0], "lng": FLINDERS_PEAK[1]},
+        "point2": {"lat": BUNINYONG[0], "lng": BUNINYONG[1]},
+        "mode": "vincenty",
+    }
+    assert client.post("/api/distance", json=body).get_json()["distance"] == pytest.approx(
+        54972.271, abs=1e-3
+    )
+    assert client.post("/api/distance", json={**body, "mode": "flach"}).status_code == 400
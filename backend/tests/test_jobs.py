@@ -0,0 +1,96 @@
+"""
+Job-Warteschlange: Fehlerzählung und Fehler der Job-Threads
+"""
+
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+
+import jobs
+import solver
+from app import stream_blocks, stream_results
+from benchmarks.common import scenario, position_error
+from jobs import JobQueue
+
+POINTS = [
+    {"lat": 52.507413, "lng": 13.500669, "distance": 909.9},
+    {"lat": 52.507820, "lng": 13.487096, "distance": 640.9},
+    {"lat": 52.499839, "lng": 13.500229, "distance": 740.0},
+    {"lat": 52.501041, "lng": 13.491229, "distance": 165.8},
+]
+
+
+def test_failed_count_from_runner(tmp_path):
+    queue = JobQueue(str(tmp_path), stream_blocks, workers=0)
+    lines = [
+        json.dumps({"id": {"error": "nur ein Name"}, "points": POINTS}).encode(),
+        b"{kein json",
+        json.dumps(POINTS[:2]).encode(),
+        json.dumps({"id": "error", "points": POINTS}).encode(),
+    ]
+    job = queue.submit(lines, "wls")
+
+    assert queue.run_pending()
+    state = queue.get(job["job_id"])
+    assert state["status"] == jobs.COMPLETED
+    assert state["progress"]["done"] == 4
+    assert state["failed"] == 2
+
+    results = [json.loads(line) for line in queue.results(job["job_id"])]
+    assert ["error" in result for result in results] == [False, True, True, False]
+
+
+def test_worker_logs_errors(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    queue = JobQueue(str(tmp_path), stream_blocks, workers=0)
+    raised = threading.Event()
+
+    def run_pending():
+        if raised.is_set():
+            return False
+        raised.set()
+        raise OSError("database is locked")
+
+    queue.run_pending = run_pending
+    with caplog.at_level(logging.ERROR, logger="jobs"):
+        threading.Thread(target=queue._work, daemon=True).start()
+        deadline = time.time() + 5
+        while not caplog.records and time.time() < deadline:
+            time.sleep(0.01)
+
+    assert raised.is_set()
+    assert any(
+        record.exc_info and "database is locked" in str(record.exc_info[1])
+        for record in caplog.records
+    )
+
+
+def test_job_results_match_stream(tmp_path):
+    points, truth = scenario(50, 8, noise=2.0, outliers=0.1, seed=13)
+    lines = [
+        json.dumps(
+            {"id": k, "points": [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in rows]}
+        ).encode()
+        for k, rows in enumerate(points.tolist())
+    ]
+    queue = JobQueue(str(tmp_path), stream_blocks, workers=0)
+    job = queue.submit(lines, solver.RANSAC)
+    assert queue.run_pending()
+
+    state = queue.get(job["job_id"])
+    assert state["status"] == jobs.COMPLETED
+    assert state["failed"] == 0
+    results = [json.loads(line) for line in queue.results(job["job_id"])]
+    assert results == [
+        json.loads(line) for line in "".join(stream_results(lines, solver.RANSAC)).splitlines()
+    ]
+
+    error = position_error(
+        np.array([result["lat"] for result in results]),
+        np.array([result["lng"] for result in results]),
+        truth,
+    )
+    assert np.percentile(error, 95) < 5.0
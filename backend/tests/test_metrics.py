@@ -0,0 +1,102 @@
+"""
+Stufenmessung, Prometheus-Histogramme und Server-Timing
+"""
+
+import re
+
+import pytest
+
+import app as backend
+from metrics import DEFAULT_BUCKETS, Histogram, MetricsRegistry, StageTimer, point_bucket
+
+POINTS = [
+    {"lat": 52.507413, "lng": 13.500669, "distance": 909.9},
+    {"lat": 52.507820, "lng": 13.487096, "distance": 640.9},
+    {"lat": 52.499839, "lng": 13.500229, "distance": 740.0},
+    {"lat": 52.501041, "lng": 13.491229, "distance": 165.8},
+]
+
+
+@pytest.mark.parametrize(
+    "n, bucket",
+    [(None, "none"), (3, "3"), (4, "4-10"), (100, "11-100"), (1000, "101-1000"), (1001, ">1000")],
+)
+def test_point_bucket(n, bucket):
+    assert point_bucket(n) == bucket
+
+
+def test_histogram_is_cumulative():
+    histogram = Histogram("test_seconds", "Test", ("endpoint",))
+    for value in (0.00005, 0.002, 0.002, 10.0):
+        histogram.observe(value, ("a",))
+    lines = histogram.render()
+
+    assert lines[:2] == ["# HELP test_seconds Test", "# TYPE test_seconds histogram"]
+    buckets = [
+        int(line.rsplit(" ", 1)[1]) for line in lines if line.startswith("test_seconds_bucket")
+    ]
+    assert len(buckets) == len(DEFAULT_BUCKETS) + 1
+    assert buckets == sorted(buckets)
+    assert buckets[0] == 1 and buckets[-2] == 3 and buckets[-1] == 4
+    assert 'test_seconds_count{endpoint="a"} 4' in lines
+
+
+def test_label_values_are_escaped():
+    histogram = Histogram("test_seconds", "Test", ("endpoint",))
+    histogram.observe(0.1, ('a"b\\c',))
+    assert 'test_seconds_count{endpoint="a\\"b\\\\c"} 1' in histogram.render()
+
+
+def test_timer_adds_repeated_stages():
+    timer = StageTimer()
+    timer.add("solve", 0.001)
+    timer.add("solve", 0.002)
+    timer.label("wls", 8)
+    assert timer.server_timing(0.005) == "solve;dur=3.000, total;dur=5.000"
+
+    registry = MetricsRegistry()
+    registry.record("triangulate", timer, 0.005)
+    text = registry.render()
+    assert (
+        'triangulation_request_duration_seconds_count{endpoint="triangulate",algorithm="wls",points="4-10"} 1'
+        in text
+    )
+    assert 'stage="solve"' in text
+
+
+def test_server_timing_header(client):
+    response = client.post("/api/triangulate", json={"points": POINTS}, headers={"X-Timing": "1"})
+    assert response.status_code == 200
+    names = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    assert "solve" in names and names[-1] == "total"
+    assert all(
+        re.fullmatch(r"[a-z_]+;dur=\d+\.\d{3}", entry)
+        for entry in response.headers["Server-Timing"].split(", ")
+    )
+
+    assert "Server-Timing" not in client.post("/api/triangulate", json={"points": POINTS}).headers
+
+
+def test_metrics_endpoint(client, monkeypatch):
+    monkeypatch.setattr(backend, "METRICS_ENABLED", True)
+    monkeypatch.setattr(backend, "metrics", MetricsRegistry())
+    client.post("/api/triangulate", json={"points": POINTS, "method": "lm"})
+    client.get("/metrics")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    text = response.get_data(as_text=True)
+    assert re.search(
+        r'triangulation_request_duration_seconds_count\{endpoint="triangulate",'
+        r'algorithm="[^"]+",points="4-10"\} 1',
+        text,
+    )
+    assert 'endpoint="metrics_endpoint"' not in text
+
+
+def test_metrics_disabled(client, monkeypatch):
+    monkeypatch.setattr(backend, "METRICS_ENABLED", False)
+    assert client.get("/metrics").status_code == 404
+    response = client.post("/api/triangulate", json={"points": POINTS}, headers={"X-Timing": "1"})
+    assert "total;dur=" in response.headers["Server-Timing"]
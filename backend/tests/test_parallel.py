@@ -0,0 +1,121 @@
+"""
+Prozesspool: Reihenfolge, serieller Pfad und gleiche Ergebnisse wie seriell
+"""
+
+import json
+import operator
+import threading
+
+import numpy as np
+import pytest
+
+import app as backend
+import parallel
+import solver
+from benchmarks.common import scenario
+from parallel import SolvePool
+
+
+@pytest.fixture
+def pool():
+    pool = SolvePool(2, max_pending=3, preload=["app"])
+    yield pool
+    pool.shutdown()
+
+
+def test_serial_without_workers():
+    pool = SolvePool(1)
+    assert not pool.enabled
+    assert list(pool.imap(operator.mul, ((k, k) for k in range(5)))) == [0, 1, 4, 9, 16]
+    assert pool.stats()["started"] is False
+
+
+def test_imap_keeps_order(pool):
+    tasks = ((k, 3) for k in range(50))
+    assert list(pool.imap(pow, tasks)) == [k**3 for k in range(50)]
+    assert pool.stats()["started"] is True
+    assert pool.stats()["start_method"] != "fork"
+
+
+def test_serial_flag_skips_executor(pool):
+    assert list(pool.imap(operator.add, [(1, 2)], serial=True)) == [3]
+    assert pool.stats()["started"] is False
+
+
+def test_nested_pools_run_serially(monkeypatch):
+    monkeypatch.setattr(parallel, "_IN_WORKER", True)
+    assert not SolvePool(4).enabled
+
+
+def test_started_after_threads(pool):
+    # Wie im Worker: ein Thread hält eine Sperre, während der Pool startet
+    lock = threading.Lock()
+    lock.acquire()
+    waiting = threading.Thread(target=lock.acquire, daemon=True)
+    waiting.start()
+    try:
+        assert list(pool.imap(operator.neg, [(k,) for k in range(4)])) == [0, -1, -2, -3]
+    finally:
+        lock.release()
+
+
+def test_batch_matches_serial(pool, monkeypatch):
+    points, _ = scenario(60, 8, noise=2.0, outliers=0.1, seed=17)
+    point_sets = [
+        [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in rows]
+        for rows in points.tolist()
+    ]
+    serial = backend.AdvancedTriangulationCalculator.calculate_batch(point_sets, solver.RANSAC)
+
+    monkeypatch.setattr(backend, "solve_pool", pool)
+    monkeypatch.setattr(backend, "PARALLEL_MIN_SETS", 10)
+    monkeypatch.setattr(backend, "PARALLEL_CHUNK_SIZE", 7)
+    parallel_results = backend.AdvancedTriangulationCalculator.calculate_batch(
+        point_sets, solver.RANSAC
+    )
+    assert pool.stats()["started"] is True
+    assert parallel_results == serial
+
+
+def test_stream_matches_serial(pool, monkeypatch):
+    points, _ = scenario(20, 5, seed=19)
+    lines = [
+        json.dumps([{"lat": a, "lng": b, "distance": d} for a, b, d in rows])
+        for rows in points.tolist()
+    ]
+    lines.insert(5, "{kein json")
+    serial = "".join(backend.stream_results(lines, solver.LM, 3))
+
+    monkeypatch.setattr(backend, "solve_pool", pool)
+    assert "".join(backend.stream_results(lines, solver.LM, 3)) == serial
+    assert pool.stats()["started"] is True
+
+
+def test_packed_sets_match_serial(pool, monkeypatch):
+    points, _ = scenario(30, 6, seed=23)
+    serial = backend.solve_packed_sets(points, solver.WLS)
+
+    monkeypatch.setattr(backend, "solve_pool", pool)
+    monkeypatch.setattr(backend, "PARALLEL_MIN_SETS", 10)
+    monkeypatch.setattr(backend, "PARALLEL_CHUNK_SIZE", 4)
+    np.testing.assert_array_equal(backend.solve_packed_sets(points, solver.WLS), serial)
+
+
+def test_job_blocks_run_in_pool(pool, monkeypatch, tmp_path):
+    points, _ = scenario(5, 5, seed=29)
+    lines = [
+        json.dumps([{"lat": a, "lng": b, "distance": d} for a, b, d in rows]).encode()
+        for rows in points.tolist()
+    ]
+    serial = list(backend.stream_blocks(lines, solver.WLS, 10))
+    assert serial[0][1] == 0
+
+    monkeypatch.setattr(backend, "solve_pool", pool)
+    assert list(backend.stream_blocks(lines, solver.WLS, 10)) == serial
+    assert pool.stats()["started"] is False
+
+    queue = backend.JobQueue(str(tmp_path), backend.job_queue.runner, workers=0)
+    job = queue.submit(lines, solver.WLS)
+    assert queue.run_pending()
+    assert "".join(queue.results(job["job_id"])) == "".join(block for block, _ in serial)
+    assert pool.stats()["started"] is True
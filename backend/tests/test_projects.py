@@ -0,0 +1,90 @@
+"""
+Projektablage: Deltas und gespeicherte Lösungen
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import solver
+from benchmarks.common import scenario, position_error
+from projects import ProjectStore
+
+POINTS = [
+    {"lat": 52.5200, "lng": 13.4050, "distance": 500.0},
+    {"lat": 52.5300, "lng": 13.4200, "distance": 800.0},
+    {"lat": 52.5100, "lng": 13.3900, "distance": 1200.0},
+    {"lat": 52.5250, "lng": 13.3950, "distance": 650.0},
+]
+
+
+def counting_solver():
+    calls = []
+
+    def solve(points: np.ndarray, point_ids):
+        calls.append(list(point_ids))
+        return {"point_ids": list(point_ids), "count": len(points)}
+
+    return solve, calls
+
+
+def test_stored_solution_reused_without_change(tmp_path):
+    store = ProjectStore(os.path.join(tmp_path, "projects.sqlite"))
+    project = store.create("Test", points=POINTS)
+    solve, calls = counting_solver()
+
+    first = store.solve(project["project_id"], "wls", "auto", solve)
+    second = store.solve(project["project_id"], "wls", "auto", solve)
+
+    assert not first.stored and second.stored
+    assert second.body == first.body
+    assert len(calls) == 1
+
+
+def test_remove_and_readd_identical_point_solves_again(tmp_path):
+    store = ProjectStore(os.path.join(tmp_path, "projects.sqlite"))
+    project = store.create("Test", points=POINTS)
+    solve, calls = counting_solver()
+    store.solve(project["project_id"], "wls", "auto", solve)
+
+    # Gleiche Koordinaten, aber neue Punkt-ID 5
+    updated = store.update_points(project["project_id"], add=[POINTS[3]], update=[], remove=[4])
+    assert updated["added_ids"] == [5]
+
+    solution = store.solve(project["project_id"], "wls", "auto", solve)
+    assert not solution.stored
+    assert calls[-1] == [1, 2, 3, 5]
+    assert '"point_ids": [1, 2, 3, 5]' in solution.body
+
+
+def test_solve_endpoint_after_remove_and_readd(client):
+    project = client.post("/api/projects", json={"points": POINTS}).get_json()
+    url = f"/api/projects/{project['project_id']}"
+    assert client.post(url + "/solve", json={"method": "wls"}).get_json()["stored"] is False
+
+    response = client.patch(url + "/points", json={"remove": [4], "add": [POINTS[3]]})
+    assert response.status_code == 200
+
+    result = client.post(url + "/solve", json={"method": "wls"}).get_json()
+    assert result["stored"] is False
+    assert result["point_ids"] == [1, 2, 3, 5]
+
+
+def test_solve_endpoint_matches_triangulate(client):
+    points, truth = scenario(1, 20, noise=2.0, outliers=0.1, seed=11)
+    point_list = [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in points[0].tolist()]
+    project = client.post("/api/projects", json={"points": point_list}).get_json()
+
+    for method in solver.METHODS:
+        result = client.post(
+            f"/api/projects/{project['project_id']}/solve", json={"method": method}
+        ).get_json()
+        direct = client.post(
+            "/api/triangulate", json={"points": point_list, "method": method}
+        ).get_json()
+        assert result["lat"] == pytest.approx(direct["lat"], abs=1e-9)
+        assert result["lng"] == pytest.approx(direct["lng"], abs=1e-9)
+
+    error = position_error(np.array([result["lat"]]), np.array([result["lng"]]), truth)[0]
+    assert error < 5.0
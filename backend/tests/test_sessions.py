@@ -0,0 +1,64 @@
+"""
+Sitzungen: inkrementelle Momentsummen gegen vollständiges Lösen
+"""
+
+import numpy as np
+import pytest
+
+import sessions
+import solver
+from benchmarks.common import scenario, position_error
+from sessions import SessionStore, SolveSession
+
+
+def full_solve(points: np.ndarray) -> solver.SolveResult:
+    return solver.unpack(solver.solve_batch(points[None]))[0]
+
+
+def test_incremental_solve_matches_full_solve():
+    points, truth = scenario(1, 40, noise=2.0, seed=3)
+    points = points[0]
+    session = SolveSession("test")
+    assert session.solve() is None
+
+    ids = session.add(points[:20])
+    for k, point_id in enumerate(ids[:10]):
+        session.update(point_id, points[20 + k])
+    session.remove(ids[10:15])
+    session.add(points[30:])
+
+    expected = np.concatenate((points[20:30], points[15:20], points[30:]))
+    np.testing.assert_array_equal(session.points, expected)
+    result, full = session.solve(), full_solve(expected)
+    assert result.valid
+    assert result.lat == pytest.approx(full.lat, abs=1e-7)
+    assert result.lng == pytest.approx(full.lng, abs=1e-7)
+    assert position_error(np.array([result.lat]), np.array([result.lng]), truth)[0] < 5.0
+
+
+def test_downdates_stay_accurate(monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_REBUILD_INTERVAL", 16)
+    points, _ = scenario(1, 8, noise=2.0, seed=5)
+    points = points[0]
+    session = SolveSession("test")
+    ids = session.add(points)
+    rng = np.random.default_rng(5)
+    for _ in range(100):
+        point_id = ids[rng.integers(len(ids))]
+        changed = session.points[session.point_ids.index(point_id)].copy()
+        changed[2] += rng.normal(0, 1.0)
+        session.update(point_id, changed)
+
+    result, full = session.solve(), full_solve(session.points)
+    assert result.lat == pytest.approx(full.lat, abs=1e-7)
+    assert result.lng == pytest.approx(full.lng, abs=1e-7)
+
+
+def test_store_evicts_least_recently_used():
+    store = SessionStore(max_sessions=2)
+    first, second = store.create(), store.create()
+    assert store.get(first.session_id) is first
+    store.create()
+    assert store.get(second.session_id) is None
+    assert store.get(first.session_id) is first
+    assert store.stats()["evicted"] == 1
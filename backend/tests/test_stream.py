@@ -0,0 +1,108 @@
+"""
+NDJSON-Streaming und Kommandozeile
+"""
+
+import json
+
+import pytest
+
+import cli
+import solver
+from app import AdvancedTriangulationCalculator, stream_results
+from benchmarks.common import scenario
+
+
+def point_sets(count: int, seed: int = 21) -> list:
+    points, _ = scenario(count, 6, noise=2.0, seed=seed)
+    return [
+        [{"lat": lat, "lng": lng, "distance": d} for lat, lng, d in rows]
+        for rows in points.tolist()
+    ]
+
+
+def mixed_lines() -> list:
+    """Gültige Punktmengen mit eingestreuten fehlerhaften Zeilen"""
+    sets = point_sets(4)
+    return [
+        json.dumps(sets[0]),
+        "{kein json",
+        "",
+        json.dumps({"id": "b", "points": sets[1]}),
+        json.dumps(sets[2][:2]),
+        json.dumps({"points": "keine Liste"}),
+        "   ",
+        json.dumps({"id": 7, "points": sets[3]}),
+    ]
+
+
+def parse(text: str) -> list:
+    return [json.loads(line) for line in text.splitlines()]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_stream_with_malformed_lines(chunk_size):
+    lines = mixed_lines()
+    results = parse("".join(stream_results(lines, solver.LM, chunk_size)))
+
+    assert [result["line"] for result in results] == [1, 2, 4, 5, 6, 8]
+    assert ["error" in result for result in results] == [False, True, False, True, True, False]
+    assert results[1]["error"] == "Ungültiges JSON"
+    assert [result.get("id") for result in results] == [None, None, "b", None, None, 7]
+
+    sets = point_sets(4)
+    for result, points in ((results[0], sets[0]), (results[2], sets[1]), (results[5], sets[3])):
+        expected = AdvancedTriangulationCalculator.calculate_position(points, solver.LM)
+        assert result["lat"] == pytest.approx(expected["lat"], abs=1e-9)
+        assert result["lng"] == pytest.approx(expected["lng"], abs=1e-9)
+
+
+def test_stream_accepts_bytes():
+    lines = mixed_lines()
+    assert list(stream_results([line.encode() for line in lines], chunk_size=3)) == list(
+        stream_results(lines, chunk_size=3)
+    )
+
+
+def test_stream_empty_input():
+    assert list(stream_results([])) == []
+    assert list(stream_results(["", "  "])) == []
+
+
+def test_stream_endpoint(client):
+    body = "\n".join(mixed_lines()) + "\n"
+    response = client.post(
+        "/api/triangulate/stream?method=lm&chunk_size=2",
+        data=body,
+        content_type="application/x-ndjson",
+    )
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert parse(response.get_data(as_text=True)) == parse(
+        "".join(stream_results(mixed_lines(), solver.LM, 2))
+    )
+
+
+@pytest.mark.parametrize("query", ["method=unbekannt", "chunk_size=0"])
+def test_stream_endpoint_rejects_parameters(client, query):
+    response = client.post(
+        f"/api/triangulate/stream?{query}", data="[]\n", content_type="application/x-ndjson"
+    )
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_cli_matches_stream(tmp_path):
+    source, target = tmp_path / "eingabe.ndjson", tmp_path / "ausgabe.ndjson"
+    source.write_text("\n".join(mixed_lines()) + "\n", encoding="utf-8")
+
+    assert (
+        cli.main([str(source), "-o", str(target), "--method", "ransac", "--chunk-size", "3"]) == 0
+    )
+    assert parse(target.read_text(encoding="utf-8")) == parse(
+        "".join(stream_results(mixed_lines(), solver.RANSAC, 3))
+    )
+
+
+def test_cli_rejects_chunk_size(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main([str(tmp_path / "fehlt.ndjson"), "--chunk-size", "0"])
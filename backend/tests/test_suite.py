@@ -0,0 +1,58 @@
+"""
+Regressionsvergleich der Benchmark-Suite
+"""
+
+import copy
+
+import numpy as np
+
+from benchmarks import suite
+
+CASE = "accuracy/ransac/uniform/n=8/noise=2/outliers=0.15"
+
+
+def accuracy_report() -> dict:
+    bench = suite.Suite(quick=True, pattern=CASE)
+    suite.bench_accuracy(bench)
+    return {"schema": suite.SCHEMA_VERSION, "meta": {"quick": True}, "results": bench.results}
+
+
+def test_accuracy_is_deterministic():
+    first, second = accuracy_report(), accuracy_report()
+    assert list(first["results"]) == [CASE]
+    assert first["results"] == second["results"]
+    assert first["results"][CASE]["p95_m"]["value"] < 5.0
+    assert first["results"][CASE]["failure_rate"]["value"] == 0.0
+
+
+def test_compare_flags_regressions():
+    baseline = accuracy_report()
+    assert suite.compare(baseline, baseline, tolerance=0.1, accuracy_tolerance=0.05)
+
+    worse = copy.deepcopy(baseline)
+    worse["results"][CASE]["p95_m"]["value"] *= 1.5
+    assert not suite.compare(baseline, worse, tolerance=0.1, accuracy_tolerance=0.05)
+
+    better = copy.deepcopy(baseline)
+    better["results"][CASE]["mean_m"]["value"] /= 2
+    assert suite.compare(baseline, better, tolerance=0.1, accuracy_tolerance=0.05)
+
+    failed = copy.deepcopy(baseline)
+    failed["results"][CASE]["mean_m"]["value"] = np.nan
+    assert not suite.compare(baseline, failed, tolerance=0.1, accuracy_tolerance=0.05)
+
+
+def test_compare_timing_tolerance():
+    def report(value: float) -> dict:
+        return {
+            "schema": suite.SCHEMA_VERSION,
+            "meta": {"quick": True},
+            "results": {
+                "solver/lm": {
+                    "throughput": {"value": value, "unit": "1/s", "better": suite.HIGHER}
+                },
+            },
+        }
+
+    assert suite.compare(report(1000.0), report(950.0), tolerance=0.1, accuracy_tolerance=0.05)
+    assert not suite.compare(report(1000.0), report(800.0), tolerance=0.1, accuracy_tolerance=0.05)
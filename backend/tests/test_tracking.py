@@ -0,0 +1,168 @@
+"""
+Tracking: EKF-Updates, Sammel-Updates, Gate und RTS-Glättung
+"""
+
+import numpy as np
+import pytest
+
+import solver
+import tracking
+from benchmarks.bench_tracking import as_points, trajectories
+from benchmarks.common import position_error
+from tracking import TrackStore
+
+EPOCHS = 40
+
+
+def run_filter(store: TrackStore, points: np.ndarray) -> tuple:
+    """Verarbeitet Messsätze (K, T, n, 3) epochenweise als Sammel-Update"""
+    tracks = [store.create() for _ in range(len(points))]
+    states = []
+    for t in range(points.shape[1]):
+        results = store.update(
+            [(track.track_id, float(t), points[k, t]) for k, track in enumerate(tracks)]
+        )
+        assert not any("error" in result for result in results)
+        states.append(results)
+    return tracks, states
+
+
+def epoch_errors(states: list, truth: np.ndarray, t: int) -> np.ndarray:
+    lat = np.array([result["lat"] for result in states[t]])
+    lng = np.array([result["lng"] for result in states[t]])
+    return position_error(lat, lng, truth[:, t])
+
+
+def test_filter_beats_single_epoch_solutions():
+    points, truth = trajectories(20, EPOCHS, seed=1)
+    _, states = run_filter(TrackStore(), points)
+
+    filtered = np.concatenate([epoch_errors(states, truth, t) for t in range(10, EPOCHS)])
+    single = solver.solve_batch(points[:, 10:].reshape(-1, 4, 3), solver.LM)
+    single_error = position_error(single["lat"], single["lng"], truth[:, 10:].reshape(-1, 2))
+    assert np.median(filtered) < np.median(single_error)
+    assert np.percentile(filtered, 95) < 5.0
+
+
+def test_filter_estimates_velocity():
+    points, truth = trajectories(10, EPOCHS, seed=2)
+    _, states = run_filter(TrackStore(), points)
+
+    east = (
+        (truth[:, -1, 1] - truth[:, -2, 1])
+        * solver.METERS_PER_DEGREE
+        * np.cos(np.radians(truth[:, -1, 0]))
+    )
+    north = (truth[:, -1, 0] - truth[:, -2, 0]) * solver.METERS_PER_DEGREE
+    estimated = np.array([[r["velocity"]["east"], r["velocity"]["north"]] for r in states[-1]])
+    np.testing.assert_allclose(estimated, np.stack((east, north), axis=1), atol=1.5)
+
+
+def test_batch_update_matches_single_updates():
+    points, _ = trajectories(3, 10, seed=3)
+    _, batch_states = run_filter(TrackStore(), points)
+
+    for k in range(3):
+        _, single_states = run_filter(TrackStore(), points[k : k + 1])
+        for t in range(10):
+            assert single_states[t][0]["lat"] == pytest.approx(batch_states[t][k]["lat"], abs=1e-12)
+            assert single_states[t][0]["lng"] == pytest.approx(batch_states[t][k]["lng"], abs=1e-12)
+
+
+def test_gate_rejects_outlier_and_accepts_partial_sets():
+    points, truth = trajectories(1, 12, seed=4)
+    store = TrackStore()
+    track = store.create()
+    for t in range(10):
+        store.update([(track.track_id, float(t), points[0, t])])
+
+    corrupted = points[0, 10].copy()
+    corrupted[0, 2] += 500.0
+    state = store.update([(track.track_id, 10.0, corrupted)])[0]
+    assert state["rejected_measurements"] == 1
+    assert (
+        position_error(np.array([state["lat"]]), np.array([state["lng"]]), truth[0, 10:11])[0] < 10
+    )
+
+    state = store.update([(track.track_id, 11.0, points[0, 11, :2])])[0]
+    assert "error" not in state and state["updates"] == 12
+
+
+def test_update_errors():
+    points, _ = trajectories(1, 2, seed=5)
+    store = TrackStore()
+    track = store.create()
+    assert "error" in store.update([(track.track_id, 0.0, points[0, 0, :2])])[0]
+    assert "error" not in store.update([(track.track_id, 5.0, points[0, 0])])[0]
+    assert "error" in store.update([(track.track_id, 4.0, points[0, 1])])[0]
+    assert "error" in store.update([("unbekannt", 6.0, points[0, 1])])[0]
+
+
+def test_smoother_beats_filter():
+    points, truth = trajectories(1, EPOCHS, seed=6)
+    timestamps = np.arange(EPOCHS, dtype=float)
+    mask = np.ones(points.shape[1:3], dtype=bool)
+    result = tracking.smooth(timestamps, points[0], mask)
+
+    smoothed = position_error(result["lat"], result["lng"], truth[0])
+    filtered = position_error(result["filtered_lat"], result["filtered_lng"], truth[0])
+    assert smoothed.mean() < filtered.mean()
+    assert np.percentile(smoothed, 95) < 3.0
+    assert np.all(result["std"] > 0) and result["std"][EPOCHS // 2, 0] < result["std"][0, 0]
+
+    _, states = run_filter(TrackStore(), points)
+    np.testing.assert_allclose(result["filtered_lat"][-1], states[-1][0]["lat"], atol=1e-9)
+
+
+def test_smoother_requires_start_position():
+    points, _ = trajectories(1, 3, seed=7)
+    points[0, 0, :, :2] = points[0, 0, 0, :2]
+    with pytest.raises(ValueError):
+        tracking.smooth(np.arange(3.0), points[0], np.ones((3, 4), dtype=bool))
+
+
+def test_track_endpoints(client):
+    points, _ = trajectories(1, 3, seed=8)
+    measurement = {"timestamp": 0, "points": as_points(points[0, 0])}
+    track = client.post("/api/tracks", json={"measurement": measurement}).get_json()
+    assert track["initialized"]
+    url = f"/api/tracks/{track['track_id']}"
+
+    state = client.post(
+        url + "/measurements", json={"timestamp": 1, "points": as_points(points[0, 1])}
+    )
+    assert state.status_code == 200 and state.get_json()["updates"] == 2
+
+    batch = client.post(
+        "/api/tracks/measurements",
+        json={
+            "updates": [
+                {"track_id": track["track_id"], "timestamp": 2, "points": as_points(points[0, 2])},
+                {"track_id": "unbekannt", "timestamp": 2, "points": as_points(points[0, 2])},
+            ]
+        },
+    ).get_json()
+    assert batch["count"] == 2 and batch["failed"] == 1
+
+    assert (
+        client.post(
+            url + "/measurements", json={"timestamp": 1, "points": as_points(points[0, 1])}
+        ).status_code
+        == 400
+    )
+    assert client.delete(url).status_code == 200
+    assert client.get(url).status_code == 404
+    assert client.post("/api/tracks", json={"range_sigma": True}).status_code == 400
+
+
+def test_smooth_endpoint(client):
+    points, truth = trajectories(1, 10, seed=9)
+    measurements = [{"timestamp": t, "points": as_points(points[0, t])} for t in range(10)]
+    result = client.post("/api/tracks/smooth", json={"measurements": measurements}).get_json()
+    assert result["count"] == 10
+    lat = np.array([epoch["lat"] for epoch in result["epochs"]])
+    lng = np.array([epoch["lng"] for epoch in result["epochs"]])
+    assert np.percentile(position_error(lat, lng, truth[0]), 95) < 5.0
+
+    measurements[3]["timestamp"] = 1
+    assert client.post("/api/tracks/smooth", json={"measurements": measurements}).status_code == 400
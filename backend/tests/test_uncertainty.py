@@ -0,0 +1,46 @@
+"""
+Prüfung des 'uncertainty'-Parameters
+"""
+
+import pytest
+
+import uncertainty
+from app import parse_uncertainty
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"sigma": True},
+        {"sigma": False, "relative": 0.01},
+        {"relative": True},
+        {"mode": "monte_carlo", "samples": True},
+        {"mode": "monte_carlo", "samples": False},
+    ],
+)
+def test_rejects_booleans(options):
+    result, error = parse_uncertainty(options)
+    assert result is None
+    assert error
+
+
+def test_accepts_numbers():
+    result, error = parse_uncertainty(
+        {"mode": "monte_carlo", "sigma": 2, "relative": 0.01, "samples": 50}
+    )
+    assert error is None
+    assert result["mode"] == uncertainty.MONTE_CARLO
+    assert result["samples"] == 50
+    assert result["noise"].sigma == 2.0
+
+
+def test_endpoint_rejects_boolean_sigma(client):
+    points = [
+        {"lat": 52.507413, "lng": 13.500669, "distance": 909.9},
+        {"lat": 52.507820, "lng": 13.487096, "distance": 640.9},
+        {"lat": 52.499839, "lng": 13.500229, "distance": 740.0},
+    ]
+    response = client.post(
+        "/api/triangulate", json={"points": points, "uncertainty": {"sigma": True}}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,112 @@
+"""
+Geometrie-Kennzahlen und /api/points/validate
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+import app as backend
+import projection
+from benchmarks.common import scenario
+from geometry import analyze_geometry, diameter_pair, gdop, nearest_neighbors
+
+
+def brute_force_nearest(xy: np.ndarray) -> np.ndarray:
+    delta = xy[:, None, :] - xy[None, :, :]
+    distance = np.sqrt(np.einsum("ijk,ijk->ij", delta, delta))
+    np.fill_diagonal(distance, np.inf)
+    return distance.min(axis=1)
+
+
+@pytest.mark.parametrize("geometry", ["uniform", "cluster", "line"])
+def test_nearest_neighbors_match_brute_force(geometry):
+    rng = np.random.default_rng(3)
+    xy = rng.normal(0, 1000, (400, 2))
+    if geometry == "cluster":
+        xy[:300] = rng.normal(0, 1, (300, 2))
+    elif geometry == "line":
+        xy[:, 1] = xy[:, 0] * 0.001
+    xy[10] = xy[20]
+
+    distance, index = nearest_neighbors(xy)
+    np.testing.assert_allclose(distance, brute_force_nearest(xy), rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(np.linalg.norm(xy[index] - xy, axis=1), distance, atol=1e-9)
+    assert distance[10] == 0 and index[10] == 20 and index[20] == 10
+
+
+def test_nearest_neighbors_single_position():
+    distance, index = nearest_neighbors(np.zeros((3, 2)))
+    assert np.all(distance == 0)
+    assert sorted(index.tolist()) == [0, 1, 2]
+
+
+def test_diameter_pair_bound():
+    xy = np.random.default_rng(5).normal(0, 100, (500, 2))
+    i, j = diameter_pair(xy)
+    delta = xy[:, None, :] - xy[None, :, :]
+    exact = np.sqrt(np.einsum("ijk,ijk->ij", delta, delta).max())
+    assert np.linalg.norm(xy[i] - xy[j]) >= exact * math.cos(math.pi / 32)
+
+
+@pytest.mark.parametrize("n", [3, 4, 8])
+def test_gdop_of_regular_polygon(n):
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    xy = 500 * np.stack((np.cos(angles), np.sin(angles)), axis=1)
+    assert gdop(xy, np.zeros(2)) == pytest.approx(math.sqrt(4 / n))
+    assert gdop(np.array([[0.0, 0.0], [1.0, 0.0], [2.0, 0.0]]), np.array([5.0, 0.0])) == math.inf
+
+
+def test_analyze_geometry():
+    points, _ = scenario(1, 12, geometry="ring", seed=2)
+    points = points[0]
+    points[5, :2] = points[3, :2] + 1e-7
+
+    report = analyze_geometry(points)
+    assert report["near_duplicates"] == [[3, 5]]
+    assert report["min_spacing_m"] < 1.0
+    assert report["max_spacing_m"] == pytest.approx(2000.0, rel=0.01)
+    assert report["gdop"] == pytest.approx(math.sqrt(4 / 12), rel=0.2)
+    assert report["projection"] == projection.EQUIRECTANGULAR
+
+
+def test_analyze_geometry_uses_projection():
+    points, _ = scenario(1, 8, seed=4)
+    auto = analyze_geometry(points[0])
+    enu = analyze_geometry(points[0], projection.ENU)
+    assert enu["projection"] == projection.ENU
+    assert enu["gdop"] == pytest.approx(auto["gdop"], rel=1e-3)
+
+
+def point_list(points: np.ndarray) -> list:
+    return [
+        {"id": f"P{k}", "lat": lat, "lng": lng, "distance": d}
+        for k, (lat, lng, d) in enumerate(points.tolist())
+    ]
+
+
+def test_validate_endpoint_reports_duplicates(client):
+    points, _ = scenario(1, 6, geometry="ring", seed=6)
+    points = point_list(points[0])
+    points.append({**points[2], "id": "Kopie"})
+
+    result = client.post("/api/points/validate", json={"points": points}).get_json()
+    assert not result["valid"]
+    assert result["geometry"]["near_duplicates"] == [["P2", "Kopie"]]
+    assert result["geometry"]["near_duplicate_count"] == 1
+    assert any("nahezu identisch" in warning for warning in result["warnings"])
+
+
+def test_validate_endpoint_warns_about_clusters(client):
+    points, _ = scenario(1, 20, geometry="cluster", radius=5000.0, seed=7)
+    result = client.post("/api/points/validate", json={"points": point_list(points[0])}).get_json()
+    assert result["geometry"]["clustering_index"] is not None
+    assert result["geometry"]["gdop"] > 1
+
+
+def test_validate_endpoint_uses_configured_projection(client, monkeypatch):
+    points, _ = scenario(1, 8, seed=8)
+    monkeypatch.setattr(backend, "PROJECTION", projection.ENU)
+    result = client.post("/api/points/validate", json={"points": point_list(points[0])}).get_json()
+    assert result["geometry"]["projection"] == projection.ENU
@@ -0,0 +1,74 @@
+"""
+Antwortformate von /api/triangulate
+"""
+
+import numpy as np
+
+import wire
+
+POINTS = [
+    {"lat": 52.507413, "lng": 13.500669, "distance": 909.9},
+    {"lat": 52.507820, "lng": 13.487096, "distance": 640.9},
+    {"lat": 52.499839, "lng": 13.500229, "distance": 740.0},
+    {"lat": 52.501041, "lng": 13.491229, "distance": 165.8},
+]
+
+
+def counting_table(monkeypatch):
+    calls = []
+    build = wire.results_table
+
+    def results_table(results):
+        calls.append(len(results))
+        return build(results)
+
+    monkeypatch.setattr(wire, "results_table", results_table)
+    return calls
+
+
+def test_json_response_builds_no_table(client, monkeypatch):
+    calls = counting_table(monkeypatch)
+    response = client.post("/api/triangulate", json={"points": POINTS})
+    assert response.status_code == 200
+    assert "lat" in response.get_json()
+    assert calls == []
+
+
+def test_packed_response(client, monkeypatch):
+    calls = counting_table(monkeypatch)
+    response = client.post(
+        "/api/triangulate",
+        json={"points": POINTS},
+        headers={"Accept": wire.CONTENT_TYPES[wire.PACKED]},
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Result-Count"] == "1"
+    table = np.frombuffer(response.data, dtype=wire.PACKED_DTYPE).reshape(
+        1, len(wire.PACKED_FIELDS)
+    )
+    assert table[0, wire.PACKED_FIELDS.index("valid")] == 1
+    assert calls == [1]
+
+
+def test_msgpack_round_trip(client):
+    packed = np.array([(p["lat"], p["lng"], p["distance"]) for p in POINTS], dtype="<f8")
+    expected = client.post("/api/triangulate", json={"points": POINTS}).get_json()
+
+    for points in (POINTS, packed.tobytes()):
+        response = client.post(
+            "/api/triangulate",
+            data=wire.encode({"points": points}),
+            content_type=wire.CONTENT_TYPES[wire.MSGPACK],
+            headers={"Accept": wire.CONTENT_TYPES[wire.MSGPACK]},
+        )
+        assert response.status_code == 200
+        assert response.mimetype == wire.CONTENT_TYPES[wire.MSGPACK]
+        result = wire.decode(response.data)
+        assert result["lat"] == expected["lat"] and result["lng"] == expected["lng"]
+
+
+def test_invalid_msgpack(client):
+    response = client.post(
+        "/api/triangulate", data=b"\xc1", content_type=wire.CONTENT_TYPES[wire.MSGPACK]
+    )
+    assert response.status_code == 400
@@ -0,0 +1,481 @@
+"""
+Tracking bewegter Ziele über Zeitreihen von Entfernungsmessungen
+
+Jeder Track hält einen Zustand [x, y, vx, vy] (Meter, m/s) mit Kovarianz
+in der lokalen ENU-Ebene um seinen Anker. Ein neuer Messsatz kostet eine
+Vorhersage mit konstantem Geschwindigkeitsmodell und ein iteriertes
+EKF-Update in Informationsform - unabhängig davon, wie viele Messungen
+der Track schon gesehen hat (O(1) pro Update). Der Messsatz darf auch
+weniger als drei Entfernungen enthalten; nur die erste Messung eines
+Tracks braucht drei, da sie den Zustand über solver.solve_batch setzt.
+
+Alle Schritte rechnen auf Arrays (K, ...) über K Tracks gleichzeitig:
+Sammel-Updates vieler Tracks und der Offline-Glätter (Rauch-Tung-
+Striebel) verwenden dieselben Kernel. Entfernt sich ein Track weiter als
+TRACK_REANCHOR_DISTANCE von seinem Anker, wird der Anker nachgeführt.
+"""
+
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+import projection
+import solver
+
+TRACK_RANGE_SIGMA = 2.0  # Standardabweichung der Entfernungen in Metern
+TRACK_ACCELERATION_NOISE = 1.0  # Beschleunigungsrauschen in m/s²
+TRACK_INITIAL_SPEED = 10.0  # Standardabweichung der Startgeschwindigkeit in m/s
+TRACK_GATE = 5.0  # Innovationen über so vielen σ werden verworfen
+TRACK_RESET_GAP = 60.0  # Nach so vielen Sekunden ohne Messung neu initialisieren
+TRACK_REANCHOR_DISTANCE = 10000.0
+EKF_ITERATIONS = 3
+
+
+def transition(dt: np.ndarray, acceleration_noise: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Übergangsmatrizen F und Prozessrauschen Q (K, 4, 4) des konstanten
+    Geschwindigkeitsmodells mit weißem Beschleunigungsrauschen
+    """
+    count = len(dt)
+    F = np.broadcast_to(np.eye(4), (count, 4, 4)).copy()
+    F[:, 0, 2] = F[:, 1, 3] = dt
+
+    q = acceleration_noise * acceleration_noise
+    Q = np.zeros((count, 4, 4))
+    Q[:, 0, 0] = Q[:, 1, 1] = q * dt**3 / 3
+    Q[:, 0, 2] = Q[:, 2, 0] = Q[:, 1, 3] = Q[:, 3, 1] = q * dt**2 / 2
+    Q[:, 2, 2] = Q[:, 3, 3] = q * dt
+    return F, Q
+
+
+def predict(
+    state: np.ndarray, cov: np.ndarray, dt: np.ndarray, acceleration_noise: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Vorhersage von Zuständen (K, 4) und Kovarianzen (K, 4, 4) um dt (K,) Sekunden"""
+    F, Q = transition(dt, acceleration_noise)
+    state = np.einsum("kij,kj->ki", F, state)
+    cov = np.einsum("kij,kjl,kml->kim", F, cov, F) + Q
+    return state, cov
+
+
+def update(
+    state: np.ndarray,
+    cov: np.ndarray,
+    xy: np.ndarray,
+    distance: np.ndarray,
+    mask: np.ndarray,
+    sigma: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Iteriertes EKF-Update mit Entfernungen zu Referenzpunkten
+
+    Args:
+        state, cov: Vorhersage (K, 4) und (K, 4, 4)
+        xy: Referenzpunkte (K, n, 2) in der Ebene des Tracks
+        distance: gemessene Entfernungen (K, n)
+        mask: gültige Einträge (K, n); Auffüllung bei ungleichem n
+        sigma: Standardabweichung der Entfernungen (K,)
+
+    Returns:
+        (state, cov, used): Zustände, Kovarianzen und die Maske der
+        Messungen, die das Innovations-Gate passiert haben
+    """
+    # Gate gegen die Vorhersage: |z - h(x)| ≤ TRACK_GATE · √(hPhᵀ + σ²)
+    offset = state[:, None, :2] - xy
+    ranges = np.sqrt(np.einsum("kni,kni->kn", offset, offset))
+    unit = offset / np.where(ranges > 0, ranges, 1.0)[..., None]
+    spread = np.einsum("kni,kij,knj->kn", unit, cov[:, :2, :2], unit) + (sigma * sigma)[:, None]
+    used = mask & (np.abs(distance - ranges) <= TRACK_GATE * np.sqrt(spread))
+    weights = np.where(used & (ranges > 0), 1 / (sigma * sigma)[:, None], 0.0)
+
+    # Informationsform: P⁺ = (P⁻¹ + HᵀWH)⁻¹, H nur auf der Position
+    information = np.linalg.inv(cov)
+    position = state
+    for _ in range(EKF_ITERATIONS):
+        offset = position[:, None, :2] - xy
+        ranges = np.sqrt(np.einsum("kni,kni->kn", offset, offset))
+        unit = offset / np.where(ranges > 0, ranges, 1.0)[..., None]
+
+        posterior = information.copy()
+        posterior[:, :2, :2] += np.einsum("kn,kni,knj->kij", weights, unit, unit)
+        posterior = np.linalg.inv(posterior)
+
+        # x⁺ = x⁻ + P⁺ Hᵀ W (z - h(xᵢ) - H (x⁻ - xᵢ))
+        residual = distance - ranges - np.einsum("kni,ki->kn", unit, (state - position)[:, :2])
+        gradient = np.zeros_like(state)
+        gradient[:, :2] = np.einsum("kn,kni->ki", weights * residual, unit)
+        position = state + np.einsum("kij,kj->ki", posterior, gradient)
+
+    return position, posterior, used
+
+
+def initialize(
+    points: np.ndarray, sigma: float
+) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Startzustand aus einem Messsatz (n, 3) mit mindestens 3 Entfernungen
+
+    Returns:
+        (anchor, state, cov) mit dem Anker (2,) in der Lösung, oder None,
+        wenn die Messung keine Position bestimmt
+    """
+    result = solver.solve_batch(points[None], solver.LM, projection_mode=projection.ENU)
+    if not result["valid"][0]:
+        return None
+    anchor = np.array([result["lat"][0], result["lng"][0]])
+
+    xy, _ = projection.project(points[None], projection.ENU, center=anchor[None])
+    ranges = np.hypot(xy[0, :, 0], xy[0, :, 1])
+    unit = xy[0] / np.where(ranges > 0, ranges, 1.0)[:, None]
+    normal = unit.T @ unit / (sigma * sigma)
+    if np.linalg.cond(normal) > solver.MAX_CONDITION:
+        return None
+
+    cov = np.zeros((4, 4))
+    cov[:2, :2] = np.linalg.inv(normal)
+    cov[2, 2] = cov[3, 3] = TRACK_INITIAL_SPEED**2
+    return anchor, np.zeros(4), cov
+
+
+def geographic(anchor: np.ndarray, state: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Positionen (K,) als lat, lng zu Ankern (K, 2) und Zuständen (K, 4)"""
+    frame = projection.make_frame(anchor, np.ones(len(anchor), dtype=bool))
+    return projection.unproject(state[:, 0], state[:, 1], frame)
+
+
+def pad_measurements(
+    measurements: List[np.ndarray], fill: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Füllt Messsätze (nᵢ, 3) auf ein gemeinsames Array (K, n, 3) auf
+
+    Aufgefüllte Einträge liegen auf 'fill' (K, 2) mit Entfernung 0 und
+    sind in der Maske (K, n) False.
+    """
+    width = max((len(points) for points in measurements), default=0)
+    padded = np.zeros((len(measurements), max(width, 1), 3))
+    padded[..., :2] = fill[:, None, :]
+    mask = np.zeros(padded.shape[:2], dtype=bool)
+    for k, points in enumerate(measurements):
+        padded[k, : len(points)] = points
+        mask[k, : len(points)] = True
+    return padded, mask
+
+
+class Track:
+    """
+    Zustand eines Tracks
+
+    'state' ist None, bis eine Messung mit mindestens 3 Entfernungen den
+    Track initialisiert hat.
+    """
+
+    def __init__(self, track_id: str, range_sigma: float, acceleration_noise: float):
+        self.track_id = track_id
+        self.range_sigma = range_sigma
+        self.acceleration_noise = acceleration_noise
+        self.last_access = time.monotonic()
+        self.anchor: Optional[np.ndarray] = None
+        self.state: Optional[np.ndarray] = None
+        self.cov: Optional[np.ndarray] = None
+        self.timestamp: Optional[float] = None
+        self.lat = self.lng = None
+        self.updates = 0
+        self.rejected = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Zustand als JSON-fähiges Dictionary"""
+        snapshot: Dict[str, Any] = {
+            "track_id": self.track_id,
+            "initialized": self.state is not None,
+            "timestamp": self.timestamp,
+            "updates": self.updates,
+            "rejected_measurements": self.rejected,
+            "range_sigma": self.range_sigma,
+            "acceleration_noise": self.acceleration_noise,
+        }
+        if self.state is None:
+            return snapshot
+
+        vx, vy = float(self.state[2]), float(self.state[3])
+        snapshot.update(
+            {
+                "lat": self.lat,
+                "lng": self.lng,
+                "velocity": {"east": vx, "north": vy},
+                "speed": math.hypot(vx, vy),
+                "heading": math.degrees(math.atan2(vx, vy)) % 360,
+                "std_east": math.sqrt(self.cov[0, 0]),
+                "std_north": math.sqrt(self.cov[1, 1]),
+                "covariance": self.cov.tolist(),
+            }
+        )
+        return snapshot
+
+
+class TrackStore:
+    """
+    Begrenzter Speicher für Tracks mit Ablauf nach Inaktivität
+
+    Wie sessions.SessionStore: ist der Speicher voll, wird der am längsten
+    unbenutzte Track verdrängt. Updates laufen unter der Sperre des
+    Speichers, ein Sammel-Update rechnet alle Tracks in einem Batch.
+    """
+
+    def __init__(self, max_tracks: int = 10000, idle_timeout: float = 300.0):
+        """
+        Args:
+            max_tracks: maximale Anzahl gleichzeitiger Tracks
+            idle_timeout: Sekunden ohne Zugriff bis zum Verfall
+        """
+        self.max_tracks = max_tracks
+        self.idle_timeout = idle_timeout
+        self._tracks: "OrderedDict[str, Track]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.updates = 0
+
+    def create(
+        self,
+        range_sigma: float = TRACK_RANGE_SIGMA,
+        acceleration_noise: float = TRACK_ACCELERATION_NOISE,
+    ) -> Track:
+        """Legt einen neuen, noch nicht initialisierten Track an"""
+        track = Track(uuid.uuid4().hex, range_sigma, acceleration_noise)
+        with self._lock:
+            self._expire(track.last_access)
+            while len(self._tracks) >= self.max_tracks:
+                self._tracks.popitem(last=False)
+                self.evicted += 1
+            self._tracks[track.track_id] = track
+            self.created += 1
+        return track
+
+    def get(self, track_id: str) -> Optional[Track]:
+        """Liefert einen aktiven Track und erneuert seine Ablaufzeit"""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            return self._touch(track_id, now)
+
+    def delete(self, track_id: str) -> bool:
+        with self._lock:
+            return self._tracks.pop(track_id, None) is not None
+
+    def update(self, measurements: List[Tuple[str, float, np.ndarray]]) -> List[Dict[str, Any]]:
+        """
+        Verarbeitet Messsätze (track_id, timestamp, points (n, 3))
+
+        Jeder Track darf höchstens einmal vorkommen. Alle bereits
+        initialisierten Tracks werden gemeinsam vorhergesagt und
+        aktualisiert.
+
+        Returns:
+            Pro Messsatz der neue Zustand (Track.snapshot) oder {"error": ...}
+        """
+        now = time.monotonic()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(measurements)
+        batch: List[Tuple[int, Track, float, np.ndarray]] = []
+
+        with self._lock:
+            self._expire(now)
+            for i, (track_id, timestamp, points) in enumerate(measurements):
+                track = self._touch(track_id, now)
+                if track is None:
+                    results[i] = {
+                        "track_id": track_id,
+                        "error": "Track nicht gefunden oder abgelaufen",
+                    }
+                elif track.timestamp is not None and timestamp < track.timestamp:
+                    results[i] = {
+                        "track_id": track_id,
+                        "error": "Zeitstempel liegt vor der letzten Messung des Tracks",
+                    }
+                elif track.state is None or timestamp - track.timestamp > TRACK_RESET_GAP:
+                    results[i] = self._initialize(track, timestamp, points)
+                else:
+                    batch.append((i, track, timestamp, points))
+
+            if batch:
+                for (i, track, _, _), result in zip(batch, self._update_batch(batch)):
+                    results[i] = result
+            self.updates += len(measurements)
+
+        return results
+
+    def _initialize(self, track: Track, timestamp: float, points: np.ndarray) -> Dict[str, Any]:
+        if len(points) < 3:
+            return {
+                "track_id": track.track_id,
+                "error": "Die erste Messung eines Tracks benötigt mindestens 3 Entfernungen",
+            }
+        start = initialize(points, track.range_sigma)
+        if start is None:
+            return {
+                "track_id": track.track_id,
+                "error": "Die Messung bestimmt keine eindeutige Startposition",
+            }
+
+        track.anchor, track.state, track.cov = start
+        track.lat, track.lng = float(track.anchor[0]), float(track.anchor[1])
+        track.timestamp = timestamp
+        track.updates += 1
+        return track.snapshot()
+
+    def _update_batch(
+        self, batch: List[Tuple[int, Track, float, np.ndarray]]
+    ) -> List[Dict[str, Any]]:
+        """Vorhersage und Update initialisierter Tracks als ein Batch"""
+        tracks = [track for _, track, _, _ in batch]
+        anchor = np.array([track.anchor for track in tracks])
+        state = np.array([track.state for track in tracks])
+        cov = np.array([track.cov for track in tracks])
+        dt = np.array([timestamp - track.timestamp for _, track, timestamp, _ in batch])
+        acceleration = np.array([track.acceleration_noise for track in tracks])
+        sigma = np.array([track.range_sigma for track in tracks])
+
+        points, mask = pad_measurements([points for _, _, _, points in batch], anchor)
+        xy, _ = projection.project(points, projection.ENU, center=anchor)
+
+        state, cov = predict(state, cov, dt, acceleration)
+        state, cov, used = update(state, cov, xy, points[..., 2], mask, sigma)
+        lat, lng = geographic(anchor, state)
+
+        # Anker nachführen, bevor die Ebene merklich verzerrt
+        far = np.hypot(state[:, 0], state[:, 1]) > TRACK_REANCHOR_DISTANCE
+        if far.any():
+            anchor[far] = np.stack((lat[far], lng[far]), axis=1)
+            state[far, :2] = 0.0
+
+        rejected = (mask & ~used).sum(axis=1)
+        # Verwirft das Gate einen vollständigen Messsatz, hat der Filter das
+        # Ziel verloren: neu initialisieren statt weiter vorherzusagen
+        lost = (used.sum(axis=1) == 0) & (mask.sum(axis=1) >= 3)
+        results = []
+        for k, (_, track, timestamp, measurement) in enumerate(batch):
+            if lost[k]:
+                track.rejected += int(rejected[k])
+                result = self._initialize(track, timestamp, measurement)
+                if "error" not in result:
+                    results.append(result)
+                    continue
+            track.anchor, track.state, track.cov = anchor[k], state[k], cov[k]
+            track.lat, track.lng = float(lat[k]), float(lng[k])
+            track.timestamp = timestamp
+            track.updates += 1
+            track.rejected += int(rejected[k])
+            results.append(track.snapshot())
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Kennzahlen für /api/health"""
+        with self._lock:
+            return {
+                "active": len(self._tracks),
+                "max_tracks": self.max_tracks,
+                "idle_timeout_seconds": self.idle_timeout,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "updates": self.updates,
+            }
+
+    def _touch(self, track_id: str, now: float) -> Optional[Track]:
+        track = self._tracks.get(track_id)
+        if track is not None:
+            track.last_access = now
+            self._tracks.move_to_end(track_id)
+        return track
+
+    def _expire(self, now: float) -> None:
+        """Entfernt verfallene Tracks; die ältesten stehen vorne"""
+        while self._tracks:
+            track = next(iter(self._tracks.values()))
+            if now - track.last_access < self.idle_timeout:
+                break
+            self._tracks.popitem(last=False)
+            self.expired += 1
+
+
+def smooth(
+    timestamps: np.ndarray,
+    points: np.ndarray,
+    mask: np.ndarray,
+    range_sigma: float = TRACK_RANGE_SIGMA,
+    acceleration_noise: float = TRACK_ACCELERATION_NOISE,
+) -> Dict[str, np.ndarray]:
+    """
+    Rauch-Tung-Striebel-Glättung eines aufgezeichneten Tracks
+
+    Projektion und Rücktransformation laufen über alle Epochen in einem
+    Schritt; Vorwärtsfilter und Rückwärtslauf sind Rekursionen über die
+    Zeit mit konstantem Aufwand pro Epoche.
+
+    Args:
+        timestamps: aufsteigende Zeitstempel (T,) in Sekunden
+        points: Messsätze (T, n, 3), aufgefüllt wie pad_measurements
+        mask: gültige Messungen (T, n); Epoche 0 braucht mindestens 3
+
+    Returns:
+        'lat', 'lng' (T,), 'velocity' (T, 2) Ost/Nord in m/s,
+        'std' (T, 2) Ost/Nord in Metern, 'filtered_lat', 'filtered_lng' (T,)
+        und 'rejected' (T,) verworfene Messungen pro Epoche
+
+    Raises:
+        ValueError: wenn die erste Epoche keine Startposition bestimmt
+    """
+    epochs = len(timestamps)
+    start = initialize(points[0][mask[0]], range_sigma)
+    if start is None:
+        raise ValueError("Die erste Messung bestimmt keine eindeutige Startposition")
+    anchor, state, cov = start
+
+    xy, _ = projection.project(points.reshape(1, -1, 3), projection.ENU, center=anchor[None])
+    xy = xy.reshape(epochs, -1, 2)
+    sigma = np.array([range_sigma])
+    acceleration = np.full(epochs, acceleration_noise)
+    F, Q = transition(np.diff(timestamps, prepend=timestamps[0]), acceleration)
+
+    predicted = np.empty((epochs, 4))
+    predicted_cov = np.empty((epochs, 4, 4))
+    filtered = np.empty((epochs, 4))
+    filtered_cov = np.empty((epochs, 4, 4))
+    used = np.zeros(mask.shape, dtype=bool)
+    used[0] = mask[0]
+
+    predicted[0], predicted_cov[0] = filtered[0], filtered_cov[0] = state, cov
+    for t in range(1, epochs):
+        state = F[t] @ state
+        cov = F[t] @ cov @ F[t].T + Q[t]
+        predicted[t], predicted_cov[t] = state, cov
+        state, cov, step_used = update(
+            state[None], cov[None], xy[t : t + 1], points[t : t + 1, :, 2], mask[t : t + 1], sigma
+        )
+        state, cov, used[t] = state[0], cov[0], step_used[0]
+        filtered[t], filtered_cov[t] = state, cov
+
+    smoothed, smoothed_cov = filtered.copy(), filtered_cov.copy()
+    for t in range(epochs - 2, -1, -1):
+        gain = filtered_cov[t] @ F[t + 1].T @ np.linalg.inv(predicted_cov[t + 1])
+        smoothed[t] += gain @ (smoothed[t + 1] - predicted[t + 1])
+        smoothed_cov[t] += gain @ (smoothed_cov[t + 1] - predicted_cov[t + 1]) @ gain.T
+
+    anchors = np.broadcast_to(anchor, (epochs, 2))
+    lat, lng = geographic(anchors, smoothed)
+    filtered_lat, filtered_lng = geographic(anchors, filtered)
+    return {
+        "lat": lat,
+        "lng": lng,
+        "velocity": smoothed[:, 2:],
+        "std": np.sqrt(np.stack((smoothed_cov[:, 0, 0], smoothed_cov[:, 1, 1]), axis=1)),
+        "filtered_lat": filtered_lat,
+        "filtered_lng": filtered_lng,
+        "rejected": (mask & ~used).sum(axis=1),
+    }
@@ -0,0 +1,290 @@
+"""
+Positionsunsicherheit: Kovarianz, Fehlerellipse und Monte Carlo
+
+Analytisch: Kovarianz (JᵀWJ)⁻¹ der Entfernungsresiduen an der Lösung mit
+Einheitsvektoren J zu den Referenzpunkten und W = diag(1/σᵢ²) aus dem
+Rauschmodell. Sie gilt für eine effiziente Schätzung (Levenberg-Marquardt
+mit Gewichten 1/σᵢ²); die lineare WLS-Lösung ist zusätzlich systematisch
+verzerrt, die Radien sind dort nur für 'lm' und 'ransac' aussagekräftig.
+
+Monte Carlo: die Entfernungen werden für alle Stichproben gleichzeitig
+gestört und als ein Batch (S, n, 3) gelöst; es wird blockweise
+gerechnet, bis die Stichprobenzahl oder das Zeitbudget erreicht ist.
+
+Lokale Koordinaten: x nach Osten, y nach Norden in Metern; Orientierungen
+als Azimut der großen Halbachse in Grad von Norden im Uhrzeigersinn.
+"""
+
+import math
+import time
+import numpy as np
+from typing import Any, Dict, NamedTuple, Optional
+
+import projection
+import solver
+
+GAUSSIAN = "gaussian"
+UNIFORM = "uniform"
+LAPLACE = "laplace"
+DISTRIBUTIONS = (GAUSSIAN, UNIFORM, LAPLACE)
+
+ANALYTIC = "analytic"
+MONTE_CARLO = "monte_carlo"
+UNCERTAINTY_MODES = (ANALYTIC, MONTE_CARLO)
+
+CONFIDENCE_LEVEL = 0.95
+MONTE_CARLO_SAMPLES = 2000
+MONTE_CARLO_BLOCK = 1000  # Stichproben pro gebatchtem Solve
+MONTE_CARLO_SEED = 0
+
+# Stützstellen der Winkelintegration für den Konfidenzradius
+_RADIUS_ANGLES = 64
+_RADIUS_ITERATIONS = 40
+
+
+class NoiseModel(NamedTuple):
+    """Messrauschen der Entfernungen: σᵢ = sigma + relative · dᵢ"""
+
+    sigma: float = 2.0
+    relative: float = 0.0
+    distribution: str = GAUSSIAN
+
+    def sigmas(self, distance: np.ndarray) -> np.ndarray:
+        return self.sigma + self.relative * distance
+
+    def sample(self, rng: np.random.Generator, distance: np.ndarray, count: int) -> np.ndarray:
+        """Störungen (count, n) mit Standardabweichung σᵢ"""
+        sigma = self.sigmas(distance)
+        shape = (count, len(distance))
+        if self.distribution == UNIFORM:
+            return rng.uniform(-math.sqrt(3), math.sqrt(3), shape) * sigma
+        if self.distribution == LAPLACE:
+            return rng.laplace(0.0, 1 / math.sqrt(2), shape) * sigma
+        return rng.standard_normal(shape) * sigma
+
+
+def chi2_quantile_2d(probability: float) -> float:
+    """Quantil der χ²-Verteilung mit 2 Freiheitsgraden"""
+    return -2 * math.log(1 - probability)
+
+
+def covariance(
+    points: np.ndarray,
+    lat: np.ndarray,
+    lng: np.ndarray,
+    sigma: np.ndarray,
+    used: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Linearisierte Positionskovarianz (B, 2, 2) in m²
+
+    Args:
+        points: Array (B, n, 3) mit lat, lng, distance
+        lat, lng: Lösungen (B,)
+        sigma: Standardabweichung der Entfernungen (B, n)
+        used: optional Maske (B, n) der an der Lösung beteiligten Punkte
+
+    Returns:
+        Kovarianzen; NaN, wenn die Geometrie keine Position bestimmt
+    """
+    # Projektion um die Lösung: xy zeigt von der Lösung zu den Punkten
+    xy, _ = projection.project(points, center=np.stack((lat, lng), axis=1))
+    ranges = np.sqrt(np.einsum("bni,bni->bn", xy, xy))
+    unit = xy / np.where(ranges > 0, ranges, 1.0)[..., None]
+    weights = np.where(ranges > 0, 1 / (sigma * sigma), 0.0)
+    if used is not None:
+        weights = weights * used
+
+    normal = np.einsum("bn,bni,bnj->bij", weights, unit, unit)
+    a, b, c = normal[:, 0, 0], normal[:, 0, 1], normal[:, 1, 1]
+    det = a * c - b * b
+    singular = det <= (a + c) ** 2 * 1e-12
+    det = np.where(singular, np.nan, det)
+
+    result = np.empty(normal.shape)
+    result[:, 0, 0] = c / det
+    result[:, 1, 1] = a / det
+    result[:, 0, 1] = result[:, 1, 0] = -b / det
+    return result
+
+
+def confidence_radius(cov: np.ndarray, probability: float = CONFIDENCE_LEVEL) -> np.ndarray:
+    """
+    Radius (B,) des Kreises um die Lösung, der die Position mit der
+    gegebenen Wahrscheinlichkeit enthält (elliptische Normalverteilung)
+
+    P(r) = 1 / (2π√(λ₁λ₂)) ∫ (1 - exp(-r² q(θ) / 2)) / q(θ) dθ mit
+    q(θ) = cos²θ/λ₁ + sin²θ/λ₂, per Bisektion zwischen dem 1D- und dem
+    Kreisfall gelöst.
+    """
+    major, minor = _eigenvalues(cov)
+    minor = np.maximum(minor, major * 1e-12)
+    theta = np.linspace(0, 2 * np.pi, _RADIUS_ANGLES, endpoint=False)
+    q = (np.cos(theta) ** 2)[None, :] / major[:, None] + (np.sin(theta) ** 2)[None, :] / minor[
+        :, None
+    ]
+    norm = 1 / (_RADIUS_ANGLES * np.sqrt(major * minor))
+
+    chi2 = chi2_quantile_2d(probability)
+    # Untere Grenze: Normalverteilung in Richtung der großen Achse
+    low = np.sqrt(major) * math.sqrt(2) * _erfinv(probability)
+    high = np.sqrt(chi2 * (major + minor))
+    for _ in range(_RADIUS_ITERATIONS):
+        r = (low + high) / 2
+        inside = norm * ((1 - np.exp(-(r * r)[:, None] * q / 2)) / q).sum(axis=1)
+        below = inside < probability
+        low = np.where(below, r, low)
+        high = np.where(below, high, r)
+    return (low + high) / 2
+
+
+def _erfinv(y: float) -> float:
+    """Inverse Fehlerfunktion per Newton-Verfahren (Skalar)"""
+    x = 0.0
+    for _ in range(50):
+        step = (math.erf(x) - y) / (2 / math.sqrt(math.pi) * math.exp(-x * x))
+        x -= step
+        if abs(step) < 1e-15:
+            break
+    return x
+
+
+def _eigenvalues(cov: np.ndarray):
+    a, b, c = cov[:, 0, 0], cov[:, 0, 1], cov[:, 1, 1]
+    mean = (a + c) / 2
+    spread = np.sqrt(((a - c) / 2) ** 2 + b * b)
+    return mean + spread, np.maximum(mean - spread, 0.0)
+
+
+def error_ellipse(cov: np.ndarray, probability: float = CONFIDENCE_LEVEL) -> Dict[str, np.ndarray]:
+    """
+    Fehlerellipsen (B,) zu Kovarianzen (B, 2, 2)
+
+    Returns:
+        'semi_major', 'semi_minor' (1σ), 'semi_major_95', 'semi_minor_95'
+        (Ellipse mit Wahrscheinlichkeit 'probability'), 'orientation'
+        (Azimut der großen Halbachse in Grad) und 'radius_95'
+    """
+    major, minor = _eigenvalues(cov)
+    a, b, c = cov[:, 0, 0], cov[:, 0, 1], cov[:, 1, 1]
+    # Winkel der großen Achse zur x-Achse (Osten), als Azimut von Norden
+    angle = 0.5 * np.degrees(np.arctan2(2 * b, a - c))
+    scale = math.sqrt(chi2_quantile_2d(probability))
+    return {
+        "semi_major": np.sqrt(major),
+        "semi_minor": np.sqrt(minor),
+        "semi_major_95": scale * np.sqrt(major),
+        "semi_minor_95": scale * np.sqrt(minor),
+        "orientation": np.mod(90 - angle, 180),
+        "radius_95": confidence_radius(cov, probability),
+    }
+
+
+def _report(cov: np.ndarray, probability: float) -> Dict[str, Any]:
+    """Kovarianz und Ellipse eines Problems als JSON-fähiges Dictionary"""
+    if not np.isfinite(cov).all():
+        return {"error": "Geometrie bestimmt keine eindeutige Position"}
+    ellipse = {key: float(value[0]) for key, value in error_ellipse(cov[None], probability).items()}
+    return {
+        "covariance": cov.tolist(),
+        "std_east": math.sqrt(cov[0, 0]),
+        "std_north": math.sqrt(cov[1, 1]),
+        "ellipse": {
+            "semi_major": ellipse["semi_major"],
+            "semi_minor": ellipse["semi_minor"],
+            "semi_major_95": ellipse["semi_major_95"],
+            "semi_minor_95": ellipse["semi_minor_95"],
+            "orientation": ellipse["orientation"],
+        },
+        "radius_95": ellipse["radius_95"],
+    }
+
+
+def analytic(
+    points: np.ndarray,
+    lat: float,
+    lng: float,
+    noise: NoiseModel,
+    used: Optional[np.ndarray] = None,
+    probability: float = CONFIDENCE_LEVEL,
+) -> Dict[str, Any]:
+    """
+    Analytische Unsicherheit eines Problems (n, 3) an der Lösung lat/lng
+    """
+    cov = covariance(
+        points[None],
+        np.array([lat]),
+        np.array([lng]),
+        noise.sigmas(points[:, 2])[None],
+        None if used is None else used[None],
+    )[0]
+    report = _report(cov, probability)
+    report.update(mode=ANALYTIC, noise=noise._asdict())
+    return report
+
+
+def monte_carlo(
+    points: np.ndarray,
+    lat: float,
+    lng: float,
+    noise: NoiseModel,
+    method: str = solver.WLS,
+    samples: int = MONTE_CARLO_SAMPLES,
+    budget: Optional[float] = None,
+    seed: int = MONTE_CARLO_SEED,
+    projection_mode: str = projection.AUTO,
+    probability: float = CONFIDENCE_LEVEL,
+) -> Dict[str, Any]:
+    """
+    Monte-Carlo-Unsicherheit eines Problems (n, 3) um die Lösung lat/lng
+
+    Gestörte Entfernungen werden in Blöcken von MONTE_CARLO_BLOCK
+    Stichproben als ein Batch gelöst. Ist 'budget' (Sekunden) nach einem
+    Block überschritten, wird mit den bisherigen Stichproben ausgewertet.
+
+    Returns:
+        Kovarianz, Ellipse und 95 %-Radius der Stichproben (empirisch,
+        um die Lösung), dazu 'bias' (mittlere Abweichung Ost/Nord),
+        'samples', 'failed' und 'truncated'
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    scale = np.array(
+        [solver.METERS_PER_DEGREE * math.cos(math.radians(lat)), solver.METERS_PER_DEGREE]
+    )
+
+    offsets = []
+    drawn = failed = 0
+    truncated = False
+    while drawn < samples:
+        if budget is not None and drawn and time.perf_counter() - start > budget:
+            truncated = True
+            break
+        count = min(MONTE_CARLO_BLOCK, samples - drawn)
+        batch = np.repeat(points[None], count, axis=0)
+        batch[..., 2] = np.abs(batch[..., 2] + noise.sample(rng, points[:, 2], count))
+        result = solver.solve_batch(batch, method, projection_mode=projection_mode)
+
+        valid = result["valid"]
+        failed += int(count - valid.sum())
+        offsets.append(
+            np.stack((result["lng"][valid] - lng, result["lat"][valid] - lat), axis=1) * scale
+        )
+        drawn += count
+
+    offsets = np.concatenate(offsets)
+    report: Dict[str, Any] = {
+        "mode": MONTE_CARLO,
+        "noise": noise._asdict(),
+        "samples": drawn,
+        "failed": failed,
+        "truncated": truncated,
+    }
+    if len(offsets) < 3:
+        report["error"] = "Zu wenige gültige Stichproben"
+        return report
+
+    report.update(_report(np.cov(offsets, rowvar=False), probability))
+    report["radius_95"] = float(np.quantile(np.hypot(offsets[:, 0], offsets[:, 1]), probability))
+    report["bias"] = offsets.mean(axis=0).tolist()
+    return report
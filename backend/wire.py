@@ -0,0 +1,101 @@
+"""
+Kompakte Übertragungsformate für Triangulationsanfragen
+
+Neben JSON verstehen /api/triangulate und /api/triangulate/batch:
+    'msgpack'  MessagePack mit denselben Strukturen wie JSON (Paket
+               msgpack aus requirements.txt); Punktlisten dürfen zusätzlich
+               als Binärwert im gepackten Layout übertragen werden
+    'packed'   float64 little-endian, eine Zeile (lat, lng, distance) pro
+               Punkt ohne Kopf; wird per np.frombuffer ohne Kopie gelesen
+
+Gepackte Antworten enthalten pro Ergebnis eine Zeile mit PACKED_FIELDS
+(float64 little-endian); ungültige Ergebnisse haben valid = 0 und NaN.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import msgpack
+import numpy as np
+
+JSON = "json"
+MSGPACK = "msgpack"
+PACKED = "packed"
+WIRE_FORMATS = (JSON, MSGPACK, PACKED)
+
+MEDIA_TYPES = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/octet-stream": PACKED,
+}
+CONTENT_TYPES = {
+    JSON: "application/json",
+    MSGPACK: "application/msgpack",
+    PACKED: "application/octet-stream",
+}
+
+PACKED_DTYPE = np.dtype("<f8")
+PACKED_FIELDS = ("valid", "lat", "lng", "accuracy", "confidence", "max_error", "mean_error")
+
+
+def request_format(mimetype: str) -> Optional[str]:
+    """Format eines Request-Bodys nach Content-Type; JSON ohne Angabe, sonst None"""
+    if not mimetype:
+        return JSON
+    return MEDIA_TYPES.get(mimetype)
+
+
+def unpack_points(buffer: Any, n: Optional[int] = None) -> np.ndarray:
+    """
+    Liest gepackte Punkte ohne Kopie
+
+    Args:
+        buffer: Bytes mit float64 little-endian, 3 Werte pro Punkt
+        n: Punkte pro Punktmenge; dann Ergebnis (B, n, 3) statt (n, 3)
+
+    Raises:
+        ValueError: wenn die Länge nicht zum Layout passt
+    """
+    row = 3 * PACKED_DTYPE.itemsize * (n or 1)
+    if len(buffer) % row:
+        if n:
+            raise ValueError(
+                f"Länge muss ein Vielfaches von {row} Bytes sein ({n} Punkte x 3 x float64)"
+            )
+        raise ValueError(
+            f"Länge muss ein Vielfaches von {row} Bytes sein (lat, lng, distance als float64)"
+        )
+    points = np.frombuffer(buffer, dtype=PACKED_DTYPE)
+    return points.reshape(-1, n, 3) if n else points.reshape(-1, 3)
+
+
+def decode(body: bytes) -> Any:
+    """Dekodiert einen MessagePack-Body; Binärwerte bleiben bytes"""
+    return msgpack.unpackb(body, raw=False)
+
+
+def encode(value: Any) -> bytes:
+    """Kodiert ein JSON-fähiges Ergebnis als MessagePack"""
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def array_table(result: Dict[str, np.ndarray]) -> np.ndarray:
+    """Ergebnistabelle (B, len(PACKED_FIELDS)) aus solver.solve_batch"""
+    valid = result["valid"]
+    table = np.empty((len(valid), len(PACKED_FIELDS)), dtype=PACKED_DTYPE)
+    table[:, 0] = valid
+    for column, name in enumerate(PACKED_FIELDS[1:], 1):
+        table[:, column] = np.where(valid, result[name], np.nan) if name in result else np.nan
+    return table
+
+
+def results_table(results: List[Dict[str, Any]]) -> np.ndarray:
+    """Ergebnistabelle aus formatierten Ergebnissen (wie /api/triangulate)"""
+    table = np.full((len(results), len(PACKED_FIELDS)), np.nan, dtype=PACKED_DTYPE)
+    for row, result in zip(table, results):
+        if "error" in result:
+            row[0] = 0.0
+            continue
+        row[0] = 1.0
+        row[1:] = [result[name] for name in PACKED_FIELDS[1:]]
+    return table
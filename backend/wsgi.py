@@ -0,0 +1,95 @@
+"""
+Produktions-Einstiegspunkt für Gunicorn
+
+    cd backend && gunicorn -c gunicorn.conf.py wsgi:app
+
+Importiert die App und löst vor dem ersten Request eine kleine
+synthetische Punktmenge mit jeder Methode (warm_up). Mit preload_app
+(Standard in gunicorn.conf.py) geschieht beides einmal im Master; die
+Worker erben Module und aufgewärmten Zustand per Fork, statt NumPy und
+Flask nach jedem Neustart selbst zu laden. Aufwärmen abschalten mit
+WARM_UP=false.
+"""
+
+import logging
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+
+import region
+import solver
+from app import AdvancedTriangulationCalculator, app, region_grids, result_cache
+from geometry import haversine
+
+logger = logging.getLogger(__name__)
+
+WARM_UP = os.environ.get("WARM_UP", "true").lower() not in ("0", "false", "no")
+
+# WSGI-Standardname für Server, die nach 'application' suchen
+application = app
+
+
+def warm_up_points(
+    n: int, spread: float, lat: float = 52.52, lng: float = 13.405
+) -> List[Dict[str, float]]:
+    """Feste Referenzpunkte auf einem Kreis um (lat, lng), Radius spread in Grad"""
+    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
+    point_lat = lat + spread * np.sin(angles)
+    point_lng = lng + spread * np.cos(angles) * 1.6
+    distances = haversine(lat + spread / 7, lng - spread / 5, point_lat, point_lng)
+    return [
+        {"lat": a, "lng": b, "distance": d}
+        for a, b, d in zip(point_lat.tolist(), point_lng.tolist(), distances.tolist())
+    ]
+
+
+def warm_up() -> float:
+    """
+    Einmalkosten des ersten Requests vorziehen
+
+    Durchläuft Trilateration, alle Methoden, eine weiträumige Punktmenge
+    (ENU-Projektion bei PROJECTION=auto) und eine Lösung in einer Region
+    über AdvancedTriangulationCalculator sowie einen kleinen Batch. Die
+    Ergebnisse und das Gitter der Region werden anschließend aus den
+    Caches entfernt. Ein Request
+    auf einen unbekannten Pfad wärmt Routing, Hooks und Antwortaufbau
+    von Flask, ohne in /metrics gezählt zu werden.
+
+    Returns:
+        Dauer in Sekunden
+
+    Raises:
+        RuntimeError: wenn ein Lösungspfad ein Fehlerergebnis liefert, damit
+            ein defekter Build nicht erst beim ersten Request auffällt
+    """
+    start = time.perf_counter()
+    cases = [(solver.WLS, warm_up_points(3, 0.01))]
+    cases += [(method, warm_up_points(8, 0.01)) for method in solver.METHODS]
+    cases.append((solver.LM, warm_up_points(8, 0.5)))
+    cases.append((solver.REGION, warm_up_points(8, 0.01)))
+
+    for method, points in cases:
+        if method == solver.REGION:
+            result = AdvancedTriangulationCalculator.calculate_position(
+                points, solver.WLS, region.bbox_polygon(52.50, 13.38, 52.54, 13.43)
+            )
+        else:
+            result = AdvancedTriangulationCalculator.calculate_position(points, method)
+        if "error" in result:
+            raise RuntimeError(
+                f"Aufwärmen mit {method} ({len(points)} Punkte) fehlgeschlagen: {result['error']}"
+            )
+
+    batch = solver.points_to_array(warm_up_points(8, 0.01))
+    solver.solve_batch(np.repeat(batch[None], 16, axis=0))
+    result_cache.clear()
+    region_grids.clear()
+
+    app.test_client().get("/api/warm-up")
+    return time.perf_counter() - start
+
+
+if WARM_UP:
+    logger.info("Solver aufgewärmt in %.0f ms", warm_up() * 1000)